@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of the test generation pipeline
+Times each phase of generate_and_build_tests + run_coverage_analysis on fixed
+fixture projects:
+
+    parse     header analysis (cold project model cache)
+    mocks     consolidated mock headers
+    generate  micro-test generation
+    enhance   Ollama enhancement, answered by src/llm_standin_server.py
+    compile   g++ build of every test
+    run       execution of every compiled test
+    coverage  lcov capture of the .gcda data
+    report    lcov filter, genhtml and text report
+
+Fixtures are TestProjects/SampleApp and synthetic projects from
+src/synthetic_project.py. Each fixture runs --repeat times in a fresh work
+folder and the median per phase is kept. Results are written as JSON and
+compared with a baseline; a phase slower than the baseline by more than
+--threshold (and by more than --min-delta seconds) is a regression and makes
+the run fail. Nothing talks to a real Ollama server.
+
+Usage:
+    python3 benchmarks/run_benchmarks.py                      # compare with benchmarks/baseline.json
+    python3 benchmarks/run_benchmarks.py --update-baseline    # record a new baseline
+    python3 benchmarks/run_benchmarks.py --fixtures synthetic-x100 --until generate
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, replace
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+SRC_DIR = ROOT_DIR / "src"
+sys.path.insert(0, str(SRC_DIR))
+sys.path.insert(0, str(SRC_DIR / "quick_test_generator"))
+
+from config_reader import PROJECT_PATH_ENV
+from llm_response_cache import LLMResponseCache, set_response_cache
+from llm_telemetry import telemetry
+from metrics_registry import metrics
+from project_model_cache import ProjectModelCache
+from synthetic_project import ProjectSpec, generate_project
+from llm_standin_server import LLMStandInServer, PROFILES
+
+PHASES = ('parse', 'mocks', 'generate', 'enhance', 'compile', 'run', 'coverage', 'report')
+
+# name -> project folder (relative to the repo root) or synthetic ProjectSpec
+FIXTURES = {
+    'sampleapp': 'TestProjects/SampleApp',
+    'synthetic-x1': ProjectSpec(name='SyntheticX1', classes=8, seed=1),
+    'synthetic-x10': ProjectSpec(name='SyntheticX10', classes=80, modules=8, seed=1),
+    'synthetic-lib-x10': ProjectSpec(name='SyntheticLib', classes=80, modules=8, layout='library',
+                                     namespaces=True, template_ratio=0.2, seed=1),
+    'synthetic-x100': ProjectSpec(name='SyntheticX100', classes=800, modules=16, seed=1),
+    'synthetic-x1000': ProjectSpec(name='SyntheticX1000', classes=8000, modules=64, seed=1),
+}
+DEFAULT_FIXTURES = 'sampleapp,synthetic-x1'
+
+
+@contextlib.contextmanager
+def working_directory(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+class PhaseTimer:
+    """Wall time of each phase of one repetition, and why the others did not run"""
+
+    def __init__(self, until: str):
+        self.seconds = {}
+        self.skipped = {}
+        self.last = PHASES.index(until)
+        # Set when a phase the remaining ones depend on could not produce its output
+        self.blocked = None
+
+    def wanted(self, name: str) -> bool:
+        """Whether to run a phase; records the reason when not"""
+        if PHASES.index(name) > self.last:
+            self.skipped[name] = f"after --until {PHASES[self.last]}"
+        elif self.blocked:
+            self.skipped[name] = self.blocked
+        return name not in self.skipped
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        yield
+        self.seconds[name] = time.perf_counter() - start
+
+    def skip(self, name: str, reason: str, blocks: bool = True):
+        self.skipped[name] = reason
+        if blocks:
+            self.block(f"{name}: {reason}")
+
+    def block(self, reason: str):
+        self.blocked = reason
+
+
+def prepare_fixture(name: str, work_root: Path) -> Path:
+    """Project folder of a fixture, generating synthetic projects (untimed)"""
+    fixture = FIXTURES[name]
+    if isinstance(fixture, ProjectSpec):
+        project = work_root / "fixtures" / name
+        manifest = project / "synthetic_project.json"
+        # Generation is deterministic, so an existing tree with the same spec is reused
+        if not manifest.exists() or json.loads(manifest.read_text())['spec'] != asdict(fixture):
+            generate_project(fixture, project)
+        return project
+    return ROOT_DIR / fixture
+
+
+def run_once(project: Path, work_dir: Path, args) -> tuple:
+    """One timed pass over every phase; returns (seconds, skipped, counts)"""
+    import generate_and_build_tests as gbt
+    from run_coverage_analysis import capture_coverage, write_coverage_report
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    output_root = work_dir / "output" / "ConsolidatedTests"
+    mock_dir = output_root / "mocks"
+    test_dir = output_root / "tests"
+    coverage_dir = work_dir / "output" / "UnitTestCoverage"
+    for folder in (mock_dir, test_dir, coverage_dir):
+        folder.mkdir(parents=True, exist_ok=True)
+    timer = PhaseTimer(args.until)
+    counts = {}
+
+    with timer.phase('parse'):
+        analyzer = gbt.HeaderAnalyzer(project)
+        analyzer.model_cache = ProjectModelCache(project, cache_file=work_dir / "model_cache.json")
+        headers = sorted(analyzer.find_all_headers())
+        header_classes = gbt.collect_header_classes(analyzer, headers, jobs=args.jobs)
+    counts['headers'] = len(headers)
+    counts['classes'] = len(header_classes)
+
+    if timer.wanted('mocks'):
+        with timer.phase('mocks'):
+            mock_gen = gbt.MockGenerator(mock_dir)
+            for class_info in header_classes.values():
+                mock_gen.write_mock_header(class_info)
+
+    if timer.wanted('generate'):
+        with timer.phase('generate'):
+            test_gen = gbt.UnitTestGenerator(test_dir, mock_dir, project, use_ollama=not args.no_llm)
+            gbt.generate_tests(analyzer, test_gen, header_classes, headers)
+        counts['tests'] = len(test_gen.test_metadata)
+
+    if timer.wanted('enhance'):
+        if args.no_llm:
+            timer.skip('enhance', "--no-llm", blocks=False)
+        else:
+            with timer.phase('enhance'):
+                test_gen.enhance_pending_with_ollama(args.llm_concurrency, 30.0)
+            counts['enhanced'] = sum(1 for m in test_gen.test_metadata if m['ollama_enhanced'])
+
+    if timer.wanted('compile'):
+        if not shutil.which('g++'):
+            timer.skip('compile', "g++ not found")
+        else:
+            to_build = test_gen.test_metadata[:args.max_tests] if args.max_tests else test_gen.test_metadata
+            with timer.phase('compile'):
+                builder = gbt.TestBuilder(output_root, mock_dir, project)
+                with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+                    built = list(executor.map(builder.compile_test, to_build))
+            compiled = [m for m, ok in zip(to_build, built) if ok]
+            counts['compiled'] = len(compiled)
+
+    if timer.wanted('run'):
+        with timer.phase('run'):
+            outcomes = [builder.run_test(m) for m in compiled]
+        counts['passed'] = sum(1 for passed, _ in outcomes if passed)
+
+    if timer.wanted('coverage'):
+        if not shutil.which('lcov'):
+            timer.skip('coverage', "lcov not found")
+        else:
+            with timer.phase('coverage'):
+                coverage_file = capture_coverage(str(output_root / "bin"), str(coverage_dir))
+            if coverage_file is None:
+                timer.block("coverage: no coverage data")
+
+    if timer.wanted('report'):
+        # The report names the project through get_project_path() and copies
+        # coverage_report.txt into the working directory
+        os.environ[PROJECT_PATH_ENV] = str(project)
+        with working_directory(work_dir), timer.phase('report'):
+            write_coverage_report(coverage_file, str(coverage_dir))
+    return timer.seconds, timer.skipped, counts
+
+
+def run_fixture(name: str, args) -> dict:
+    project = prepare_fixture(name, args.work_dir)
+    runs = []
+    for repeat in range(args.repeat):
+        log_file = args.work_dir / f"{name}.log"
+        with open(log_file, 'w') as log, contextlib.redirect_stdout(log):
+            seconds, skipped, counts = run_once(project, args.work_dir / name, args)
+        runs.append(seconds)
+        print(f"  {name} #{repeat + 1}: " + ", ".join(f"{p} {s:.2f}s" for p, s in seconds.items()))
+    phases = {}
+    for phase in PHASES:
+        samples = [run[phase] for run in runs if phase in run]
+        if samples:
+            phases[phase] = {'seconds': round(statistics.median(samples), 4),
+                             'runs': [round(s, 4) for s in samples]}
+        else:
+            phases[phase] = {'skipped': skipped.get(phase, "not run")}
+    return {'project': str(project), 'counts': counts, 'phases': phases}
+
+
+def compare(current: dict, baseline: dict, threshold: float, min_delta: float) -> tuple:
+    """(table rows, regressions) of every phase timed in both runs"""
+    rows = []
+    regressions = []
+    for fixture, result in current['fixtures'].items():
+        base_phases = baseline.get('fixtures', {}).get(fixture, {}).get('phases', {})
+        for phase, timing in result['phases'].items():
+            if 'seconds' not in timing:
+                continue
+            now = timing['seconds']
+            base = base_phases.get(phase, {}).get('seconds')
+            if base is None:
+                rows.append((fixture, phase, None, now, None, "new"))
+                continue
+            change = (now - base) / base if base else 0.0
+            if change > threshold and now - base > min_delta:
+                status = "REGRESSION"
+                regressions.append((fixture, phase))
+            elif change < -threshold and base - now > min_delta:
+                status = "faster"
+            else:
+                status = "ok"
+            rows.append((fixture, phase, base, now, change, status))
+    return rows, regressions
+
+
+def format_table(rows) -> str:
+    lines = [f"{'fixture':<20} {'phase':<9} {'baseline s':>10} {'current s':>10} {'change':>8}  status",
+             "-" * 70]
+    for fixture, phase, base, now, change, status in rows:
+        base_text = f"{base:>10.3f}" if base is not None else f"{'-':>10}"
+        change_text = f"{change * 100:>+7.1f}%" if change is not None else f"{'-':>8}"
+        lines.append(f"{fixture:<20} {phase:<9} {base_text} {now:>10.3f} {change_text}  {status}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the test generation pipeline phase by phase')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES,
+                        help=f"Comma-separated fixtures (default: {DEFAULT_FIXTURES}; "
+                             f"available: {', '.join(FIXTURES)})")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per fixture; the median is kept (default: 3)')
+    parser.add_argument('--until', choices=PHASES, default=PHASES[-1],
+                        help='Last phase to run, e.g. generate for the large synthetic fixtures')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Header analysis processes and concurrent compiles (default: CPU count)')
+    parser.add_argument('--max-tests', type=int, default=0, metavar='N',
+                        help='Compile and run only the first N generated tests (default: all)')
+    parser.add_argument('--no-llm', action='store_true', help='Skip the enhance phase')
+    parser.add_argument('--llm-profile', choices=sorted(PROFILES), default='instant',
+                        help='Latency profile of the stand-in LLM server (default: instant)')
+    parser.add_argument('--llm-latency', type=float, default=0.0, metavar='SEC',
+                        help='Extra time to first token per LLM request (default: 0)')
+    parser.add_argument('--llm-concurrency', type=int, default=4, metavar='N',
+                        help='Concurrent enhancement requests (default: 4)')
+    parser.add_argument('--work-dir', type=Path, default=ROOT_DIR / "output" / "Benchmarks",
+                        help='Fixture and work folders (default: output/Benchmarks)')
+    parser.add_argument('--output', type=Path, default=None,
+                        help='Result JSON (default: <work-dir>/results.json)')
+    parser.add_argument('--baseline', type=Path, default=BENCH_DIR / "baseline.json",
+                        help='Baseline JSON to compare with (default: benchmarks/baseline.json)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown per phase as a fraction (default: 0.25)')
+    parser.add_argument('--min-delta', type=float, default=0.05, metavar='SEC',
+                        help='Slowdowns smaller than this are never regressions (default: 0.05)')
+    args = parser.parse_args()
+
+    names = [n.strip() for n in args.fixtures.split(',') if n.strip()]
+    unknown = [n for n in names if n not in FIXTURES]
+    if unknown:
+        print(f"❌ Unknown fixture(s): {', '.join(unknown)}")
+        return 2
+    args.work_dir = args.work_dir.resolve()
+    args.work_dir.mkdir(parents=True, exist_ok=True)
+
+    # Keep benchmark traffic away from the real response cache, telemetry and metrics
+    set_response_cache(LLMResponseCache(enabled=False))
+    metrics.enabled = False
+
+    results = {'created': time.time(), 'python': platform.python_version(), 'machine': platform.machine(),
+               'repeat': args.repeat, 'jobs': args.jobs, 'max_tests': args.max_tests,
+               'llm_profile': args.llm_profile, 'llm_latency': args.llm_latency, 'fixtures': {}}
+    profile = PROFILES[args.llm_profile]
+    profile = replace(profile, ttft=profile.ttft + args.llm_latency)
+    with LLMStandInServer(profile) as stub:
+        os.environ['OLLAMA_HOST'] = stub.address
+        for name in names:
+            print(f"Benchmarking {name}...")
+            results['fixtures'][name] = run_fixture(name, args)
+        results['llm_requests'] = stub.requests
+    telemetry.reset()
+
+    output = args.output or args.work_dir / "results.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\nResults: {output}")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; record one with --update-baseline")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    differing = [key for key in ('jobs', 'max_tests', 'llm_profile', 'llm_latency')
+                 if baseline.get(key) != results[key]]
+    if differing:
+        print(f"⚠️  Baseline was recorded with different {', '.join(differing)}; timings may not be comparable")
+    rows, regressions = compare(results, baseline, args.threshold, args.min_delta)
+    print("\n" + format_table(rows))
+    if regressions:
+        print(f"\n❌ {len(regressions)} phase(s) regressed by more than {args.threshold * 100:.0f}%: "
+              + ", ".join(f"{fixture}/{phase}" for fixture, phase in regressions))
+        return 1
+    print(f"\n✅ No phase regressed by more than {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
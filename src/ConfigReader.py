@@ -33,6 +33,12 @@ class ConfigReader():
             self.output_directory = settings.get('output_directory', 'output')
             self.coverage_target = float(settings.get('coverage_target', '80.0'))
             self.max_iterations = int(settings.get('max_iterations', '3'))
+            # Workflow settings
+            self.function_workers = max(1, int(settings.get('function_workers', '1')))
+            self.prompt_token_budget = max(0, int(settings.get('prompt_token_budget', '3000')))
+            self.speculative_candidates = max(1, int(settings.get('speculative_candidates', '1')))
+            # Set per run (--resume), not from the config file
+            self.resume = False
             self.initialized = True
 
     def getOpenCppDir(self):
@@ -80,6 +86,21 @@ class ConfigReader():
     def get_max_iterations(self):
         return self.max_iterations
 
+    def get_function_workers(self):
+        return self.function_workers
+
+    def get_prompt_token_budget(self):
+        return self.prompt_token_budget
+
+    def get_speculative_candidates(self):
+        return self.speculative_candidates
+
+    def get_resume(self):
+        return self.resume
+
+    def set_resume(self, resume):
+        self.resume = bool(resume)
+
     def read_config(self, file_path='CppMicroAgent.cfg'):
         config = configparser.ConfigParser()
         config.read(file_path)
@@ -123,6 +144,16 @@ class ConfigReader():
                 'coverage_target': '80.0',
                 'max_iterations': '3'
             })
+
+        # Add workflow settings if section exists
+        if 'WORKFLOW_SETTINGS' in config:
+            settings['function_workers'] = config['WORKFLOW_SETTINGS'].get('function_workers', '1')
+            settings['prompt_token_budget'] = config['WORKFLOW_SETTINGS'].get('prompt_token_budget', '3000')
+            settings['speculative_candidates'] = config['WORKFLOW_SETTINGS'].get('speculative_candidates', '1')
+        else:
+            settings['function_workers'] = '1'
+            settings['prompt_token_budget'] = '3000'
+            settings['speculative_candidates'] = '1'
     
         return settings
 
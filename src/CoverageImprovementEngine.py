@@ -221,7 +221,8 @@ Include both positive and negative test scenarios.
 """
         
         try:
-            response = self.client.query(self.configReader.get_gtest_model(), prompt)
+            response = self.client.query(self.configReader.get_gtest_model(), prompt,
+                                         site="CoverageImprovementEngine")
             test_code = self._extract_code_from_response(response)
             
             return {
@@ -257,7 +258,8 @@ Return ONLY valid C++ test code using Google Test framework.
 """
         
         try:
-            response = self.client.query(self.configReader.get_gtest_model(), prompt)
+            response = self.client.query(self.configReader.get_gtest_model(), prompt,
+                                         site="CoverageImprovementEngine")
             test_code = self._extract_code_from_response(response)
             
             return {
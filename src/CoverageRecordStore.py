@@ -0,0 +1,156 @@
+"""
+CoverageRecordStore - Structured per-function coverage records
+==============================================================
+
+Each function measured by the advanced coverage workflow appends one JSON
+record to a single JSONL stream per run, and one entry to a sidecar index
+that maps "<source_file>/<function_name>" to the byte offset of its record.
+
+Aggregation reads the stream sequentially in one pass instead of walking
+output/UnitTestCoverage/<source>/<function>/ and scraping every
+coverage_summary.txt. A function that is run again appends a tombstone
+first, so a rerun that measures nothing does not keep its old record.
+"""
+
+import json
+import os
+import threading
+
+RECORDS_FILENAME = "coverage_records.jsonl"
+INDEX_FILENAME = "coverage_records.idx"
+
+
+class CoverageRecordStore:
+    """
+    Append-only store of per-function coverage records for one run.
+    Safe to share between threads of the same process.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, output_dir):
+        """
+        Args:
+            output_dir (str): Run output directory (e.g. output/UnitTestCoverage)
+        """
+        self.output_dir = output_dir
+        self.records_file = os.path.join(output_dir, RECORDS_FILENAME)
+        self.index_file = os.path.join(output_dir, INDEX_FILENAME)
+
+    @staticmethod
+    def make_key(source_file, function_name):
+        """Build the index key for a source file / function pair"""
+        return f"{source_file}/{function_name}"
+
+    def function_names(self, folder):
+        """
+        (source_file, function_name) of a function folder under output_dir,
+        or None when folder is not <output_dir>/<source>/<function...>
+        """
+        rel_parts = os.path.relpath(folder, self.output_dir).split(os.sep)
+        if len(rel_parts) < 2 or rel_parts[0] == os.pardir:
+            return None
+        return rel_parts[0], "/".join(rel_parts[1:])
+
+    def exists(self):
+        """Check whether this run has written any records"""
+        return os.path.exists(self.records_file)
+
+    def append(self, record):
+        """
+        Append one coverage record and its index entry.
+
+        Args:
+            record (dict): Must contain 'source_file' and 'function_name'
+        """
+        key = self.make_key(record["source_file"], record["function_name"])
+        line = (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+
+        with self._lock:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.records_file, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+            with open(self.index_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "offset": offset, "length": len(line)}) + "\n")
+
+    def remove(self, source_file, function_name):
+        """
+        Append a tombstone: the function has no record until it is measured again.
+        """
+        self.append({"source_file": source_file, "function_name": function_name, "removed": True})
+
+    def read_all(self):
+        """
+        Read every record of the run in a single sequential pass.
+        When a function was measured more than once, the last record wins;
+        a function whose last record is a tombstone is left out.
+
+        Returns:
+            list: Coverage record dicts in the order they were first written
+        """
+        records = {}
+        if not self.exists():
+            return []
+
+        with open(self.records_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                key = self.make_key(record["source_file"], record["function_name"])
+                if record.get("removed"):
+                    records.pop(key, None)
+                else:
+                    records[key] = record
+
+        return list(records.values())
+
+    def load_index(self):
+        """
+        Load the index of record offsets.
+
+        Returns:
+            dict: key -> (offset, length) of the latest record for that key
+        """
+        index = {}
+        if not os.path.exists(self.index_file):
+            return index
+
+        with open(self.index_file, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                index[entry["key"]] = (entry["offset"], entry["length"])
+        return index
+
+    def lookup(self, source_file, function_name, index=None):
+        """
+        Fetch a single record by key without scanning the stream.
+
+        Args:
+            source_file (str): Source file name (e.g. SampleApp.cpp)
+            function_name (str): Function name (e.g. Class/method)
+            index (dict): Optional index previously returned by load_index()
+
+        Returns:
+            dict: The record, or None if the function has no record (or a tombstone)
+        """
+        if index is None:
+            index = self.load_index()
+        entry = index.get(self.make_key(source_file, function_name))
+        if entry is None:
+            return None
+
+        offset, length = entry
+        with open(self.records_file, "rb") as f:
+            f.seek(offset)
+            record = json.loads(f.read(length).decode("utf-8"))
+        return None if record.get("removed") else record
@@ -0,0 +1,124 @@
+"""
+FunctionTaskContext - Per-function task context
+===============================================
+
+Each function processed by the per-function state machine
+(advanced_coverage_workflow/States_Function) gets its own FunctionTask:
+an immutable FunctionTaskContext describing the function (project, source,
+header, implementation, output folder) plus the results its states produce
+(generated test, executable, coverage data).
+
+FunctionTask answers the same getters and result setters as Query, so the
+function states run unchanged, but nothing is shared between functions and
+several function pipelines can run at the same time.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class FunctionTaskContext:
+    """Read-only description of one function to test"""
+    project_path: str
+    source_files: tuple
+    include_folders: tuple
+    function_name: str
+    output_folder: str
+    include: str
+    source: str
+    header_content: str
+    source_content: str
+    implementation_content: str
+
+
+class FunctionTask:
+    """
+    Query-compatible view of a FunctionTaskContext plus the per-function results.
+    The context cannot be changed; only the results are writable.
+    """
+
+    def __init__(self, context):
+        """
+        Args:
+            context (FunctionTaskContext): The function to process
+        """
+        self.context = context
+        self.coverage_data = None
+        self.generated_code = None
+        self.generated_ut_file = None
+
+    def get_input_data(self):
+        """Get the project path"""
+        return self.context.project_path
+
+    def get_project_path(self):
+        """Get the project path"""
+        return self.context.project_path
+
+    def get_source_files(self):
+        """Get the source files of the project"""
+        return list(self.context.source_files)
+
+    def get_include_folders(self):
+        """Get the include folders of the project"""
+        return list(self.context.include_folders)
+
+    def get_current_function(self):
+        """Get the name of the function under test"""
+        return self.context.function_name
+
+    def get_current_output_folder(self):
+        """Get the output folder of this function"""
+        return self.context.output_folder
+
+    def get_current_include(self):
+        """Get the header declaring this function"""
+        return self.context.include
+
+    def get_current_source(self):
+        """Get the source file defining this function"""
+        return self.context.source
+
+    def get_current_header_content(self):
+        """Get the header file content"""
+        return self.context.header_content
+
+    def get_current_source_content(self):
+        """Get the source file content"""
+        return self.context.source_content
+
+    def get_current_implementation_content(self):
+        """Get the function's implementation (signature and body)"""
+        return self.context.implementation_content
+
+    def set_coverage_data(self, data):
+        """Set the coverage data measured for this function"""
+        self.coverage_data = data
+
+    def get_coverage_data(self):
+        """Get the coverage data measured for this function"""
+        return self.coverage_data
+
+    def set_generated_code(self, code):
+        """Set the generated test code"""
+        self.generated_code = code
+
+    def get_generated_code(self):
+        """Get the generated test code"""
+        return self.generated_code
+
+    def set_generated_ut_file(self, filename):
+        """Set the generated unit test file (or executable) path"""
+        self.generated_ut_file = filename
+
+    def get_generated_ut_file(self):
+        """Get the generated unit test file (or executable) path"""
+        return self.generated_ut_file
+
+    def __str__(self):
+        """String representation of the task."""
+        return f"FunctionTask(function='{self.context.function_name}')"
+
+    def __repr__(self):
+        """String representation for debugging."""
+        return self.__str__()
@@ -1,33 +1,283 @@
-import requests
+import json
+import re
+import time
+
+from .llm_response_cache import get_response_cache
+from .llm_telemetry import telemetry, reply_counts
+from .ollama_transport import get_transport, OllamaTransportError, OllamaTimeoutError
+
+# Opening/closing markdown code fence at the start of a line
+_FENCE_RE = re.compile(r'^[ \t]*```[^\n]*$', re.MULTILINE)
+# Braces, skipping string/char literals and comments
+_BRACE_RE = re.compile(r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|//[^\n]*|/\*.*?\*/|[{}]', re.DOTALL)
+_TEST_MACRO_RE = re.compile(r'\bTEST(?:_F|_P)?\s*\(')
+# Characters that (almost) every top-level line of C++ contains and prose does not
+_CODE_CHARS_RE = re.compile(r'[;{}()#/<>=:\[\]]')
+
+
+def _is_prose(line: str) -> bool:
+    """A line of explanation rather than code, e.g. 'This test covers the edge cases.'"""
+    return len(line.split()) >= 3 and not _CODE_CHARS_RE.search(line)
+
+
+def code_complete_at(text: str):
+    """End offset of the code in a streamed completion, or None while it is still coming.
+
+    Code is complete once a markdown code fence has been closed, or - for
+    unfenced output - once every TEST(...) { } block seen so far is balanced
+    and the model has moved on to prose."""
+    fences = list(_FENCE_RE.finditer(text))
+    if fences:
+        # The fence line must be finished before it can be told apart from ```cpp
+        closing = [f for f in fences[1:] if text.startswith('\n', f.end())]
+        return closing[0].end() if closing else None
+
+    first_test = _TEST_MACRO_RE.search(text)
+    if first_test is None:
+        return None
+
+    depth = 0
+    code_end = None
+    for match in _BRACE_RE.finditer(text, first_test.start()):
+        if match.group(0) == '{':
+            depth += 1
+        elif match.group(0) == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                code_end = match.end()
+    if code_end is None or depth != 0:
+        return None
+
+    # The first complete line after the last test decides: prose ends the code
+    for line in re.finditer(r'[^\n]*\n', text[code_end:]):
+        stripped = line.group(0).strip()
+        if not stripped:
+            continue
+        return code_end + line.start() if _is_prose(stripped) else None
+    return None
+
+
+class OllamaStream:
+    """Token stream of one /api/generate request.
+
+    Iterating yields response tokens as they arrive. When stop_at is given it
+    is called with the text so far and the generation is cut off (connection
+    closed) as soon as it returns an offset; text is then truncated there.
+    Setting the cancel event (a threading.Event) abandons the generation the
+    same way, at once even while the prompt is evaluated or a token is slow
+    (see OllamaTransport.open_stream). After iteration: text, ttft, tokens, elapsed, tokens_per_second,
+    stopped_early, cancelled and error describe the request."""
+
+    def __init__(self, transport, payload, timeout, stop_at=None, cancel=None):
+        self._transport = transport
+        self._payload = payload
+        self._timeout = timeout
+        self._stop_at = stop_at
+        self._cancel = cancel
+        self.text = ""
+        self.ttft = None
+        self.tokens = 0
+        self.elapsed = 0.0
+        self.stopped_early = False
+        self.cancelled = False
+        self.error = None
+        self.timed_out = False
+        self._eval_count = None
+        self._eval_duration = None
+        self._prompt_eval_count = None
+
+    @property
+    def tokens_per_second(self):
+        """Generation speed, from Ollama's own counters when the stream finished"""
+        if self._eval_count and self._eval_duration:
+            return self._eval_count / (self._eval_duration / 1e9)
+        generating = self.elapsed - (self.ttft or 0.0)
+        return self.tokens / generating if self.tokens and generating > 0 else 0.0
+
+    def __iter__(self):
+        start = time.perf_counter()
+        try:
+            done = False
+            with self._transport.open_stream('/api/generate', self._payload, self._timeout, self._cancel) as resp:
+                for line in resp:
+                    if self._cancel is not None and self._cancel.is_set():
+                        self.cancelled = True
+                        break
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        self.error = chunk["error"]
+                        break
+                    if chunk.get("done"):
+                        self._eval_count = chunk.get("eval_count")
+                        self._eval_duration = chunk.get("eval_duration")
+                        self._prompt_eval_count = chunk.get("prompt_eval_count")
+                        # Read on to the end of the body so the connection is reused
+                        done = True
+                        continue
+
+                    token = chunk.get("response", "")
+                    if not token:
+                        continue
+                    if self.ttft is None:
+                        self.ttft = time.perf_counter() - start
+                    self.tokens += 1
+                    self.text += token
+                    yield token
+
+                    # A fence or a test/prose boundary can only end on these
+                    if self._stop_at is not None and ('`' in token or '\n' in token):
+                        end = self._stop_at(self.text)
+                        if end is not None:
+                            self.text = self.text[:end]
+                            self.stopped_early = True
+                            # Leaving the with block closes the connection,
+                            # which makes Ollama abort the generation
+                            break
+                else:
+                    # A cancel shuts the socket down, which ends the body early
+                    if not done and self._cancel is not None and self._cancel.is_set():
+                        self.cancelled = True
+        except (OllamaTransportError, ValueError) as e:
+            if self._cancel is not None and self._cancel.is_set():
+                # The transport shut the connection down
+                self.cancelled = True
+            elif isinstance(e, OllamaTimeoutError):
+                self.error = "request to Ollama server timed out"
+                self.timed_out = True
+            else:
+                self.error = str(e)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def counts(self) -> dict:
+        """Token counts and generation time for telemetry; Ollama only reports
+        them when the stream ran to completion, otherwise chunks are counted"""
+        return {
+            'prompt_tokens': self._prompt_eval_count or 0,
+            'completion_tokens': self._eval_count or self.tokens,
+            'eval_seconds': (self._eval_duration / 1e9) if self._eval_duration
+            else max(0.0, self.elapsed - (self.ttft or 0.0)),
+        }
+
+    def summary(self) -> str:
+        """One-line timing summary"""
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "n/a"
+        line = f"{self.tokens} tokens, TTFT {ttft}, {self.tokens_per_second:.1f} tok/s, {self.elapsed:.1f}s total"
+        if self.stopped_early:
+            line += " (stopped early)"
+        if self.cancelled:
+            line += " (cancelled)"
+        if self.error:
+            line += f" (error: {self.error})"
+        return line
+
 
 class OllamaClient:
-    def __init__(self, host='localhost', port=11434, timeout=(5, 60)):
+    def __init__(self, transport=None, timeout=60.0):
         """
-        :param host: Ollama host (default 'localhost')
-        :param port: Ollama HTTP port (default 11434)
-        :param timeout: (connect_timeout, read_timeout) in seconds
+        :param transport: OllamaTransport to send requests over (default: the
+                          process-wide pool, which honours OLLAMA_HOST and keep_alive)
+        :param timeout: seconds to wait for a reply; with streaming it
+                        applies between tokens
         """
-        self.base_url = f'http://{host}:{port}/api/generate'
-        # Persist connections across queries for efficiency and to avoid stalls
-        self.session = requests.Session()  
-        # A tuple (connect_timeout, read_timeout)
-        self.timeout = timeout  
-
-    def query(self, model: str, prompt: str):
-        payload = {"model": model, "prompt": prompt}
+        self.transport = transport or get_transport()
+        self.timeout = timeout
+        # OllamaStream of the last generate() call
+        self.last_stream = None
+
+    def query(self, model: str, prompt: str, site: str = "OllamaClient.query"):
+        # The raw NDJSON body is cached, so callers parse hits and misses alike
+        cache = get_response_cache()
+        cache_options = {"format": "ndjson"}
+        start = time.perf_counter()
+        cached = cache.get(model, prompt, cache_options)
+        if cached is not None:
+            telemetry.record(site, model, time.perf_counter() - start, "cached")
+            return cached
+
+        payload = {"model": model, "prompt": prompt, "keep_alive": self.transport.keep_alive}
         try:
-            # specifying timeout prevents the request from hanging forever
-            resp = self.session.post(
-                self.base_url,
-                json=payload,
-                timeout=self.timeout
-            )
-            resp.raise_for_status()
-            return resp.text
-
-        except requests.exceptions.Timeout:
-            # handle connect or read timeout
+            text = self.transport.request_raw('POST', '/api/generate', payload,
+                                              self.timeout).decode('utf-8', errors='replace')
+        except OllamaTimeoutError:
+            telemetry.record(site, model, time.perf_counter() - start, "timeout")
             return "Error: request to Ollama server timed out"
-        except requests.exceptions.RequestException as e:
-            # catch other network or HTTP errors
+        except OllamaTransportError as e:
+            telemetry.record(site, model, time.perf_counter() - start, "error")
             return f"Error: {e}"
+        telemetry.record(site, model, time.perf_counter() - start, "ok",
+                         **reply_counts(self._final_chunk(text)))
+        cache.put(model, prompt, text, cache_options)
+        return text
+
+    @staticmethod
+    def _final_chunk(ndjson: str) -> dict:
+        """The closing "done" object of an NDJSON reply, which carries the counters"""
+        for line in reversed(ndjson.splitlines()):
+            if line.strip():
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    return {}
+                return chunk if isinstance(chunk, dict) else {}
+        return {}
+
+    def stream(self, model: str, prompt: str, stop_at=None, options=None, cancel=None) -> OllamaStream:
+        """Streaming request: iterate the result for tokens (see OllamaStream).
+        Pass stop_at=code_complete_at to stop once the code has been received.
+        options are Ollama model options such as temperature and seed."""
+        payload = {"model": model, "prompt": prompt, "stream": True, "keep_alive": self.transport.keep_alive}
+        if options:
+            payload["options"] = options
+        return OllamaStream(self.transport, payload, self.timeout, stop_at, cancel)
+
+    @staticmethod
+    def _generate_cache_options(stop_at, options) -> dict:
+        # Where the stream stops changes the text, so it is part of the key
+        cache_options = {"stop_at": getattr(stop_at, '__name__', None)}
+        if options:
+            cache_options["options"] = options
+        return cache_options
+
+    def forget(self, model: str, prompt: str, stop_at=code_complete_at, options=None):
+        """Drop the cached generate() response of this request, so a response
+        that turned out to be unusable is not served again"""
+        get_response_cache().discard(model, prompt, self._generate_cache_options(stop_at, options))
+
+    def generate(self, model: str, prompt: str, stop_at=code_complete_at, echo=False,
+                 options=None, cancel=None, site: str = "OllamaClient.generate",
+                 use_cache: bool = True) -> str:
+        """Stream a completion and return its text, by default stopping as soon
+        as the generated code is complete. echo prints tokens as they arrive.
+        Errors are reported and whatever text was received is returned; a
+        cancelled generation is neither finished nor cached. The call is
+        recorded in the LLM telemetry under site. use_cache=False asks the
+        model even when a response is cached (and replaces it)."""
+        cache = get_response_cache()
+        cache_options = self._generate_cache_options(stop_at, options)
+        start = time.perf_counter()
+        cached = cache.get(model, prompt, cache_options) if use_cache else None
+        if cached is not None:
+            telemetry.record(site, model, time.perf_counter() - start, "cached")
+            if echo:
+                print(cached)
+            print(f"[OllamaClient] {model}: cached response")
+            self.last_stream = None
+            return cached
+
+        stream = self.stream(model, prompt, stop_at, options, cancel)
+        for token in stream:
+            if echo:
+                print(token, end="", flush=True)
+        if echo:
+            print()
+        print(f"[OllamaClient] {model}: {stream.summary()}")
+        # A cancelled speculative candidate still cost model time
+        outcome = "timeout" if stream.timed_out else "error" if stream.error else "ok"
+        telemetry.record(site, model, stream.elapsed, outcome, **stream.counts())
+        self.last_stream = stream
+        if stream.error is None and not stream.cancelled:
+            cache.put(model, prompt, stream.text, cache_options)
+        return stream.text
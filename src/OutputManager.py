@@ -17,7 +17,9 @@ class OutputManager:
         print("[OutputManager] Preparing output directory...")
         
         # Check if we should clean the output directory
-        if self.configReader.get_clean_output_before_run():
+        if self.configReader.get_resume():
+            print("[OutputManager] Resuming: keeping previous output and checkpoints")
+        elif self.configReader.get_clean_output_before_run():
             print("[OutputManager] Cleaning previous output (configured in settings)")
             self._clean_output_directory()
         else:
@@ -12,6 +12,8 @@ Core Modules:
 - CoverageImprovementEngine: Advanced coverage analysis and improvement
 - OllamaClient: AI integration for code generation
 - CodeWriter: Code generation and file management
+- CoverageRecordStore: Structured per-function coverage records
+- FunctionTaskContext: Per-function task context for concurrent workflows
 - flow_manager: Workflow orchestration and management
 
 Sub-packages:
@@ -38,5 +40,7 @@ __all__ = [
     'CoverageImprovementEngine',
     'OllamaClient',
     'CodeWriter',
+    'CoverageRecordStore',
+    'FunctionTaskContext',
     'flow_manager'
 ]
\ No newline at end of file
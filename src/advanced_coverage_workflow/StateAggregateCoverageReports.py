@@ -5,6 +5,7 @@ StateAggregateCoverageReports - Aggregate all function-level coverage into final
 import os
 import datetime
 from ..flow_manager import flow
+from ..CoverageRecordStore import CoverageRecordStore
 
 class StateAggregateCoverageReports():
     def __init__(self):
@@ -47,6 +48,18 @@ class StateAggregateCoverageReports():
         return True, input_data
 
     def _collect_all_coverage_data(self, output_dir):
+        """Collect coverage data from the run's structured record stream,
+        falling back to scraping coverage_summary.txt files for older output"""
+        
+        store = CoverageRecordStore(output_dir)
+        if store.exists():
+            all_coverage = store.read_all()
+            print(f"[StateAggregateCoverageReports] Loaded {len(all_coverage)} coverage records")
+            return all_coverage
+        
+        return self._collect_from_summary_files(output_dir)
+
+    def _collect_from_summary_files(self, output_dir):
         """Walk through all function directories and collect coverage data"""
         
         all_coverage = []
@@ -215,7 +228,8 @@ PER-FUNCTION COVERAGE BREAKDOWN
                 report += f"  {indicator} {func_name:<40} {coverage_pct:>5.1f}%  ({lines_covered}/{lines_total} lines)\n"
                 
                 if func.get("has_html_report"):
-                    report += f"     HTML: {func['function_path']}/build/coverage_html/index.html\n"
+                    html_dir = func.get("html_report") or f"{func['function_path']}/build/coverage_html"
+                    report += f"     HTML: {html_dir}/index.html\n"
             
             # Calculate source file average
             source_avg = sum(f.get("coverage_percentage", 0) for f in functions) / len(functions) if functions else 0
@@ -21,10 +21,16 @@ from pathlib import Path
 try:
     from ..flow_manager import flow
     from ..ConfigReader import ConfigReader
+    from ..project_model_cache import ProjectModelCache
+    from ..llm_response_cache import get_response_cache
+    from ..ollama_transport import get_transport, OllamaTimeoutError
 except ImportError:
     # Standalone mode
     import sys
     sys.path.insert(0, str(Path(__file__).parent.parent))
+    from project_model_cache import ProjectModelCache
+    from llm_response_cache import get_response_cache
+    from ollama_transport import get_transport, OllamaTimeoutError
     try:
         from flow_manager import flow
         from ConfigReader import ConfigReader
@@ -131,6 +137,7 @@ class StateGenerateIntegrationTests:
             list: List of class info dictionaries
         """
         classes = []
+        model_cache = ProjectModelCache(project_path)
         
         print(f"\n  Analyzing project structure at: {project_path}")
         
@@ -146,12 +153,16 @@ class StateGenerateIntegrationTests:
                 print(f"    Skipping {header.name} (output/test/mock directory)")
                 continue
             
-            # Parse header to find classes
-            class_info = self._parse_header_file(header, project_path)
+            # Parse header to find classes (reused from the project model if unchanged)
+            class_info = model_cache.get(
+                header, 'integration.classes',
+                lambda path: self._parse_header_file(Path(path), project_path)
+            )
             if class_info:
                 classes.extend(class_info)
         
-        print(f"  Total classes found: {len(classes)}")
+        model_cache.save()
+        print(f"  Total classes found: {len(classes)} ({model_cache.stats()})")
         
         return classes
     
@@ -437,17 +448,14 @@ Requirements:
 Generate ONLY the C++ code, no explanations. Start with #include statements."""
         
         try:
-            # Call Ollama
-            result = subprocess.run(
-                ['ollama', 'run', self.configReader.get_model_used()],
-                input=prompt,
-                capture_output=True,
-                text=True,
-                timeout=60
+            # Call Ollama (served from the response cache when the prompt is unchanged)
+            model = self.configReader.get_model_used()
+            generated_code = get_response_cache().get_or_call(
+                model, prompt, lambda: self._run_ollama(model, prompt),
+                site="StateGenerateIntegrationTests"
             )
             
-            if result.returncode == 0 and result.stdout.strip():
-                generated_code = result.stdout.strip()
+            if generated_code:
                 
                 # Clean up the response (remove markdown code blocks if present)
                 if '```cpp' in generated_code:
@@ -468,13 +476,19 @@ Generate ONLY the C++ code, no explanations. Start with #include statements."""
                 print(f"      ⚠️  Ollama failed, using template")
                 return self._generate_test_template(class_info, test_name)
                 
-        except subprocess.TimeoutExpired:
+        except OllamaTimeoutError:
             print(f"      ⏱️  Ollama timeout, using template")
             return self._generate_test_template(class_info, test_name)
         except Exception as e:
             print(f"      ❌ Ollama error: {e}, using template")
             return self._generate_test_template(class_info, test_name)
     
+    def _run_ollama(self, model, prompt):
+        """Send one prompt over the shared Ollama HTTP transport"""
+        transport = get_transport()
+        transport.warm_up(model)
+        return transport.generate(model, prompt, timeout=60, site="StateGenerateIntegrationTests")
+    
     def _save_metadata(self, generated_tests, output_dir):
         """Save test metadata to JSON file"""
         metadata_file = output_dir / "integration_test_metadata.json"
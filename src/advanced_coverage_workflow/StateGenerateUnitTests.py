@@ -95,7 +95,8 @@ class StateGenerateUnitTests():
         prompt = self._create_unit_test_prompt(source_file, source_content, header_content, coverage_info)
         
         try:
-            response_str = self.client.query(self.configReader.get_gtest_model(), prompt)
+            response_str = self.client.query(self.configReader.get_gtest_model(), prompt,
+                                             site="StateGenerateUnitTests")
             
             # Parse response
             response_text = ""
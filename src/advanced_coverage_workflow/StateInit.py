@@ -3,6 +3,7 @@ import platform
 
 from ..ConfigReader import ConfigReader
 from ..flow_manager import flow
+from ..ollama_transport import get_transport, OllamaTransportError
 
 
 class StateInit():
@@ -82,13 +83,13 @@ class StateInit():
     def check_ollama_installation(self):
         # Check Linux environment
         if platform.system() == "Linux":
-            # Check if ollama is available in PATH
-            import shutil
-            if shutil.which('ollama') is not None:
-                print("Ollama is installed and available in PATH")
+            # Ask the server (OLLAMA_HOST may point to another machine)
+            transport = get_transport()
+            if transport.is_available():
+                print(f"Ollama is running at {transport.host}:{transport.port}")
                 return self.check_ollama_models_linux()
             else:
-                print("Ollama is not installed or not in PATH")
+                print(f"Ollama is not running at {transport.host}:{transport.port}")
                 return False
         else:
             # Original Windows logic
@@ -106,26 +107,22 @@ class StateInit():
     def check_ollama_models_linux(self):
         """Check if the configured models are available in Linux"""
         try:
-            import subprocess
-            # Run 'ollama list' to get available models
-            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
-            if result.returncode != 0:
-                print("Failed to list Ollama models")
-                return False
-                
-            available_models = result.stdout
+            # The models the server has pulled, as `ollama list` shows them
+            reply = get_transport().request_json('GET', '/api/tags', timeout=5.0)
+            available_models = [model.get('name', '') for model in reply.get('models', [])]
             
             # Check if our configured model is available
             model_name = self.configReader.get_model_used()
-            if model_name in available_models:
+            # A name without a tag means :latest, as with the ollama CLI
+            if model_name in available_models or f"{model_name}:latest" in available_models:
                 print(f"Ollama model '{model_name}' is available")
                 return True
             else:
                 print(f"Ollama model '{model_name}' is not found. Available models:")
-                print(available_models)
+                print('\n'.join(available_models))
                 return False
                 
-        except Exception as e:
+        except OllamaTransportError as e:
             print(f"Error checking Ollama models: {e}")
             return False
 
@@ -2,8 +2,19 @@ from ..flow_manager import flow
 import os
 import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from .States_Function.StateMachine import StateMachine as StateMachineFunction
 from ..Query import Query
+from ..ConfigReader import ConfigReader
+from ..FunctionTaskContext import FunctionTask, FunctionTaskContext
+from ..source_function_index import SourceFunctionIndex
+from ..cpp_source_text import blank
+from ..llm_response_cache import get_response_cache
+from ..prompt_context import prompt_stats
+from ..mock_store import get_mock_store
+from ..llm_telemetry import telemetry
+from ..workflow_checkpoint import CheckpointStore, COMPLETED, text_hash
+from ..CoverageRecordStore import CoverageRecordStore
 
 class StateIterateSourceFiles():
     def __init__(self):
@@ -12,39 +23,36 @@ class StateIterateSourceFiles():
     import re
 
     # Function to handle C-style functions (e.g., `int main()`)
-    def extract_c_style_functions(self, source_file):
+    def extract_c_style_functions(self, source_file, file_contents=None):
         # Regex pattern for C-style functions (no class name, e.g., `int main()`)
         c_function_regex = r"([a-zA-Z_][a-zA-Z0-9_]*\s+)+([a-zA-Z_][a-zA-Z0-9_]*\s*)\(([^)]*)\)\s*(?:;|\{|\s*\})"
 
         function_list = []
 
-        # Open the source C++ file
-        with open(source_file, 'r') as file:
-            file_contents = file.read()
+        # Open the source C++ file unless the comment-stripped text is given
+        if file_contents is None:
+            file_contents = self._read_without_comments(source_file)
 
-            # Remove comments (single-line and multiline)
-            file_contents = re.sub(r"//.*?$|/\*.*?\*/", "", file_contents, flags=re.DOTALL | re.MULTILINE)
+        # Find all C-style function matches using regex
+        functions = re.findall(c_function_regex, file_contents)
 
-            # Find all C-style function matches using regex
-            functions = re.findall(c_function_regex, file_contents)
+        # Add matched C functions to the function list
+        for function in functions:
+            # Format function name and parameters
+            return_type_and_name = function[0].strip()
+            function_name = function[1].strip()
+            parameters = function[2].strip()
 
-            # Add matched C functions to the function list
-            for function in functions:
-                # Format function name and parameters
-                return_type_and_name = function[0].strip()
-                function_name = function[1].strip()
-                parameters = function[2].strip()
-
-                # Store the function signature
-                function_list.append({
-                    'return_type_and_name': return_type_and_name,
-                    'function_name': function_name,
-                    'parameters': parameters
-                })
+            # Store the function signature
+            function_list.append({
+                'return_type_and_name': return_type_and_name,
+                'function_name': function_name,
+                'parameters': parameters
+            })
 
         return function_list
 
-    def extract_cpp_member_functions(self, source_file):
+    def extract_cpp_member_functions(self, source_file, contents=None):
         cpp_function_regex = r"""
             (?:template\s*<[^>]+>\s*)?                              # Optional template<...>
             (?:
@@ -67,11 +75,8 @@ class StateIterateSourceFiles():
             \s*(?:\{|;)                                            # '{' for body or ';' for declaration
         """
 
-        with open(source_file, 'r') as f:
-            contents = f.read()
-        # strip comments
-        contents = re.sub(r"//.*?$|/\*.*?\*/", "", contents,
-                          flags=re.DOTALL | re.MULTILINE)
+        if contents is None:
+            contents = self._read_without_comments(source_file)
 
         function_list = []
         for m in re.finditer(cpp_function_regex, contents, flags=re.VERBOSE):
@@ -94,67 +99,93 @@ class StateIterateSourceFiles():
 
 
 
+    def _read_without_comments(self, source_file):
+        with open(source_file, 'r') as f:
+            contents = f.read()
+        return self._strip_comments(contents)
+
+    def _strip_comments(self, contents):
+        return blank(contents, literals=False)
+
     # Function that combines both C-style and C++ functions
-    def extract_functions(self, source_file):
+    def extract_functions(self, source_file, contents=None):
+        # Strip comments once and share the text between both extractors
+        if contents is None:
+            contents = self._read_without_comments(source_file)
+        else:
+            contents = self._strip_comments(contents)
+
         # First, extract C-style functions
-        c_functions = self.extract_c_style_functions(source_file)
+        c_functions = self.extract_c_style_functions(source_file, contents)
 
         # Then, extract C++ member functions
-        cpp_functions = self.extract_cpp_member_functions(source_file)
+        cpp_functions = self.extract_cpp_member_functions(source_file, contents)
 
         # Combine both lists
         return c_functions + cpp_functions
 
-    def extract_function_implementation(self, source_file, function_name):
-        # 1) Read file and strip comments
-        with open(source_file, 'r') as f:
-            text = f.read()
-        text = re.sub(r"//.*?$|/\*.*?\*/", "", text,
-                      flags=re.DOTALL | re.MULTILINE)
-
-        # 2) Build a regex for the signature up through the first '{'
-        fn_re = re.escape(function_name)
-        sig_pattern = (
-            r"(?:template\s*<[^>]+>\s*)?"     # optional template<>
-            r"[^\S\n]*"                       # any leading whitespace
-            r"(?:[^\s]+\s+)*"                # optional return-type tokens
-            + fn_re +                         # the function name
-            r"\s*\([^)]*\)\s*"               # parameter list
-            r"(?:const\s*)?"                 # optional 'const'
-            r"(?:->\s*[^{\s]+?\s*)?"         # optional trailing-return
-            r"\{"                            # the opening brace
-        )
-
-        # 3) Find the signature
-        m = re.search(sig_pattern, text, flags=re.DOTALL)
-        if not m:
-            return None
-
-        # 4) Locate the first brace and walk to its matching closing brace
-        start = m.start()
-        brace_idx = text.find("{", m.end() - 1)
-        if brace_idx < 0:
-            return None
-
-        depth = 1
-        idx = brace_idx + 1
-        length = len(text)
-        while idx < length and depth > 0:
-            c = text[idx]
-            if c == "{":
-                depth += 1
-            elif c == "}":
-                depth -= 1
-            idx += 1
-
-        if depth != 0:
-            # Unbalanced braces
-            return None
-
-        # 5) Return the full implementation (signature + body)
-        return text[start:idx]
-
+    def find_header_file(self, source_file, input_data):
+        # Derive the expected header filename (SampleApp.cpp -> SampleApp.h)
+        base = os.path.splitext(os.path.basename(source_file))[0]
+        header_name = base + ".h"
 
+        # Find the first header in the include list whose basename matches
+        header_file = next(
+            (hdr for hdr in input_data.get_include_folders() if os.path.basename(hdr).lower() == header_name.lower()),
+            None
+        )
+        if header_file is None:
+            raise FileNotFoundError(f"Could not find {header_name} in include list")
+        return header_file
+
+    def create_function_task(self, input_data, index, function_name, function_folder, header):
+        """Build the immutable task for one function of an indexed source file.
+        The implementation is sliced from the source's function index; header is a
+        (path, content) pair read once per source file."""
+        exact_implementation = index.get_implementation(function_name)
+
+        header_file, header_content = header
+
+        context = FunctionTaskContext(
+            project_path=input_data.get_input_data(),
+            source_files=tuple(input_data.get_source_files()),
+            include_folders=tuple(input_data.get_include_folders()),
+            function_name=function_name,
+            output_folder=function_folder,
+            include=header_file,
+            source=index.source_file,
+            header_content=header_content,
+            source_content=index.content,
+            implementation_content=exact_implementation,
+        )
+        return FunctionTask(context)
+
+    def task_inputs(self, task):
+        """Hashes of everything a function task is generated from"""
+        return {
+            'source': text_hash(task.get_current_source_content()),
+            'header': text_hash(task.get_current_header_content()),
+            'implementation': text_hash(task.get_current_implementation_content()),
+        }
+
+    def process_function(self, task, checkpoints=None):
+        """Run the per-function state machine on its own task, checkpointing
+        each finished stage and the task's outcome"""
+        sm = StateMachineFunction(task)
+        # Every span of this function's states and subprocesses is tagged with it
+        attrs = {'file': os.path.basename(task.get_current_source()), 'function': task.get_current_function()}
+        if checkpoints is None:
+            with flow.context(**attrs), flow.span(attrs['function'], category="function"):
+                sm.run()
+            return task
+
+        task_id = checkpoints.task_id(task.get_current_output_folder())
+        with flow.context(**attrs), flow.span(attrs['function'], category="function"):
+            statuses = sm.run(lambda stage, status: checkpoints.record_stage(task_id, stage, status))
+        outcome = COMPLETED if statuses and all(s == 'ok' for s in statuses.values()) else 'incomplete'
+        checkpoints.record_outcome(task_id, outcome, self.task_inputs(task), statuses,
+                                   task.get_current_output_folder())
+        return task
 
     def run(self, input_data):
         flow.transition("StateIterateSourceFiles")
@@ -163,14 +194,30 @@ class StateIterateSourceFiles():
         # Define the folder path
         unit_test_coverage_dir = os.path.join("output", "UnitTestCoverage")
     
-        # Check if the folder already exists and remove it along with its contents
-        if os.path.exists(unit_test_coverage_dir):
+        # A resumed run keeps the folder and its checkpoints; otherwise start clean
+        resume = ConfigReader().get_resume()
+        if resume:
+            print(f"[StateIterateSourceFiles] Resuming in {unit_test_coverage_dir}")
+        elif os.path.exists(unit_test_coverage_dir):
             print(f"Removing existing folder: {unit_test_coverage_dir}")
             shutil.rmtree(unit_test_coverage_dir)
     
         # Create the new folder
         print(f"Creating folder: {unit_test_coverage_dir}")
-        os.makedirs(unit_test_coverage_dir)
+        os.makedirs(unit_test_coverage_dir, exist_ok=True)
+        checkpoints = CheckpointStore(unit_test_coverage_dir)
+        records = CoverageRecordStore(unit_test_coverage_dir)
+        skipped = 0
+        rerun = 0
+        # Overloads share a folder; only the first is processed, as before
+        seen_folders = set()
+
+        # Functions are independent (own task, own build folder), so up to
+        # function_workers of them are processed at once. Discovery and folder
+        # creation stay on this thread; 1 worker keeps the sequential behaviour
+        workers = ConfigReader().get_function_workers()
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        futures = []
 
         # Iterate each of the folders in input_data.get_source_files
         for file_path in input_data.get_source_files():
@@ -178,139 +225,91 @@ class StateIterateSourceFiles():
             file_name = os.path.basename(file_path)  # Get file name from the path
             subdirectory_path = os.path.join(unit_test_coverage_dir, file_name)
         
-            # Create the subdirectory
-            if not os.path.exists(subdirectory_path):
-                    print(f"Creating subdirectory: {subdirectory_path}")
-                    os.makedirs(subdirectory_path)
-                # Read the cpp file and store the list of cpp and c functions in a list first. 
-                #cmake_dir = input_data.get_input_data()  # Assuming input_data has a method to get the directory path
-                #for dir in input_data.get_source_files():
-                    # Join cmake_dir with each folder in include_dirs
-                    file_path = file_path.lstrip('/')
-                    cmake_dir = input_data.get_input_data()
-                    sourceFile  = os.path.join(cmake_dir, file_path)#os.path.join(cmake_dir, dir)
-                    # Extract C++/C functions from the source file
-                    functions = self.extract_functions(sourceFile)
-
-                    # Print the found functions (or do other processing)
-                    for function in functions:
-                        # Check if the function name contains '::' (class::function)
-                        if '::' in function['function_name']:
-                            # Extract class name and function name
-                            class_name, func_name = function['function_name'].split('::')
-        
-                            # Generate the folder path for the class and function
-                            class_folder = os.path.join(subdirectory_path, class_name)
-                            function_folder = os.path.join(class_folder, func_name)
-
-                            # Create the folder for the function inside the class folder
-                            if not os.path.exists(function_folder):
-                                print(f"Creating folder for function: {function_folder}")
-                                os.makedirs(function_folder)
-                                print(self.extract_function_implementation(sourceFile, function['function_name']))
-                                print(self.extract_function_implementation(sourceFile, function['function_name']))
-                                exact_implementation = self.extract_function_implementation(sourceFile, function['function_name'])
-
-                                # 1. Your existing source file path
-                                source_file = sourceFile
-
-                                # 2. Derive the expected header filename (SampleApp.h)
-                                base = os.path.splitext(os.path.basename(source_file))[0]
-                                header_name = base + ".h"
-
-                                # 3. Get the list of all header file paths
-                                all_headers = input_data.get_include_folders()
-
-                                # 4. Find the first header whose basename matches
-                                header_file = next(
-                                    (hdr for hdr in all_headers if os.path.basename(hdr).lower() == header_name.lower()),
-                                    None
-                                )
-                                if header_file is None:
-                                    raise FileNotFoundError(f"Could not find {header_name} in include list")
-
-                                source_content = ""
-                                header_content = ""
-
-                                # 5. Read both files into variables
-                                with open(source_file, 'r', encoding='utf-8') as f:
-                                    source_content = f.read()
-
-                                with open(header_file, 'r', encoding='utf-8') as f:
-                                    header_content = f.read()
-
-                                # Now source_content and header_content contain the full text of each file
-                                # ——— now, if you only want the two filenames (no path) ———
-                                cpp_filename  = os.path.basename(source_file)   # → "SampleApp.cpp"
-                                h_filename    = os.path.basename(header_file)   # → "SampleApp.h"
-
-                                query = input_data
-                                query.set_current_output_folder(function_folder)
-                                query.set_current_include(header_file)
-                                query.set_current_source(source_file)
-                                query.set_current_header_content(header_content)
-                                query.set_current_source_content(source_content)
-                                query.set_current_implementation_content(exact_implementation)
-                                
-                                sm = StateMachineFunction(query)
-                                sm.run()
-                        else:
-                            # If it's just a function name (no class), create a folder for the function
-                            function_folder = os.path.join(subdirectory_path, function['function_name'])
+            # Create the subdirectory (already there when resuming)
+            print(f"Creating subdirectory: {subdirectory_path}")
+            os.makedirs(subdirectory_path, exist_ok=True)
+            # Read the cpp file and store the list of cpp and c functions in a list first. 
+            #cmake_dir = input_data.get_input_data()  # Assuming input_data has a method to get the directory path
+            #for dir in input_data.get_source_files():
+            # Join cmake_dir with each folder in include_dirs
+            file_path = file_path.lstrip('/')
+            cmake_dir = input_data.get_input_data()
+            sourceFile  = os.path.join(cmake_dir, file_path)#os.path.join(cmake_dir, dir)
+
+            # Index the source once: every function below slices its
+            # implementation from this instead of re-reading the file
+            index = SourceFunctionIndex(sourceFile)
+            header = None
+
+            # Extract C++/C functions from the source file
+            functions = self.extract_functions(sourceFile, index.content)
+
+            # Print the found functions (or do other processing)
+            for function in functions:
+                # Check if the function name contains '::' (class::function)
+                if '::' in function['function_name']:
+                    # Extract class name and function name
+                    class_name, func_name = function['function_name'].split('::')
         
-                            # Create the folder for the function if it doesn't exist
-                            if not os.path.exists(function_folder):
-                                print(f"Creating folder for function: {function_folder}")
-                                os.makedirs(function_folder)
-                                print(self.extract_function_implementation(sourceFile, function['function_name']))
-                                exact_implementation = self.extract_function_implementation(sourceFile, function['function_name'])
-
-                                # 1. Your existing source file path
-                                source_file = sourceFile
-
-                                # 2. Derive the expected header filename (SampleApp.h)
-                                base = os.path.splitext(os.path.basename(source_file))[0]
-                                header_name = base + ".h"
-
-                                # 3. Get the list of all header file paths
-                                all_headers = input_data.get_include_folders()
-
-                                # 4. Find the first header whose basename matches
-                                header_file = next(
-                                    (hdr for hdr in all_headers if os.path.basename(hdr).lower() == header_name.lower()),
-                                    None
-                                )
-                                if header_file is None:
-                                    raise FileNotFoundError(f"Could not find {header_name} in include list")
-
-                                source_content = ""
-                                header_content = ""
-
-                                # 5. Read both files into variables
-                                with open(source_file, 'r', encoding='utf-8') as f:
-                                    source_content = f.read()
-
-                                with open(header_file, 'r', encoding='utf-8') as f:
-                                    header_content = f.read()
-
-                                # Now source_content and header_content contain the full text of each file
-                                # ——— now, if you only want the two filenames (no path) ———
-                                cpp_filename  = os.path.basename(source_file)   # → "SampleApp.cpp"
-                                h_filename    = os.path.basename(header_file)   # → "SampleApp.h"
-
-                                query = input_data
-                                query.set_current_output_folder(function_folder)
-                                query.set_current_include(header_file)
-                                query.set_current_source(source_file)
-                                query.set_current_header_content(header_content)
-                                query.set_current_source_content(source_content)
-                                query.set_current_implementation_content(exact_implementation)
-                                
-                                sm = StateMachineFunction(query)
-                                sm.run()
+                    # Generate the folder path for the class and function
+                    class_folder = os.path.join(subdirectory_path, class_name)
+                    function_folder = os.path.join(class_folder, func_name)
+                else:
+                    # If it's just a function name (no class), create a folder for the function
+                    function_folder = os.path.join(subdirectory_path, function['function_name'])
+
+                if function_folder in seen_folders:
+                    continue
+                seen_folders.add(function_folder)
+
+                # Header is located and read once per source file
+                if header is None:
+                    header_file = self.find_header_file(sourceFile, input_data)
+                    with open(header_file, 'r', encoding='utf-8') as f:
+                        header = (header_file, f.read())
+
+                task = self.create_function_task(input_data, index, function['function_name'],
+                                                 function_folder, header)
+
+                # Skip exactly the work a previous run completed; anything
+                # failed or interrupted starts again from an empty folder
+                task_id = checkpoints.task_id(function_folder)
+                if resume and checkpoints.is_complete(task_id, self.task_inputs(task), function_folder):
+                    print(f"[StateIterateSourceFiles] Already completed, skipping: {task_id}")
+                    skipped += 1
+                    continue
+                if os.path.exists(function_folder):
+                    shutil.rmtree(function_folder)
+                if resume and records.exists():
+                    # The previous run's record must not outlive its folder
+                    records.remove(*records.function_names(function_folder))
+                print(f"Creating folder for function: {function_folder}")
+                os.makedirs(function_folder)
+                rerun += 1
+
+                if executor is None:
+                    self.process_function(task, checkpoints)
+                else:
+                    futures.append(executor.submit(self.process_function, task, checkpoints))
+
+        if executor is not None:
+            print(f"[StateIterateSourceFiles] Waiting for {len(futures)} functions ({workers} workers)...")
+            try:
+                # In submission order, so the first failure raised is deterministic
+                for future in futures:
+                    future.result()
+            finally:
+                executor.shutdown(wait=True)
 
     
         print(f"[StateIterateSourceFiles] Completed processing {unit_test_coverage_dir}.")
+        if resume:
+            print(f"[StateIterateSourceFiles] Resume: {skipped} completed functions skipped, {rerun} run")
+        print(f"[StateIterateSourceFiles] {get_response_cache().stats()}")
+        print(f"[StateIterateSourceFiles] {prompt_stats.summary()}")
+        print(f"[StateIterateSourceFiles] {get_mock_store().stats()}")
+        print(telemetry.summary())
+        print(f"[StateIterateSourceFiles] LLM telemetry written to {telemetry.write_json()}")
 
         return True, input_data # Continue to coverage report generation
 
@@ -1,3 +1,5 @@
+import os
+
 from .StateInit import StateInit
 from .StateEnd import StateEnd
 from .StateParseCMake import StateParseCMake
@@ -6,6 +8,7 @@ from .StateAggregateCoverageReports import StateAggregateCoverageReports
 from ..ConfigReader import ConfigReader
 from ..flow_manager import flow
 from ..OutputManager import OutputManager
+from ..dag_pipeline import DagPipeline, Stage
 
 class StateMachine:
     def __init__(self, input_data):
@@ -22,33 +25,36 @@ class StateMachine:
         self.input_data = input_data
         self.configReader = ConfigReader()
         self.outputManager = OutputManager()
+        # Each state declares what it consumes and produces; the pipeline
+        # derives the order. Every state here needs the one before it, so they
+        # run in sequence - the concurrency is per function, inside
+        # StateIterateSourceFiles and its per-function mock stages.
+        self.pipeline = DagPipeline([
+            Stage("init", self.states["init"], outputs=["project"]),
+            Stage("StateParseCMake", self.states["StateParseCMake"],
+                  inputs=["project"], outputs=["source_files"]),
+            # Per-function test generation, compilation and coverage measurement
+            Stage("StateIterateSourceFiles", self.states["StateIterateSourceFiles"],
+                  inputs=["source_files"], outputs=["function_coverage"]),
+            Stage("StateAggregateCoverageReports", self.states["StateAggregateCoverageReports"],
+                  inputs=["function_coverage"], outputs=["coverage_report"]),
+        ])
     
     def run(self):
+        """Run the workflow; returns the status of each stage"""
         flow.set_initial("init")
         
         # Prepare output directory before starting
         self.outputManager.prepare_output_directory()
         
-        while self.current_state != "end":
-            proceed, input_data = self.states[self.current_state].run(self.input_data)
-            self.input_data = input_data
-            
-            if self.current_state == "init":
-                self.current_state = "StateParseCMake" if proceed else "end"
-            elif self.current_state == "StateParseCMake":
-                self.current_state = "StateIterateSourceFiles" if proceed else "end"
-            elif self.current_state == "StateIterateSourceFiles":
-                # After iterating all source files and functions (which now includes 
-                # per-function test generation, compilation, and coverage measurement),
-                # aggregate all the coverage reports
-                self.current_state = "StateAggregateCoverageReports" if proceed else "end"
-            elif self.current_state == "StateAggregateCoverageReports":
-                self.current_state = "end" if proceed else "end"
-            elif self.current_state == "end":
-                proceed, input_data = self.states[self.current_state].run(self.input_data)
-                break
+        statuses, outputs = self.pipeline.run(self.input_data)
+        self.input_data = self.pipeline.last_output(outputs, self.input_data)
+        self.current_state = "end"
         
         # Clean up temporary files after completion
         self.outputManager.cleanup_temporary_files()
         
         flow.set_initial("end")
+        trace_file = flow.export_chrome_trace(os.path.join(self.configReader.get_output_directory(), "flow_trace.json"))
+        print(f"Timing trace written to {trace_file} (open in ui.perfetto.dev or chrome://tracing)")
+        return statuses
@@ -1,19 +1,33 @@
 """
 StateCompileFunctionTest - Compile the generated test with retry logic
+
+Failed compiles are fixed either serially (one regenerated test per retry)
+or speculatively: with speculative_candidates > 1 each retry round requests
+that many fixes at different temperatures/seeds, compiles them in parallel
+in their own build folders and keeps the first one that compiles and passes.
 """
 
 from ...flow_manager import flow
+from ...run_profiler import profiler, tool_name
 from ...OllamaClient import OllamaClient
 from ...ConfigReader import ConfigReader
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import shutil
 import subprocess
-import json
+import threading
+import time
+
+class CompileCancelled(Exception):
+    """A speculative candidate was abandoned because another one won"""
+
 
 class StateCompileFunctionTest():
     def __init__(self):
         self.client = OllamaClient()
         self.configReader = ConfigReader()
         self.max_retries = 3
+        self.candidates = self.configReader.get_speculative_candidates()
         print("Initializing [States_Function::StateCompileFunctionTest]")
 
     def run(self, input_data):
@@ -27,6 +41,9 @@ class StateCompileFunctionTest():
             print("[StateCompileFunctionTest] No test file found!")
             return False, input_data
         
+        if self.candidates > 1:
+            return self._run_speculative(input_data, test_file, output_folder)
+
         # Try to compile, retry with error feedback if it fails
         retry_count = 0
         compilation_successful = False
@@ -68,15 +85,184 @@ class StateCompileFunctionTest():
             print(f"[StateCompileFunctionTest] ❌ Failed to compile after {self.max_retries} attempts")
             return False, input_data
 
-    def _compile_test(self, test_file, output_folder, input_data):
-        """Compile the test file with coverage flags"""
+    def _run_speculative(self, input_data, test_file, output_folder):
+        """Compile the test; on failure run rounds of parallel fix candidates"""
+        print(f"\n[StateCompileFunctionTest] Compilation attempt 1/{self.max_retries}")
+        success, error_output = self._compile_test(test_file, output_folder, input_data)
+        if success:
+            print("[StateCompileFunctionTest] ✅ Compilation successful!")
+            return True, input_data
+
+        for retry_count in range(1, self.max_retries):
+            print(f"[StateCompileFunctionTest] ❌ Compilation failed, requesting {self.candidates} "
+                  f"candidate fixes in parallel (round {retry_count}/{self.max_retries - 1})")
+            start = time.perf_counter()
+            winner, error_output = self._race_candidates(input_data, test_file, output_folder,
+                                                         error_output, retry_count)
+            if winner is None:
+                continue
+
+            index, code, executable, passed = winner
+            with open(test_file, 'w', encoding='utf-8') as f:
+                f.write(code)
+            input_data.set_generated_code(code)
+            input_data.set_generated_ut_file(executable)
+            outcome = "compiles and passes" if passed else "compiles (tests fail)"
+            print(f"[StateCompileFunctionTest] ✅ Candidate {index} {outcome} "
+                  f"after {time.perf_counter() - start:.1f}s")
+            return True, input_data
+
+        print(f"[StateCompileFunctionTest] ❌ No candidate compiled after {self.max_retries - 1} rounds")
+        return False, input_data
+
+    def _race_candidates(self, input_data, test_file, output_folder, error_output, retry_count):
+        """Generate and compile candidate fixes concurrently.
+
+        Returns (winner, error_output): winner is (index, code, executable,
+        passed) for the first candidate that compiles and passes, else for the
+        lowest-numbered one that compiled, else None with the compiler error
+        of a failed candidate to feed into the next round."""
+        cancel = threading.Event()
+        compiled = []
+        errors = []
+        winner = None
+        executor = ThreadPoolExecutor(max_workers=self.candidates)
+        try:
+            futures = [executor.submit(self._try_candidate, input_data, test_file, output_folder, error_output,
+                                       retry_count, index, cancel)
+                       for index in range(self.candidates)]
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    continue
+                index, code, executable, passed, error = result
+                if error:
+                    errors.append((index, error))
+                    print(f"[StateCompileFunctionTest] Candidate {index} does not compile")
+                elif passed:
+                    winner = (index, code, executable, True)
+                    cancel.set()
+                    break
+                else:
+                    print(f"[StateCompileFunctionTest] Candidate {index} compiles but its tests fail")
+                    compiled.append((index, code, executable, False))
+        finally:
+            # Losers stop at their next check (their model streams are closed
+            # at once); waiting for them would delay the winner
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if winner is None and compiled:
+            winner = min(compiled)
+        # Keep only the winner's build folder
+        for index in range(self.candidates):
+            if winner is None or index != winner[0]:
+                shutil.rmtree(self._candidate_dir(output_folder, index), ignore_errors=True)
+        if winner is None and errors:
+            error_output = min(errors)[1]
+        return winner, error_output
+
+    def _candidate_dir(self, output_folder, index):
+        return os.path.join(output_folder, f"build_candidate{index}")
+
+    def _candidate_options(self, index, retry_count):
+        """Sampling options that make each candidate a different attempt"""
+        spread = index / (self.candidates - 1) if self.candidates > 1 else 0.0
+        return {"temperature": round(0.2 + 0.6 * spread, 2), "seed": retry_count * 1000 + index}
+
+    def _try_candidate(self, input_data, test_file, output_folder, error_output, retry_count, index, cancel):
+        """Generate, compile and run one candidate in its own build folder.
+        Returns (index, code, executable, passed, error), or None if cancelled
+        (its build folder is then removed)."""
+        code = self._regenerate_test_with_error(input_data, error_output, retry_count,
+                                                options=self._candidate_options(index, retry_count),
+                                                cancel=cancel)
+        if cancel.is_set() or not code:
+            return None
+
+        build_dir = self._candidate_dir(output_folder, index)
+        shutil.rmtree(build_dir, ignore_errors=True)
+        os.makedirs(build_dir, exist_ok=True)
+        candidate_file = os.path.join(build_dir, os.path.basename(test_file))
+        with open(candidate_file, 'w', encoding='utf-8') as f:
+            f.write(code)
+
+        try:
+            success, error = self._compile_test(candidate_file, output_folder, input_data,
+                                                build_dir=build_dir, cancel=cancel)
+            executable = os.path.join(build_dir, "test_executable")
+            passed = success and self._passes(executable, build_dir, cancel)
+        except CompileCancelled:
+            passed = success = None
+        if cancel.is_set():
+            # The race is over without this candidate; nobody cleans up after it
+            shutil.rmtree(build_dir, ignore_errors=True)
+            return None
+        if not success:
+            return index, code, executable, False, error or "compilation failed"
+        return index, code, executable, passed, None
+
+    def _passes(self, executable, build_dir, cancel):
+        """Whether the candidate's tests pass; its coverage counters are reset afterwards"""
+        try:
+            returncode, _, _ = self._run_cancellable([executable], build_dir, 30, cancel)
+        except (CompileCancelled, subprocess.TimeoutExpired, OSError):
+            return False
+        finally:
+            # The measure state runs the executable again from zero
+            for root, dirs, files in os.walk(build_dir):
+                for file in files:
+                    if file.endswith('.gcda'):
+                        os.remove(os.path.join(root, file))
+        return returncode == 0
+
+    def _run_cancellable(self, cmd, cwd, timeout, cancel=None):
+        """subprocess.run that also stops when cancel is set.
+        Returns (returncode, stdout, stderr)."""
+        with flow.span(os.path.basename(cmd[0]), category="subprocess", cwd=cwd):
+            return self._run_process(cmd, cwd, timeout, cancel)
+
+    def _run_process(self, cmd, cwd, timeout, cancel):
+        if cancel is None:
+            result = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, timeout=timeout)
+            return result.returncode, result.stdout, result.stderr
+
+        proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        start = time.monotonic()
+        deadline = start + timeout
+        try:
+            return self._wait_process(proc, cmd, timeout, deadline, cancel)
+        finally:
+            profiler.record_tool(tool_name(cmd), time.monotonic() - start, proc.returncode == 0)
+
+    def _wait_process(self, proc, cmd, timeout, deadline, cancel):
+        while True:
+            try:
+                stdout, stderr = proc.communicate(timeout=0.2)
+                return proc.returncode, stdout, stderr
+            except subprocess.TimeoutExpired:
+                if cancel.is_set() or time.monotonic() > deadline:
+                    proc.kill()
+                    proc.communicate()
+                    if cancel.is_set():
+                        raise CompileCancelled()
+                    raise subprocess.TimeoutExpired(cmd, timeout)
+
+    def _compile_test(self, test_file, output_folder, input_data, build_dir=None, cancel=None):
+        """Compile the test file with coverage flags.
+
+        build_dir defaults to the function's build folder, whose executable is
+        recorded as the generated test; speculative candidates pass their own
+        folder and a cancel event, and nothing is recorded."""
         
         # Get project information
         project_path = input_data.get_input_data()
         source_file = input_data.get_current_source()
         
         # Create a temporary build directory for this function test
-        build_dir = os.path.join(output_folder, "build")
+        record_executable = build_dir is None
+        if build_dir is None:
+            build_dir = os.path.join(output_folder, "build")
         os.makedirs(build_dir, exist_ok=True)
         
         # Prepare compilation command
@@ -142,24 +328,21 @@ class StateCompileFunctionTest():
         print(f"[StateCompileFunctionTest] Compile command: {' '.join(compile_cmd)}")
         
         try:
-            result = subprocess.run(
-                compile_cmd,
-                cwd=build_dir,
-                capture_output=True,
-                text=True,
-                timeout=60
-            )
+            returncode, stdout, stderr = self._run_cancellable(compile_cmd, build_dir, 60, cancel)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print(f"[StateCompileFunctionTest] Executable created: {executable}")
                 # Store executable path for coverage state
-                input_data.set_generated_ut_file(executable)
+                if record_executable:
+                    input_data.set_generated_ut_file(executable)
                 return True, ""
             else:
-                error_msg = result.stderr if result.stderr else result.stdout
+                error_msg = stderr if stderr else stdout
                 print(f"[StateCompileFunctionTest] Compilation error:\n{error_msg}")
                 return False, error_msg
                 
+        except CompileCancelled:
+            raise
         except subprocess.TimeoutExpired:
             print("[StateCompileFunctionTest] Compilation timed out")
             return False, "Compilation timed out after 60 seconds"
@@ -167,8 +350,9 @@ class StateCompileFunctionTest():
             print(f"[StateCompileFunctionTest] Compilation exception: {e}")
             return False, str(e)
 
-    def _regenerate_test_with_error(self, input_data, error_output, retry_count):
-        """Regenerate test with compilation error feedback"""
+    def _regenerate_test_with_error(self, input_data, error_output, retry_count, options=None, cancel=None):
+        """Regenerate test with compilation error feedback; options (temperature,
+        seed) and cancel are passed to the model for speculative candidates"""
         
         print("[StateCompileFunctionTest] Asking LLM to fix compilation errors...")
         
@@ -227,20 +411,12 @@ Generate ONLY the corrected C++ test code, no explanations:
 """
         
         try:
-            response_str = self.client.query(self.configReader.get_gtest_model(), prompt)
-            
-            # Parse response
-            response_text = ""
-            responses = response_str.strip().split("\n")
-            
-            for resp in responses:
-                try:
-                    response_json = json.loads(resp)
-                    if not response_json.get("done", False):
-                        response_text += response_json.get("response", "")
-                except json.JSONDecodeError:
-                    continue
-            
+            response_text = self.client.generate(self.configReader.get_gtest_model(), prompt,
+                                                 options=options, cancel=cancel,
+                                                 site="StateCompileFunctionTest")
+            if cancel is not None and cancel.is_set():
+                return None
+
             # Clean the code
             cleaned_code = self._clean_test_code(response_text)
             return cleaned_code
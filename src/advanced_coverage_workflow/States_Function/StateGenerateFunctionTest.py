@@ -6,8 +6,8 @@ from ...flow_manager import flow
 from ...OllamaClient import OllamaClient
 from ...ConfigReader import ConfigReader
 from ...CodeWriter import CodeWriter
+from ...prompt_context import get_symbol_index, function_context
 import os
-import json
 
 class StateGenerateFunctionTest():
     def __init__(self):
@@ -29,6 +29,18 @@ class StateGenerateFunctionTest():
         function_name = self._extract_function_name(function_implementation)
         
         print(f"[StateGenerateFunctionTest] Generating test for function: {function_name}")
+
+        # Only the declarations this function uses, not the whole files
+        index = get_symbol_index(input_data.get_include_folders())
+        header_content, source_content = function_context(
+            index,
+            input_data.get_current_function(),
+            function_implementation,
+            input_data.get_current_include(),
+            header_content,
+            source_content,
+            self.configReader.get_prompt_token_budget()
+        )
         
         # Create prompt for test generation
         prompt = self._create_test_generation_prompt(
@@ -41,21 +53,10 @@ class StateGenerateFunctionTest():
         
         # Query LLM for test generation
         try:
-            response_str = self.client.query(self.configReader.get_gtest_model(), prompt)
-            
-            # Parse response
-            response_text = ""
-            responses = response_str.strip().split("\n")
-            
-            for resp in responses:
-                try:
-                    response_json = json.loads(resp)
-                    if not response_json.get("done", False):
-                        response_text += response_json.get("response", "")
-                        print(response_json.get("response", ""), end="")
-                except json.JSONDecodeError:
-                    continue
-            
+            # Stream the test, stopping once the code is complete
+            response_text = self.client.generate(self.configReader.get_gtest_model(), prompt, echo=True,
+                                                site="StateGenerateFunctionTest")
+
             # Clean and format the test code
             test_code = self._clean_test_code(response_text)
             
@@ -1,5 +1,5 @@
 
-from .StatesCreateMock import StatesCreateMock
+from .StatesCreateMock import StatesCreateMock, scan_includes
 from .StateGenerateFunctionTest import StateGenerateFunctionTest
 from .StateCompileFunctionTest import StateCompileFunctionTest
 from .StateMeasureFunctionCoverage import StateMeasureFunctionCoverage
@@ -7,6 +7,7 @@ from .StateEnd import StateEnd
 
 from ...ConfigReader import ConfigReader
 from ...flow_manager import flow
+from ...dag_pipeline import DagPipeline, Stage
 
 class StateMachine:
     def __init__(self, input_data):
@@ -22,26 +23,33 @@ class StateMachine:
         self.current_state = "StatesCreateMock"
         self.input_data = input_data
         self.configReader = ConfigReader()
+        # One mock stage per included header: the mocks are independent, so
+        # they are generated concurrently. Without includes the single mock
+        # stage stops the function, as there is nothing to test against.
+        includes = scan_includes(input_data)
+        mock_stages = [Stage(f"StatesCreateMock[{inc}]", StatesCreateMock(inc), outputs=[f"mock_headers/{inc}"])
+                       for inc in includes]
+        if not mock_stages:
+            mock_stages = [Stage("StatesCreateMock", self.states["StatesCreateMock"], outputs=["mock_headers"])]
+        self.pipeline = DagPipeline(mock_stages + [
+            # The test prompt lists the mock headers that were generated
+            Stage("StateGenerateFunctionTest", self.states["StateGenerateFunctionTest"],
+                  inputs=[artifact for stage in mock_stages for artifact in stage.outputs],
+                  outputs=["test_source"]),
+            Stage("StateCompileFunctionTest", self.states["StateCompileFunctionTest"],
+                  inputs=["test_source"], outputs=["test_executable"]),
+            Stage("StateMeasureFunctionCoverage", self.states["StateMeasureFunctionCoverage"],
+                  inputs=["test_executable"], outputs=["coverage_data"]),
+        ])
     
-    def run(self):
-        flow.set_initial("init")
-        while self.current_state != "end":
-            proceed, input_data = self.states[self.current_state].run(self.input_data)
-            self.input_data = input_data
-            
-            if self.current_state == "StatesCreateMock":
-                # After creating mocks, generate the unit test
-                self.current_state = "StateGenerateFunctionTest" if proceed else "end"
-            elif self.current_state == "StateGenerateFunctionTest":
-                # After generating test, try to compile it
-                self.current_state = "StateCompileFunctionTest" if proceed else "end"
-            elif self.current_state == "StateCompileFunctionTest":
-                # After successful compilation, measure coverage
-                self.current_state = "StateMeasureFunctionCoverage" if proceed else "end"
-            elif self.current_state == "StateMeasureFunctionCoverage":
-                # After coverage measurement, we're done
-                self.current_state = "end" if proceed else "end"
-            elif self.current_state == "end":
-                proceed, input_data = self.states[self.current_state].run(self.input_data)
-                break
-        flow.set_initial("end")
+    def run(self, on_stage=None):
+        """Run the function's stages; returns the status of each stage.
+        on_stage(name, status) is called as each stage finishes."""
+        # Nested, so the enclosing StateIterateSourceFiles span stays open
+        with flow.nested():
+            flow.set_initial("init")
+            statuses, outputs = self.pipeline.run(self.input_data, on_stage)
+            self.input_data = self.pipeline.last_output(outputs, self.input_data)
+            self.current_state = "end"
+            flow.set_initial("end")
+        return statuses
@@ -4,6 +4,7 @@ StateMeasureFunctionCoverage - Measure coverage for a specific function test
 
 from ...flow_manager import flow
 from ...ConfigReader import ConfigReader
+from ...CoverageRecordStore import CoverageRecordStore
 import os
 import subprocess
 import json
@@ -24,7 +25,8 @@ class StateMeasureFunctionCoverage():
             print("[StateMeasureFunctionCoverage] No executable found!")
             return False, input_data
         
-        build_dir = os.path.join(output_folder, "build")
+        # The executable sits in the build folder it was compiled in
+        build_dir = os.path.dirname(executable)
         
         # Step 1: Run the test executable to generate .gcda files
         success = self._run_test_executable(executable, build_dir)
@@ -42,6 +44,9 @@ class StateMeasureFunctionCoverage():
         # Step 4: Save coverage summary to file
         self._save_coverage_summary(output_folder, coverage_data)
         
+        # Step 5: Append structured record for aggregation
+        self._save_coverage_record(output_folder, coverage_data)
+        
         # Store coverage data for aggregation later
         input_data.set_coverage_data(coverage_data)
         
@@ -55,13 +60,14 @@ class StateMeasureFunctionCoverage():
         print(f"[StateMeasureFunctionCoverage] Running test: {executable}")
         
         try:
-            result = subprocess.run(
-                [executable],
-                cwd=build_dir,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+            with flow.span("run test", category="subprocess", executable=executable):
+                result = subprocess.run(
+                    [executable],
+                    cwd=build_dir,
+                    capture_output=True,
+                    text=True,
+                    timeout=30
+                )
             
             print("[StateMeasureFunctionCoverage] Test output:")
             print(result.stdout)
@@ -109,12 +115,13 @@ class StateMeasureFunctionCoverage():
             
             # Run gcov
             gcov_cmd = [self.configReader.get_gcov_tool(), "-b", "-c"] + gcda_files
-            result = subprocess.run(
-                gcov_cmd,
-                cwd=build_dir,
-                capture_output=True,
-                text=True
-            )
+            with flow.span("gcov", category="subprocess", files=len(gcda_files)):
+                result = subprocess.run(
+                    gcov_cmd,
+                    cwd=build_dir,
+                    capture_output=True,
+                    text=True
+                )
             
             if result.returncode == 0:
                 # Parse gcov output
@@ -209,7 +216,8 @@ class StateMeasureFunctionCoverage():
                 "--ignore-errors", "gcov,source"
             ]
             
-            result = subprocess.run(lcov_cmd, capture_output=True, text=True)
+            with flow.span("lcov", category="subprocess"):
+                result = subprocess.run(lcov_cmd, capture_output=True, text=True)
             
             if result.returncode == 0:
                 # Generate HTML report
@@ -219,7 +227,8 @@ class StateMeasureFunctionCoverage():
                     "--output-directory", html_dir
                 ]
                 
-                result = subprocess.run(genhtml_cmd, capture_output=True, text=True)
+                with flow.span("genhtml", category="subprocess"):
+                    result = subprocess.run(genhtml_cmd, capture_output=True, text=True)
                 
                 if result.returncode == 0:
                     coverage_data["html_report"] = html_dir
@@ -258,3 +267,33 @@ class StateMeasureFunctionCoverage():
             
         except Exception as e:
             print(f"[StateMeasureFunctionCoverage] Error saving summary: {e}")
+
+    def _save_coverage_record(self, output_folder, coverage_data):
+        """Append a structured coverage record to the run's record stream"""
+        
+        store = CoverageRecordStore(os.path.join("output", "UnitTestCoverage"))
+        
+        # output_folder is <coverage_root>/<source_file>/<function...>
+        names = store.function_names(output_folder)
+        if names is None:
+            print(f"[StateMeasureFunctionCoverage] Not a function folder, skipping record: {output_folder}")
+            return
+        
+        html_report = coverage_data.get("html_report")
+        record = {
+            "source_file": names[0],
+            "function_name": names[1],
+            "function_path": output_folder,
+            "coverage_percentage": coverage_data.get("coverage_percentage", 0.0),
+            "lines_covered": coverage_data.get("lines_covered", 0),
+            "lines_total": coverage_data.get("lines_total", 0),
+            "functions_covered": coverage_data.get("functions_covered", 0),
+            "functions_total": coverage_data.get("functions_total", 0),
+            "has_html_report": bool(html_report),
+            "html_report": html_report
+        }
+        
+        try:
+            store.append(record)
+        except Exception as e:
+            print(f"[StateMeasureFunctionCoverage] Error saving coverage record: {e}")
@@ -4,67 +4,111 @@ from ...Query import Query
 from ...OllamaClient import OllamaClient
 from ...ConfigReader import ConfigReader
 from ...CodeWriter import CodeWriter
+from ...prompt_context import get_symbol_index, mock_context
+from ...mock_store import get_mock_store
 import os
 import re
-import json
+
+INCLUDE_RE = re.compile(r'^\s*#include\s*"([^"]+)"')
+
+
+def scan_includes(input_data):
+    """User headers included by the function's header and source, except the header itself"""
+    header_file = input_data.get_current_include()
+    source_file = input_data.get_current_source()
+    h_filename = os.path.basename(header_file)   # → "SampleApp.h"
+
+    # scan both header and source
+    includes = []
+    for path in (header_file, source_file):
+        with open(path, 'r') as f:
+            for line in f:
+                m = INCLUDE_RE.match(line)
+                if m:
+                    includes.append(m.group(1))
+
+    # drop the header itself if present
+    return list(dict.fromkeys(inc for inc in includes if inc != h_filename))
+
 
 class StatesCreateMock():
-    def __init__(self):
+    def __init__(self, include=None):
+        """include: the one header this state mocks; None mocks every include"""
+        self.include = include
         self.client = OllamaClient()
         self.configReader = ConfigReader()
         print("Initializing [States_Function::StateCreateMock]")
 
     def run(self, input_data):
-        flow.transition("States_Function::StateCreateMock")
-        print("[StateCreateMock] Reached StateCreateMock state.")
-
-        header_file = input_data.get_current_include() 
-        source_file = input_data.get_current_source() 
-        h_filename = os.path.basename(header_file)   # → "SampleApp.h"
-
-        # compile once
-        include_re = re.compile(r'^\s*#include\s*"([^"]+)"')
-
-        # scan both header and source
-        includes = []
-        for path in (header_file, source_file):
-            with open(path, 'r') as f:
-                for line in f:
-                    m = include_re.match(line)
-                    if m:
-                        includes.append(m.group(1))
-
-        # drop the header itself if present
-        includes = [inc for inc in includes if inc != h_filename]
-
-        # only iterate if we found any includes
-        if includes:
+        # Mock stages may run on pipeline worker threads: nested() ends this
+        # thread's state span once the mock is installed
+        with flow.nested():
+            flow.transition("States_Function::StateCreateMock", include=self.include,
+                            file=os.path.basename(input_data.get_current_source()),
+                            function=input_data.get_current_function())
+            print("[StateCreateMock] Reached StateCreateMock state.")
+
+            includes = [self.include] if self.include else scan_includes(input_data)
+            if not includes:
+                print("No user headers found to process.")
+                return False, None # Stop state machine
+
             for inc in includes:
-                # → replace this with whatever you need to do per include
                 print(f"Found include: {inc}")
-                
-                modelused = self.configReader.get_codegen_model()
-                query = "Generate the following mock header file, without explanation and using pragma once using the following filename: " + \
-                    inc + ".\n Use structures and not classes, and only create namespaces when neccessary. Create a mock so that the following source file can compile, \n\n" + input_data.get_current_source_content().replace('\ufeff', '') +\
-                    "\n\n and header file using it: \n\n" + input_data.get_current_header_content().replace('\ufeff', '')
-                response_str = self.client.query(self.configReader.get_codegen_model(), query)
-                # Split multiple JSON objects and process them separately
-                responses = response_str.strip().split("\n")
-
-                response_text = ""
-                for resp in responses:
-                    response_json = json.loads(resp)
-                    if not response_json["done"]:  # Only process responses where "done" is false
-                        print(response_json["response"], end="")  # Print without newline
-                        # Extract response
-                        response_text += (response_json["response"])
-                
-                codeWriter = CodeWriter(input_data, response_text, input_data.get_current_output_folder())
-                name_without_ext, _ = os.path.splitext(inc)
-                codeWriter.set_class_name(name_without_ext)
-                filename = codeWriter.process_code(True, )
-                return True, input_data
+                self._create_mock(input_data, inc)
+        return True, input_data
+
+    def _create_mock(self, input_data, inc):
+        """Install the mock of inc in the function's output folder"""
+        header_content = input_data.get_current_header_content().replace('\ufeff', '')
+        source_content = input_data.get_current_source_content().replace('\ufeff', '')
+
+        # Generated once per include and consuming file, then shared
+        # by every function of the file
+        store = get_mock_store(self.configReader.get_gcc_compiler())
+        include_dirs = sorted({os.path.dirname(h) for h in input_data.get_include_folders()})
+        # The real header, resolved by file name as mock_context does
+        include_path = next((h for h in input_data.get_include_folders()
+                             if os.path.basename(h).lower() == os.path.basename(inc).lower()), None)
+        queries = {}
+
+        def generate(entry_dir, errors, fresh):
+            file_name, queries[file_name] = self._generate_mock(input_data, inc, header_content, source_content,
+                                                                entry_dir, errors, fresh)
+            return file_name
+
+        def discard(file_name):
+            # A mock that does not compile must not come back from the response cache
+            self.client.forget(self.configReader.get_codegen_model(), queries[file_name])
+
+        mock_path = store.get_or_create(inc, header_content, source_content, generate, include_dirs,
+                                        include_path, discard)
+        store.install(mock_path, input_data.get_current_output_folder())
+
+    def _generate_mock(self, input_data, inc, header_content, source_content, directory, errors=None,
+                       fresh=False):
+        """Ask the codegen model for a mock of inc and write it to directory;
+        returns the file name and the prompt. fresh skips cached responses."""
+        # Prefer the real header's used declarations over the whole files
+        context = mock_context(get_symbol_index(input_data.get_include_folders()), inc,
+                               header_content, source_content,
+                               self.configReader.get_prompt_token_budget())
+        if context:
+            declarations, usages = context
+            query = "Generate the following mock header file, without explanation and using pragma once using the following filename: " + \
+                inc + ".\n Use structures and not classes, and only create namespaces when neccessary. The mock must provide these declarations of the real header: \n\n" + declarations + \
+                "\n\n so that the following lines that use them can compile: \n\n" + usages
         else:
-            print("No user headers found to process.")
+            query = "Generate the following mock header file, without explanation and using pragma once using the following filename: " + \
+                inc + ".\n Use structures and not classes, and only create namespaces when neccessary. Create a mock so that the following source file can compile, \n\n" + source_content +\
+                "\n\n and header file using it: \n\n" + header_content
+        if errors:
+            query += "\n\n A previous version of this mock did not compile on its own; avoid these errors: \n\n" + errors[:2000]
+        # Stream the mock, stopping once its code block is complete
+        response_text = self.client.generate(self.configReader.get_codegen_model(), query, echo=True,
+                                             site="StatesCreateMock", use_cache=not fresh)
 
-        return False, None # Stop state machine
+        codeWriter = CodeWriter(input_data, response_text, directory)
+        name_without_ext, _ = os.path.splitext(inc)
+        codeWriter.set_class_name(name_without_ext)
+        return codeWriter.process_code(True, ), query
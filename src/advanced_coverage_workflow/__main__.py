@@ -0,0 +1,45 @@
+"""
+Run the advanced coverage workflow on a CMake project
+
+    python3 -m src.advanced_coverage_workflow [project_path] [--resume] [--profile]
+
+--resume keeps the previous output and skips every function task that the
+checkpoints record as completed with unchanged inputs; failed or
+interrupted tasks are run again. --profile prints the time spent in each
+stage and external tool (see run_profiler). The exit status is non-zero
+when a stage raised.
+"""
+
+import argparse
+import sys
+
+from ..ConfigReader import ConfigReader
+from ..Query import Query
+from ..dag_pipeline import FAILED
+from ..run_profiler import add_profile_arguments, start_from_args
+from .StateMachine import StateMachine
+
+
+def main():
+    configReader = ConfigReader()
+    parser = argparse.ArgumentParser(description='Advanced per-function coverage workflow')
+    parser.add_argument('project_path', nargs='?', default=configReader.get_default_project_path(),
+                        help='Project folder containing CMakeLists.txt (default: from CppMicroAgent.cfg)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue a previous run, skipping completed functions')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args, "advanced_coverage_workflow")
+
+    configReader.set_resume(args.resume)
+    statuses = StateMachine(Query(args.project_path)).run()
+    # A stage that raised only skips the stages after it; still fail the run
+    failed = [name for name, status in statuses.items() if status == FAILED]
+    if failed:
+        print(f"Workflow failed in: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
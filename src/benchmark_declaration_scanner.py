@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the C++ declaration scanner
+Reports MB/s for tokenizing and for full declaration scanning of the given
+headers. Large single headers are the interesting case, e.g.:
+
+    python3 src/benchmark_declaration_scanner.py path/to/nlohmann/json.hpp
+
+With no arguments the headers of the configured project are used.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from config_reader import get_project_path
+from cpp_declaration_scanner import DeclarationScanner, tokenize
+
+
+def find_headers(project_path) -> list:
+    """All .h/.hpp files under a project"""
+    root = Path(project_path)
+    return sorted(list(root.rglob('*.h')) + list(root.rglob('*.hpp')))
+
+
+def measure(fn, contents: list, repeat: int) -> float:
+    """Best wall time of `repeat` runs of fn over every (path, content) pair"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path, content in contents:
+            fn(path, content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the C++ declaration scanner')
+    parser.add_argument('headers', nargs='*', help='Header files to scan (default: project headers)')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best is reported')
+    args = parser.parse_args()
+
+    if args.headers:
+        headers = [Path(h) for h in args.headers]
+    else:
+        headers = find_headers(get_project_path())
+    if not headers:
+        print("No headers to benchmark")
+        return 1
+
+    contents = []
+    for header in headers:
+        with open(header, 'r', encoding='utf-8', errors='ignore') as f:
+            contents.append((header, f.read()))
+    total_bytes = sum(len(content.encode('utf-8')) for _, content in contents)
+    megabytes = total_bytes / (1024 * 1024)
+
+    scanner = DeclarationScanner()
+    classes = [c for path, content in contents for c in scanner.scan(content, path)]
+    methods = sum(len(c['methods']) for c in classes)
+
+    tokenize_time = measure(lambda path, content: tokenize(content), contents, args.repeat)
+    scan_time = measure(lambda path, content: scanner.scan(content, path), contents, args.repeat)
+
+    print("=" * 60)
+    print("C++ Declaration Scanner Benchmark")
+    print("=" * 60)
+    print(f"Headers:  {len(headers)} ({total_bytes:,} bytes)")
+    print(f"Found:    {len(classes)} classes, {methods} public methods")
+    print(f"Tokenize: {tokenize_time * 1000:8.1f} ms  {megabytes / tokenize_time:7.2f} MB/s")
+    print(f"Scan:     {scan_time * 1000:8.1f} ms  {megabytes / scan_time:7.2f} MB/s")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
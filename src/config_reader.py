@@ -5,8 +5,12 @@ Reads settings from CppMicroAgent.cfg
 """
 
 import configparser
+import os
 from pathlib import Path
 
+# Overrides project_path, e.g. for the projects of a batch run (run_project_batch.py)
+PROJECT_PATH_ENV = 'CPPMICROAGENT_PROJECT_PATH'
+
 def get_config_path():
     """Get the path to the configuration file"""
     # Assume config is in the root directory
@@ -26,7 +30,12 @@ def read_config():
     return config
 
 def get_project_path():
-    """Get the project path from configuration"""
+    """Get the project path from configuration (or the CPPMICROAGENT_PROJECT_PATH environment variable)"""
+    root_dir = Path(__file__).parent.parent
+    override = os.environ.get(PROJECT_PATH_ENV, '').strip()
+    if override:
+        return root_dir / override
+    
     config = read_config()
     
     if 'PROJECT_SETTINGS' not in config:
@@ -40,7 +49,6 @@ def get_project_path():
     project_path = project_settings['project_path'].strip()
     
     # Convert to absolute path
-    root_dir = Path(__file__).parent.parent
     absolute_path = root_dir / project_path
     
     return absolute_path
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Single-pass C++ declaration scanner for CppMicroAgent
+Tokenizes a header once with one compiled pattern (comments and preprocessor
+lines are dropped and literals collapsed by the tokenizer itself) and walks
+the token stream with a scope stack to extract namespaces, classes, access
+sections and member function declarations. Function bodies are skipped by
+bracket matching instead of being re-scanned, so the cost is linear in the
+size of the file.
+
+Output matches the class dicts produced by HeaderAnalyzer in
+quick_test_generator/generate_and_build_tests.py.
+
+outline() walks the same token stream to list every declaration of a file
+(types, functions, variables, macros) with its source text, for the
+context-sliced prompts.
+"""
+
+import re
+from pathlib import Path
+
+try:
+    from .cpp_source_text import blank
+except ImportError:
+    from cpp_source_text import blank
+
+# Each match is one significant token preceded by any skippable text
+# (whitespace, comments, preprocessor lines); literals are reported as a group
+_TOKEN_RE = re.compile(r'''
+    (?:\s+|//[^\n]*|/\*.*?\*/|\#(?:[^\n\\]|\\.)*)*
+    (?:(?P<lit>(?:u8|[uUL])?R"(?P<delim>[^(\s]*)\(.*?\)(?P=delim)"   # raw string
+        | (?:u8|[uUL])?"(?:[^"\\\n]|\\.)*"                          # string literal
+        | \.?\d(?:[eEpP][+-]|[\w.'])*                               # number (with ' separators)
+        | (?:u8|[uUL])?'(?:[^'\\\n]|\\.)*')                         # char literal
+     | (?P<tok>[A-Za-z_$]\w*|::|->|\.\.\.|\S))?
+''', re.VERBOSE | re.DOTALL)
+
+_CLASS_KEYS = {'class', 'struct', 'union'}
+_ACCESS = {'public', 'protected', 'private'}
+_SPECIFIERS = {'virtual', 'static', 'inline', 'explicit', 'constexpr', 'consteval',
+               'extern', 'mutable', 'friend'}
+_ATTRIBUTE_CALLS = {'__attribute__', '__declspec', 'alignas'}
+_NON_FUNCTION_CALLS = _ATTRIBUTE_CALLS | {'decltype', 'alignof', 'sizeof', 'noexcept',
+                                          'throw', 'static_assert'}
+_SKIP_STATEMENTS = {'using', 'typedef', 'static_assert', 'friend', 'enum'}
+_OPENERS = {'(', '[', '{'}
+_CLOSERS = {')', ']', '}'}
+
+_TYPE_KEYS = _CLASS_KEYS | {'enum'}
+_DEFINE_RE = re.compile(r'^[ \t]*#[ \t]*define[ \t]+([A-Za-z_]\w*)(?:[^\n\\]|\\.)*', re.MULTILINE | re.DOTALL)
+
+# Placeholder token for literals, so declarations keep their shape
+LITERAL = '0'
+
+
+def _is_word(tok: str) -> bool:
+    return tok[0].isalpha() or tok[0] == '_'
+
+
+def tokenize(content: str) -> list:
+    """Return the significant tokens of a C++ source as a flat list of strings"""
+    return [tok or LITERAL for lit, _, tok in _TOKEN_RE.findall(content) if lit or tok]
+
+
+def tokenize_spans(content: str) -> tuple:
+    """Tokens as for tokenize, with the (start, end) offset of each in content"""
+    tokens = []
+    spans = []
+    for match in _TOKEN_RE.finditer(content):
+        if match.group('lit') is not None:
+            tokens.append(LITERAL)
+            spans.append(match.span('lit'))
+        elif match.group('tok') is not None:
+            tokens.append(match.group('tok'))
+            spans.append(match.span('tok'))
+    return tokens, spans
+
+
+def _skip_balanced(tokens: list, i: int) -> int:
+    """Given tokens[i] is an opening bracket, return the index after its match"""
+    depth = 0
+    n = len(tokens)
+    while i < n:
+        tok = tokens[i]
+        if tok in _OPENERS:
+            depth += 1
+        elif tok in _CLOSERS:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def _strip_template_prefix(stmt: list) -> list:
+    """Drop leading `template < ... >` clauses and [[attributes]]"""
+    while stmt:
+        if stmt[0] == 'template' and stmt[1:2] == ['<']:
+            depth = 0
+            end = len(stmt)
+            for j in range(1, len(stmt)):
+                if stmt[j] == '<':
+                    depth += 1
+                elif stmt[j] == '>':
+                    depth -= 1
+                    if depth == 0:
+                        end = j + 1
+                        break
+            stmt = stmt[end:]
+        elif stmt[0] == '[' and stmt[1:2] == ['[']:
+            stmt = stmt[_skip_balanced(stmt, 0):]
+        else:
+            return stmt
+    return stmt
+
+
+def _parameter_list(stmt: list) -> int:
+    """Index of the '(' opening a declaration's parameter list: the first one
+    preceded by a declarator name, outside template arguments
+    (std::function<void(int)> is a data member). -1 when there is none or an
+    initializer comes first."""
+    angle = 0
+    for j in range(1, len(stmt)):
+        tok = stmt[j]
+        if tok == '<':
+            angle += 1
+        elif tok == '>' and angle:
+            angle -= 1
+        elif tok == '(' and angle == 0 and _is_word(stmt[j - 1]) and stmt[j - 1] not in _NON_FUNCTION_CALLS:
+            return j
+        if tok == '=' or tok == '{}':
+            return -1
+    return -1
+
+
+def _join_type(tokens: list) -> str:
+    """Render type tokens as source text, e.g. `const std::map<int, Foo*>&`"""
+    out = []
+    prev = ''
+    for tok in tokens:
+        if out and (prev == ',' or _is_word(prev)) and _is_word(tok):
+            out.append(' ')
+        out.append(tok)
+        prev = tok
+    return ''.join(out)
+
+
+def _split_top_level(tokens: list, separator: str) -> list:
+    """Split tokens at separator outside any brackets"""
+    parts = [[]]
+    depth = 0
+    for tok in tokens:
+        if tok in _OPENERS or tok == '<':
+            depth += 1
+        elif tok in _CLOSERS or tok == '>':
+            depth -= 1
+        elif tok == separator and depth == 0:
+            parts.append([])
+            continue
+        parts[-1].append(tok)
+    return parts
+
+
+def parse_parameters(tokens: list) -> list:
+    """Parse the tokens between a declaration's parentheses into [{'type', 'name'}]"""
+    if not tokens or tokens == ['void']:
+        return []
+
+    param_list = []
+    for part in _split_top_level(tokens, ','):
+        # Remove default values
+        part = _split_top_level(part, '=')[0]
+        if not part:
+            continue
+
+        name = ''
+        if part[-1] == ']' and '[' in part:
+            # Array parameter decays to a pointer: char buf[16] -> char*
+            bracket = part.index('[')
+            if bracket > 1 and _is_word(part[bracket - 1]):
+                name = part[bracket - 1]
+                bracket -= 1
+            part = part[:bracket] + ['*']
+        elif len(part) >= 2 and _is_word(part[-1]) and part[-2] != '::' and not (
+                # `unsigned int` / `const Foo` are types without a name
+                len(part) == 2 and part[0] in ('const', 'unsigned', 'signed', 'long', 'short',
+                                               'struct', 'class', 'enum', 'volatile')):
+            name = part[-1]
+            part = part[:-1]
+        param_list.append({'type': _join_type(part), 'name': name})
+
+    return param_list
+
+
+class _ClassScope:
+    """A class/struct/union whose body is being scanned"""
+
+    def __init__(self, name: str, key: str, namespace: str):
+        self.name = name
+        self.key = key
+        self.simple_name = name.split('::')[-1]
+        self.access = 'private' if key == 'class' else 'public'
+        self.namespace = namespace
+        self.methods = []
+        self.signatures = set()
+        self.is_abstract = False
+        self.has_protected_destructor = False
+
+
+class DeclarationScanner:
+    """Extracts classes and their public member function declarations from C++ headers"""
+
+    def scan_file(self, header_path) -> list:
+        """Scan a header file and return its class dicts"""
+        header_path = Path(header_path)
+        with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        return self.scan(content, header_path)
+
+    def scan(self, content: str, header_path) -> list:
+        """Scan C++ source text. Classes and structs with public methods are
+        returned; nested classes are named Outer::Inner and namespaces are
+        fully qualified (a::b)."""
+        header_path = Path(header_path)
+        finished = self._walk(tokenize(content))
+
+        return [{
+            'class_name': cls.name,
+            'methods': cls.methods,
+            'header_file': header_path.name,
+            'header_full_path': str(header_path),
+            'is_abstract': cls.is_abstract,
+            'has_protected_destructor': cls.has_protected_destructor,
+            'namespace': cls.namespace
+        } for cls in finished if cls.methods and cls.key != 'union']
+
+    def _walk(self, tokens: list) -> list:
+        """Walk the token stream once, handing each complete statement to
+        _statement; returns the class scopes seen"""
+        n = len(tokens)
+
+        # Scope stack entries: ('namespace', name) | ('class', _ClassScope) | ('block', None)
+        scopes = []
+        finished = []
+        stmt = []
+        first = 0
+        i = 0
+
+        while i < n:
+            tok = tokens[i]
+            if not stmt:
+                first = i
+
+            if tok == '(' or tok == '[':
+                end = _skip_balanced(tokens, i)
+                stmt.extend(tokens[i:end])
+                i = end
+            elif tok == ';':
+                self._statement(stmt, scopes, first, i + 1)
+                stmt = []
+                i += 1
+            elif tok == ':' and len(stmt) == 1 and stmt[0] in _ACCESS \
+                    and scopes and scopes[-1][0] == 'class':
+                scopes[-1][1].access = stmt[0]
+                stmt = []
+                i += 1
+            elif tok == '}':
+                if scopes:
+                    kind, scope = scopes.pop()
+                    if kind == 'class':
+                        finished.append(scope)
+                        self._class_closed(scope, scopes, i)
+                stmt = []
+                i += 1
+            elif tok != '{':
+                stmt.append(tok)
+                i += 1
+            else:
+                brace = i
+                i, opened, body = self._open_brace(tokens, i, stmt, scopes)
+                if opened == 'class':
+                    self._class_opened(scopes[-1][1], first, brace)
+                elif opened == 'definition':
+                    self._statement(stmt, scopes, first, i, body)
+                stmt = [] if opened else stmt + ['{}']
+
+        # An unterminated class (truncated header) still counts
+        finished.extend(scope for kind, scope in scopes if kind == 'class')
+        return finished
+
+    def _statement(self, stmt: list, scopes: list, first: int, end: int, body: int = None):
+        """A complete statement: tokens[first:end] ending in ';', or a function
+        definition whose body opens at tokens[body]"""
+        self._member_declaration(stmt, scopes)
+
+    def _class_opened(self, cls: _ClassScope, first: int, brace: int):
+        """The body of cls opens at tokens[brace]; its head starts at tokens[first]"""
+
+    def _class_closed(self, cls: _ClassScope, scopes: list, close: int):
+        """The body of cls closes at tokens[close]; scopes are those around it"""
+
+    def _open_brace(self, tokens: list, i: int, stmt: list, scopes: list) -> tuple:
+        """Handle the '{' at tokens[i] that follows stmt.
+        Returns (next index, what it opened, index of a function body's '{').
+        What it opened is 'scope', 'class' or 'definition' - or None for an
+        initializer brace, which leaves stmt open until its ';'."""
+        head = _strip_template_prefix(stmt)
+        if head[:1] == ['inline']:
+            head = head[1:]
+
+        if head[:1] == ['namespace']:
+            scopes.append(('namespace', ''.join(head[1:])))
+            return i + 1, 'scope', None
+        if head[:1] == ['extern'] and head[1:2] == [LITERAL]:
+            # extern "C" { ... } does not open a named scope
+            scopes.append(('block', None))
+            return i + 1, 'scope', None
+        if head[:1] and head[0] in _CLASS_KEYS and '(' not in head and '=' not in head:
+            scopes.append(('class', self._open_class(head, scopes)))
+            return i + 1, 'class', None
+
+        paren = stmt.index('(') if '(' in stmt else -1
+        if paren == -1 or ('=' in stmt[:paren] and 'operator' not in stmt[:paren]):
+            # Brace initializer, enum body or unnamed aggregate
+            return _skip_balanced(tokens, i), None, None
+
+        # Function definition: skip the body
+        close = _skip_balanced(stmt, paren)
+        if ':' in stmt[close:] and (_is_word(stmt[-1]) or stmt[-1] == '>'):
+            # Brace-initialized member in a constructor initializer list:
+            # Foo() : a_{1}, b_(2) { ... }
+            i = _skip_balanced(tokens, i)
+            while i < len(tokens) and tokens[i] == ',':
+                i += 1
+                while i < len(tokens) and tokens[i] not in ('(', '{'):
+                    i += 1
+                i = _skip_balanced(tokens, i)
+        body = None
+        if i < len(tokens) and tokens[i] == '{':
+            body = i
+            i = _skip_balanced(tokens, i)
+        return i, 'definition', body
+
+    def _open_class(self, head: list, scopes: list) -> _ClassScope:
+        """Create the scope for `class [MACRO] Name [final] [: bases] {`"""
+        name = ''
+        for tok in head[1:]:
+            if tok == ':' or tok == '<':
+                break
+            if _is_word(tok) and tok != 'final':
+                name = tok
+
+        namespaces = []
+        outer = []
+        for kind, scope in scopes:
+            if kind == 'namespace' and scope:
+                namespaces.append(scope)
+            elif kind == 'class' and scope.simple_name:
+                outer.append(scope.simple_name)
+        if outer and name:
+            name = '::'.join(outer + [name])
+        return _ClassScope(name, head[0], '::'.join(namespaces))
+
+    def _member_declaration(self, stmt: list, scopes: list):
+        """Record stmt as a method of the enclosing class if it declares one"""
+        if not stmt or not scopes or scopes[-1][0] != 'class':
+            return
+        cls = scopes[-1][1]
+        stmt = _strip_template_prefix(stmt)
+        if not cls.name or not stmt or stmt[0] in _SKIP_STATEMENTS or 'operator' in stmt:
+            return
+
+        paren = _parameter_list(stmt)
+        if paren == -1:
+            return
+
+        name = stmt[paren - 1]
+        close = _skip_balanced(stmt, paren)
+        params = stmt[paren + 1:close - 1]
+        suffix = stmt[close:]
+        if params[:1] in (['*'], ['&'], ['^']):
+            # Function pointer member: void (*callback)(int)
+            return
+
+        prefix = stmt[:paren - 1]
+        is_destructor = prefix[-1:] == ['~']
+        if is_destructor:
+            prefix = prefix[:-1]
+        if prefix[-1:] == ['::']:
+            return
+
+        specifiers = set()
+        type_tokens = []
+        j = 0
+        while j < len(prefix):
+            tok = prefix[j]
+            if tok in _ATTRIBUTE_CALLS and prefix[j + 1:j + 2] == ['(']:
+                j = _skip_balanced(prefix, j + 1)
+                continue
+            if tok == '[' and prefix[j + 1:j + 2] == ['[']:
+                j = _skip_balanced(prefix, j)
+                continue
+            if tok in _SPECIFIERS:
+                specifiers.add(tok)
+            else:
+                type_tokens.append(tok)
+            j += 1
+        # Export/annotation macros ahead of the return type: API_EXPORT int foo()
+        while len(type_tokens) > 1 and type_tokens[0].isupper() and _is_word(type_tokens[1]):
+            type_tokens = type_tokens[1:]
+
+        if suffix[-2:] == ['=', LITERAL]:
+            cls.is_abstract = True
+        if 'friend' in specifiers or 'delete' in suffix:
+            return
+
+        if is_destructor:
+            if name != cls.simple_name:
+                return
+            if cls.access != 'public':
+                cls.has_protected_destructor = True
+                return
+            method = {'name': f'~{name}', 'return_type': '', 'parameters': [],
+                      'is_constructor': False, 'is_destructor': True}
+        elif name == cls.simple_name:
+            if type_tokens or cls.access != 'public':
+                return
+            method = {'name': name, 'return_type': '', 'parameters': parse_parameters(params),
+                      'is_constructor': True, 'is_destructor': False}
+        else:
+            if cls.access != 'public':
+                return
+            if type_tokens == ['auto'] and '->' in suffix:
+                trailing = suffix[suffix.index('->') + 1:]
+                for j, tok in enumerate(trailing):
+                    if tok in ('override', 'final', '=', 'noexcept', '{}'):
+                        trailing = trailing[:j]
+                        break
+                type_tokens = trailing
+            if not type_tokens:
+                # Macro invocation such as DECLARE_SOMETHING(Foo)
+                return
+            method = {'name': name, 'return_type': _join_type(type_tokens),
+                      'parameters': parse_parameters(params),
+                      'is_constructor': False, 'is_destructor': False,
+                      'is_static': 'static' in specifiers}
+
+        # Overloads are told apart by parameter count, as in HeaderAnalyzer
+        signature = (method['name'], len(method['parameters']))
+        if signature not in cls.signatures:
+            cls.signatures.add(signature)
+            cls.methods.append(method)
+
+
+def scan_header(header_path) -> list:
+    """Scan one header with a fresh DeclarationScanner"""
+    return DeclarationScanner().scan_file(header_path)
+
+
+def _type_name(stmt: list):
+    """Name in `class|struct|union|enum [class] [MACRO] Name ...`"""
+    words = []
+    for tok in stmt[1:]:
+        if tok in (':', '<', '{}'):
+            break
+        if _is_word(tok) and tok not in ('class', 'struct', 'final'):
+            words.append(tok)
+    return words[-1] if words else None
+
+
+def _declared_name(stmt: list) -> tuple:
+    """(name, kind) a declaration introduces - a function, variable, typedef
+    or alias - or (None, None)"""
+    if not stmt or 'operator' in stmt:
+        return None, None
+    if stmt[0] == 'using':
+        if stmt[2:3] == ['='] and _is_word(stmt[1]):
+            return stmt[1], 'alias'
+        return None, None
+    if stmt[0] in ('namespace', 'static_assert') or (stmt[0] == 'friend' and '(' not in stmt):
+        return None, None
+
+    pointer = None
+    for j in range(len(stmt) - 3):
+        # (*name) of a function pointer
+        if stmt[j] == '(' and stmt[j + 1] == '*' and _is_word(stmt[j + 2]) and stmt[j + 3] == ')':
+            pointer = stmt[j + 2]
+            break
+    if stmt[0] == 'typedef':
+        if pointer:
+            return pointer, 'typedef'
+        words = [tok for tok in _split_top_level(stmt, '[')[0] if _is_word(tok)]
+        return (words[-1], 'typedef') if len(words) > 1 else (None, None)
+    if pointer:
+        return pointer, 'variable'
+
+    paren = _parameter_list(stmt)
+    if paren != -1:
+        name = stmt[paren - 1]
+        return ('~' + name if stmt[paren - 2:paren - 1] == ['~'] else name), 'function'
+    words = []
+    angle = 0
+    for tok in stmt:
+        if tok == '<':
+            angle += 1
+        elif tok == '>' and angle:
+            angle -= 1
+        elif angle == 0:
+            if tok in ('=', '[', '{}', '('):
+                break
+            if _is_word(tok):
+                words.append(tok)
+    return (words[-1], 'variable') if len(words) >= 2 else (None, None)
+
+
+class _Outliner(DeclarationScanner):
+    """Collects every declaration of a file with its text, not just methods"""
+
+    def __init__(self, content: str, file_path: str):
+        self.content = content
+        self.file_path = file_path
+        self.tokens, self.spans = tokenize_spans(content)
+        self.declarations = []
+
+    def _text(self, first: int, end: int) -> str:
+        return self.content[self.spans[first][0]:self.spans[end - 1][1]].strip()
+
+    def _signature(self, first: int, body: int) -> str:
+        """Text of a function definition up to its body or initializer list"""
+        depth = 0
+        end = body
+        for j in range(first, body):
+            tok = self.tokens[j]
+            if tok in _OPENERS:
+                depth += 1
+            elif tok in _CLOSERS:
+                depth -= 1
+            elif tok == ':' and depth == 0 and ')' in self.tokens[first:j]:
+                end = j
+                break
+        return self._text(first, end) + ';'
+
+    def _statement(self, stmt: list, scopes: list, first: int, end: int, body: int = None):
+        head = _strip_template_prefix(stmt)
+        if not head:
+            return
+        cls = scopes[-1][1] if scopes and scopes[-1][0] == 'class' else None
+        if head[0] in _TYPE_KEYS and '(' not in head:
+            name = _type_name(head)
+            if cls is not None:
+                cls.members.append({'name': name, 'kind': 'type', 'access': cls.access,
+                                    'text': self._text(first, end)})
+            elif '{}' in head and name:
+                self.declarations.append({'name': name, 'kind': head[0], 'file': self.file_path,
+                                          'text': self._text(first, end), 'members': []})
+            return  # otherwise a forward declaration
+
+        name, kind = _declared_name(head)
+        if cls is not None:
+            cls.members.append({'name': name, 'kind': kind, 'access': cls.access,
+                                'text': self._text(first, end)})
+        elif name:
+            # Definitions are represented by their signature
+            text = self._signature(first, body) if body is not None else self._text(first, end)
+            self.declarations.append({'name': name, 'kind': kind, 'file': self.file_path,
+                                      'text': text, 'members': []})
+
+    def _class_opened(self, cls: _ClassScope, first: int, brace: int):
+        cls.first = first
+        cls.head = self.content[self.spans[first][0]:self.spans[brace][0]].strip()
+        cls.members = []
+
+    def _class_closed(self, cls: _ClassScope, scopes: list, close: int):
+        text = self._text(cls.first, close + 1) + ';'
+        outer = scopes[-1][1] if scopes and scopes[-1][0] == 'class' else None
+        if outer is not None:
+            outer.members.append({'name': cls.simple_name or None, 'kind': 'type', 'access': outer.access,
+                                  'text': text})
+        elif cls.simple_name:
+            self.declarations.append({'name': cls.simple_name, 'kind': cls.key, 'file': self.file_path,
+                                      'text': text, 'head': cls.head, 'members': cls.members})
+
+
+def outline(content: str, file_path: str = '') -> list:
+    """Top-level declarations of a C/C++ file.
+
+    Each entry is a dict with name, kind (class, struct, union, enum, typedef,
+    alias, function, variable, macro), file, text and - for classes - head and
+    members, each with name, kind, access and text. Namespaces and extern "C"
+    blocks are flattened into their contents."""
+    code = blank(content, literals=False)
+    declarations = [{'name': m.group(1), 'kind': 'macro', 'file': file_path,
+                     'text': m.group(0).strip(), 'members': []}
+                    for m in _DEFINE_RE.finditer(code)]
+    outliner = _Outliner(content, file_path)
+    outliner._walk(outliner.tokens)
+    return declarations + outliner.declarations
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Shared comment and literal blanking for the C/C++ text scanners
+Comments, string/char literals and (optionally) preprocessor lines are
+replaced with spaces of the same length, so every offset and line number of
+the blanked text matches the original and braces or semicolons inside them
+no longer confuse a scan. Quotes are kept, so a blanked literal still reads
+as an (empty) expression, and digit separators (1'000) are left alone.
+"""
+
+import re
+
+_COMMENT = r'(?P<comment>//[^\n]*|/\*.*?\*/)'
+_PREPROCESSOR = r'(?P<preprocessor>^[ \t]*#(?:[^\n\\]|\\.)*)'
+_NUMBER = r'(?P<number>\b\d[\w\']*)'
+_LITERAL = (r'(?P<literal>(?:(?<!\w)(?:u8|[uUL]))?R"(?P<delim>[^(\s]*)\(.*?\)(?P=delim)"'  # raw string
+            r'|(?:(?<!\w)(?:u8|[uUL]))?"(?:[^"\\\n]|\\.)*"'                             # string literal
+            r"|(?:(?<!\w)(?:u8|[uUL]))?'(?:[^'\\\n]|\\.)*')")                           # char literal
+
+# Preprocessor lines are matched before anything inside them
+_BLANK_RE = re.compile('|'.join((_COMMENT, _NUMBER, _LITERAL)), re.DOTALL)
+_BLANK_PREPROCESSOR_RE = re.compile('|'.join((_COMMENT, _PREPROCESSOR, _NUMBER, _LITERAL)),
+                                    re.DOTALL | re.MULTILINE)
+_NOT_NEWLINE_RE = re.compile(r'[^\n]')
+_BRACE_RE = re.compile(r'[{}]')
+
+
+def _spaces(text: str) -> str:
+    return _NOT_NEWLINE_RE.sub(' ', text)
+
+
+def blank(content: str, literals: bool = True, preprocessor: bool = False) -> str:
+    """Content with comments blanked, and literals and preprocessor lines too
+    when asked. Literals are always recognised, so a // or /* inside a string
+    is never taken for a comment."""
+    def replace(match):
+        text = match.group(0)
+        kind = match.lastgroup
+        if kind in ('comment', 'preprocessor'):
+            return _spaces(text)
+        if kind == 'number' or not literals:
+            return text
+        open_quote = text.find(text[-1])
+        return text[:open_quote + 1] + _spaces(text[open_quote + 1:-1]) + text[-1]
+
+    return (_BLANK_PREPROCESSOR_RE if preprocessor else _BLANK_RE).sub(replace, content)
+
+
+def find_block_end(code: str, open_brace: int) -> int:
+    """Index of the brace matching code[open_brace] in blanked code, or the
+    last index when the block is never closed"""
+    depth = 0
+    for match in _BRACE_RE.finditer(code, open_brace):
+        depth += 1 if match.group(0) == '{' else -1
+        if depth == 0:
+            return match.start()
+    return len(code) - 1
@@ -0,0 +1,181 @@
+# dag_pipeline.py
+"""
+Declarative DAG executor for the workflow state machines
+Each stage wraps an existing state object (anything with
+run(input_data) -> (proceed, input_data)) and declares the artifacts it
+consumes and produces; a stage depends on the stages producing its inputs.
+Stages whose dependencies have finished run as soon as they are ready:
+a lone ready stage runs on the calling thread, several independent ones run
+concurrently on a thread pool. A stage that stops (proceed False) or raises
+only skips the stages downstream of it; unrelated branches keep running.
+"""
+
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    from .run_profiler import profiler
+except ImportError:
+    from run_profiler import profiler
+
+OK = 'ok'
+STOPPED = 'stopped'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class Stage:
+    """One node of the pipeline"""
+
+    def __init__(self, name, state, inputs=(), outputs=(), after=()):
+        self.name = name
+        self.state = state
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        # Explicit ordering for dependencies that are not data
+        self.after = tuple(after)
+
+
+class DagPipeline:
+    """Runs stages in dependency order, independent stages concurrently"""
+
+    def __init__(self, stages, provided=(), max_workers=4):
+        """
+        :param stages: Stage objects; names must be unique
+        :param provided: artifacts available before any stage runs
+        :param max_workers: threads for stages that are ready at the same time
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.max_workers = max(1, max_workers)
+
+        producers = {}
+        for stage in self.stages.values():
+            for artifact in stage.outputs:
+                if artifact in producers:
+                    raise ValueError(f"{artifact} is produced by both {producers[artifact]} and {stage.name}")
+                producers[artifact] = stage.name
+
+        self.dependencies = {}
+        for stage in self.stages.values():
+            deps = []
+            for artifact in stage.inputs:
+                if artifact in producers:
+                    deps.append(producers[artifact])
+                elif artifact not in provided:
+                    raise ValueError(f"{stage.name} needs {artifact}, which no stage produces")
+            for name in stage.after:
+                if name not in self.stages:
+                    raise ValueError(f"{stage.name} runs after unknown stage {name}")
+                deps.append(name)
+            self.dependencies[stage.name] = list(dict.fromkeys(deps))
+        self.order = self._topological_order()
+
+    def _topological_order(self):
+        """Stage names, dependencies first; declaration order breaks ties"""
+        order = []
+        visiting = set()
+
+        def visit(name, path):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError("dependency cycle: " + " -> ".join(path + [name]))
+            visiting.add(name)
+            for dep in self.dependencies[name]:
+                visit(dep, path + [name])
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def _run_stage(self, name, input_data):
+        """(status, input_data) of one stage; exceptions fail only this branch"""
+        try:
+            with profiler.phase(name):
+                proceed, output = self.stages[name].state.run(input_data)
+        except Exception:
+            print(f"[DagPipeline] Stage {name} failed:\n{traceback.format_exc()}")
+            return FAILED, input_data
+        return (OK if proceed else STOPPED), output
+
+    def run(self, input_data, on_stage=None):
+        """Run every stage once.
+
+        A stage receives the input_data returned by its first dependency (the
+        pipeline's input_data if it has none). on_stage(name, status) is called
+        as each stage finishes. Returns (statuses, outputs): the status of
+        every stage and the input_data each finished stage returned."""
+        statuses = {}
+        outputs = {}
+        running = {}
+        lock = threading.Lock()
+
+        def stage_input(name):
+            deps = self.dependencies[name]
+            return outputs.get(deps[0], input_data) if deps else input_data
+
+        def ready_stages():
+            """Mark stages below a stopped/failed one as skipped, return runnable ones"""
+            ready = []
+            changed = True
+            while changed:
+                changed = False
+                for name in self.order:
+                    if name in statuses or name in running.values():
+                        continue
+                    dep_statuses = [statuses.get(dep) for dep in self.dependencies[name]]
+                    if any(s in (STOPPED, FAILED, SKIPPED) for s in dep_statuses):
+                        statuses[name] = SKIPPED
+                        changed = True
+                    elif all(s == OK for s in dep_statuses) and name not in ready:
+                        ready.append(name)
+            return ready
+
+        def finish(name, result):
+            status, output = result
+            with lock:
+                statuses[name] = status
+                # A stopping state may hand back None instead of its input
+                if output is not None:
+                    outputs[name] = output
+            if on_stage is not None:
+                on_stage(name, status)
+
+        executor = None
+        try:
+            while True:
+                ready = ready_stages()
+                if not ready and not running:
+                    break
+                if len(ready) == 1 and not running:
+                    # Nothing to overlap with: run on this thread
+                    name = ready[0]
+                    finish(name, self._run_stage(name, stage_input(name)))
+                    continue
+
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                  thread_name_prefix="DagPipeline")
+                for name in ready:
+                    running[executor.submit(self._run_stage, name, stage_input(name))] = name
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return statuses, outputs
+
+    def last_output(self, outputs, default=None):
+        """input_data of the last stage (in dependency order) that finished"""
+        for name in reversed(self.order):
+            if name in outputs:
+                return outputs[name]
+        return default
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Differential coverage utilities for CppMicroAgent
+Maps `git diff` hunks against a base revision to the C++ classes/functions
+they touch, and measures coverage of the changed lines from lcov data.
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+
+try:
+    from .cpp_source_text import blank, find_block_end
+except ImportError:
+    from cpp_source_text import blank, find_block_end
+
+CPP_EXTENSIONS = ('.cpp', '.cc', '.cxx', '.c', '.h', '.hpp', '.hxx')
+
+_HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+_CLASS_RE = re.compile(r'\b(?:class|struct)\s+(?:\w+\s+)?(\w+)\s*(?::[^{;]*)?\{')
+_DEFINITION_RE = re.compile(r'\b(\w+)::(~?\w+)\s*\([^;{]*\)[^;{]*\{')
+_CALL_LIKE_RE = re.compile(r'(~?\b[A-Za-z_]\w*)\s*\(')
+_KEYWORDS = {'if', 'for', 'while', 'switch', 'return', 'sizeof', 'catch',
+             'decltype', 'static_assert', 'alignof', 'noexcept', 'operator'}
+
+
+def get_git_root(path) -> Path:
+    """Return the top-level directory of the git repository containing path"""
+    result = subprocess.run(
+        ['git', 'rev-parse', '--show-toplevel'],
+        cwd=str(path), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Not a git repository: {path}")
+    return Path(result.stdout.strip())
+
+
+def get_changed_lines(project_path, base_rev: str) -> dict:
+    """Return {absolute file path: set of changed line numbers} for C++ files
+    changed under project_path between base_rev and the working tree"""
+    project_path = Path(project_path).resolve()
+    git_root = get_git_root(project_path)
+
+    result = subprocess.run(
+        ['git', 'diff', '--unified=0', '--no-color', '--no-ext-diff', base_rev,
+         '--', str(project_path)],
+        cwd=str(git_root), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git diff against {base_rev} failed: {result.stderr.strip()}")
+
+    changed = {}
+    current_file = None
+    for line in result.stdout.split('\n'):
+        if line.startswith('+++ '):
+            target = line[4:].strip()
+            if target == '/dev/null':
+                current_file = None
+                continue
+            if target.startswith('b/'):
+                target = target[2:]
+            current_file = str(git_root / target)
+            if not current_file.endswith(CPP_EXTENSIONS):
+                current_file = None
+            continue
+
+        if current_file is None:
+            continue
+
+        match = _HUNK_RE.match(line)
+        if match:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            # count == 0 is a pure deletion; attribute it to the line it sits on
+            lines = range(start, start + count) if count > 0 else range(start, start + 1)
+            changed.setdefault(current_file, set()).update(lines)
+
+    return changed
+
+
+def find_touched_functions(file_path, changed_lines: set) -> set:
+    """Return {(class_name, function_name)} whose declaration or definition
+    overlaps the changed lines. Free functions use an empty class name."""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = blank(f.read())
+    except OSError:
+        return set()
+
+    line_starts = [0]
+    for match in re.finditer('\n', content):
+        line_starts.append(match.end())
+
+    def line_of(offset):
+        lo, hi = 0, len(line_starts) - 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if line_starts[mid] <= offset:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo + 1
+
+    touched = set()
+
+    # Out-of-class definitions: Class::method(...) { ... }
+    for match in _DEFINITION_RE.finditer(content):
+        start_line = line_of(match.start())
+        end_line = line_of(find_block_end(content, match.end() - 1))
+        if any(start_line <= ln <= end_line for ln in changed_lines):
+            touched.add((match.group(1), match.group(2)))
+
+    # In-class declarations and inline definitions
+    class_spans = []
+    for match in _CLASS_RE.finditer(content):
+        class_spans.append((match.start(), find_block_end(content, match.end() - 1), match.group(1)))
+
+    lines = content.split('\n')
+    for line_no in sorted(changed_lines):
+        if line_no < 1 or line_no > len(lines):
+            continue
+        offset = line_starts[line_no - 1]
+        enclosing = [span for span in class_spans if span[0] <= offset <= span[1]]
+        if not enclosing:
+            continue
+        # Innermost class wins
+        class_name = max(enclosing, key=lambda span: span[0])[2]
+        for call in _CALL_LIKE_RE.finditer(lines[line_no - 1]):
+            name = call.group(1)
+            if name not in _KEYWORDS:
+                touched.add((class_name, name))
+
+    return touched
+
+
+def collect_touched_functions(changed: dict) -> set:
+    """Aggregate touched (class, function) pairs across all changed files"""
+    touched = set()
+    for file_path, lines in changed.items():
+        touched |= find_touched_functions(file_path, lines)
+    return touched
+
+
+def is_test_touched(class_name: str, method_name: str, touched: set) -> bool:
+    """Check whether a generated test for class_name::method_name exercises changed code"""
+    return (class_name, method_name) in touched or ('', method_name) in touched
+
+
+_BODY_HEADER_RE = re.compile(r'\)\s*(?:const|noexcept|override|final|volatile|&|\s)*'
+                             r'(?:->[^;{}]*)?(?::[^;{}]*)?$')
+_BRACES_ONLY_RE = re.compile(r'^[\s{};]*$')
+
+
+def find_executable_lines(file_path, lines: set) -> set:
+    """Return the lines of `lines` holding code inside a function body - an
+    estimate of what gcov would instrument, for when there is no coverage data"""
+    try:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = blank(f.read())
+    except OSError:
+        return set()
+
+    # Function bodies are outermost blocks opened right after a parameter list
+    in_body = set()
+    depth = 0
+    body_depth = None
+    line_no = 1
+    statement_start = 0
+    for i, ch in enumerate(content):
+        if ch == '\n':
+            line_no += 1
+        elif ch == '{':
+            if body_depth is None and _BODY_HEADER_RE.search(content[statement_start:i]):
+                body_depth = depth
+            depth += 1
+            statement_start = i + 1
+        elif ch == '}':
+            depth -= 1
+            if body_depth is not None and depth <= body_depth:
+                body_depth = None
+            statement_start = i + 1
+        elif ch == ';':
+            statement_start = i + 1
+        if body_depth is not None and depth > body_depth:
+            in_body.add(line_no)
+
+    source_lines = content.split('\n')
+    executable = set()
+    for line_no in lines:
+        if line_no in in_body and 1 <= line_no <= len(source_lines):
+            text = source_lines[line_no - 1]
+            if not _BRACES_ONLY_RE.match(text) and not text.lstrip().startswith('#'):
+                executable.add(line_no)
+    return executable
+
+
+def compute_changed_line_coverage(info_file, changed: dict) -> dict:
+    """Compute coverage of the changed lines from an lcov .info file
+
+    Lines without DA records (comments, declarations, blank lines) are not
+    instrumentable and are excluded from the totals. Without an info_file
+    nothing ran: every changed line of code inside a function body counts
+    as instrumented and uncovered."""
+    hits = {}
+    current = None
+    lcov_lines = []
+    if info_file is None:
+        for file_path, lines in changed.items():
+            hits[os.path.realpath(file_path)] = dict.fromkeys(find_executable_lines(file_path, lines), 0)
+    elif os.path.exists(info_file):
+        with open(info_file, 'r', encoding='utf-8', errors='ignore') as f:
+            lcov_lines = f.readlines()
+    for line in lcov_lines:
+        line = line.strip()
+        if line.startswith('SF:'):
+            current = os.path.realpath(line[3:])
+            hits.setdefault(current, {})
+        elif line.startswith('DA:') and current is not None:
+            parts = line[3:].split(',')
+            try:
+                line_no, count = int(parts[0]), int(parts[1])
+            except (ValueError, IndexError):
+                continue
+            hits[current][line_no] = hits[current].get(line_no, 0) + count
+        elif line == 'end_of_record':
+            current = None
+
+    files = {}
+    total_instrumented = 0
+    total_covered = 0
+    for file_path, lines in sorted(changed.items()):
+        file_hits = hits.get(os.path.realpath(file_path), {})
+        instrumented = sorted(ln for ln in lines if ln in file_hits)
+        uncovered = [ln for ln in instrumented if file_hits[ln] == 0]
+        covered = len(instrumented) - len(uncovered)
+        files[file_path] = {
+            'changed_lines': len(lines),
+            'instrumented_lines': len(instrumented),
+            'covered_lines': covered,
+            'uncovered_lines': uncovered,
+        }
+        total_instrumented += len(instrumented)
+        total_covered += covered
+
+    percentage = (total_covered / total_instrumented * 100) if total_instrumented else 100.0
+    return {
+        'files': files,
+        'instrumented_lines': total_instrumented,
+        'covered_lines': total_covered,
+        'coverage_percentage': percentage,
+    }
+
+
+def format_diff_coverage_report(base_rev: str, result: dict) -> str:
+    """Render a changed-line coverage result as a text report"""
+    out = []
+    out.append("=" * 70)
+    out.append(f"Changed-Line Coverage vs {base_rev}")
+    out.append("=" * 70)
+    out.append("")
+    for file_path, info in result['files'].items():
+        if info['instrumented_lines'] == 0:
+            pct_str = "  n/a "
+        else:
+            pct_str = f"{info['covered_lines'] / info['instrumented_lines'] * 100:5.1f}%"
+        out.append(f"{pct_str}  {info['covered_lines']}/{info['instrumented_lines']}  {file_path}")
+        if info['uncovered_lines']:
+            out.append(f"        uncovered: {', '.join(str(ln) for ln in info['uncovered_lines'])}")
+    out.append("")
+    out.append("-" * 70)
+    out.append(f"Total: {result['covered_lines']}/{result['instrumented_lines']} changed lines covered "
+               f"({result['coverage_percentage']:.1f}%)")
+    out.append("=" * 70)
+    return '\n'.join(out) + '\n'
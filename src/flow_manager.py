@@ -1,26 +1,138 @@
 # flow_manager.py
 
+import json
+import os
 import threading
+import time
+from contextlib import contextmanager
 from graphviz import Digraph
 
 class FlowManager:
+    """Records state transitions and, for tracing, timed spans.
+
+    Each state is a span from its transition() to the next transition (or
+    set_initial) on the same thread; span() times anything else, such as
+    subprocess calls. Spans carry the thread/process ids and the attributes
+    set with context() (file, function, ...) and can be exported as a
+    Chrome/Perfetto trace."""
+
     def __init__(self):
         self.lock = threading.Lock()
         self.transitions = []
         self.current_state = None
+        # Last state per thread, so state machines running concurrently
+        # (one per function) each record their own edges
+        self.thread_states = {}
+        # Completed spans: (name, category, start_us, duration_us, pid, tid, args)
+        self.spans = []
+        # Open state span per thread: (name, start_us, args)
+        self.open_states = {}
+        self.thread_names = {}
+        self._origin = time.perf_counter_ns()
+        self._local = threading.local()
+
+    def _now_us(self):
+        return (time.perf_counter_ns() - self._origin) // 1000
+
+    def _attrs(self, extra=None):
+        attrs = dict(getattr(self._local, 'attrs', {}))
+        if extra:
+            attrs.update(extra)
+        return attrs
+
+    def _switch_state(self, new_state, attrs):
+        """Close this thread's open state span and open one for new_state (under lock)"""
+        tid = threading.get_ident()
+        now = self._now_us()
+        previous = self.open_states.pop(tid, None)
+        if previous is not None:
+            name, start, args = previous
+            self.spans.append((name, 'state', start, now - start, os.getpid(), tid, args))
+        if new_state is not None:
+            self.open_states[tid] = (new_state, now, attrs)
+            self.thread_names.setdefault(tid, threading.current_thread().name)
 
     def set_initial(self, state_name):
         with self.lock:
             self.current_state = state_name
+            self.thread_states[threading.get_ident()] = state_name
             self.transitions.append(("Start", state_name))  # Start is implicit
+            self._switch_state(None, None)
 
-    def transition(self, new_state):
+    def transition(self, new_state, **attrs):
+        """Record a state change; attrs are added to the state's trace span"""
+        attrs = self._attrs(attrs)
         with self.lock:
-            if self.current_state is not None:
-                self.transitions.append((self.current_state, new_state))
+            previous = self.thread_states.get(threading.get_ident(), self.current_state)
+            if previous is not None:
+                self.transitions.append((previous, new_state))
             else:
                 self.transitions.append(("Start", new_state))  # fallback if not initialized
+            self.thread_states[threading.get_ident()] = new_state
             self.current_state = new_state
+            self._switch_state(new_state, attrs)
+
+    @contextmanager
+    def span(self, name, category='call', **attrs):
+        """Time a block (e.g. a subprocess call) as its own trace span"""
+        attrs = self._attrs(attrs)
+        start = self._now_us()
+        try:
+            yield
+        finally:
+            tid = threading.get_ident()
+            duration = self._now_us() - start
+            with self.lock:
+                self.spans.append((name, category, start, duration, os.getpid(), tid, attrs))
+                self.thread_names.setdefault(tid, threading.current_thread().name)
+
+    @contextmanager
+    def nested(self):
+        """Run a nested state machine on this thread: the enclosing state's
+        span stays open, and the nested machine's last state ends with the block"""
+        tid = threading.get_ident()
+        with self.lock:
+            outer = self.open_states.pop(tid, None)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self._switch_state(None, None)
+                if outer is not None:
+                    self.open_states[tid] = outer
+
+    @contextmanager
+    def context(self, **attrs):
+        """Attach attributes (file, function, ...) to every span this thread records in the block"""
+        previous = getattr(self._local, 'attrs', {})
+        self._local.attrs = {**previous, **attrs}
+        try:
+            yield
+        finally:
+            self._local.attrs = previous
+
+    def chrome_trace(self):
+        """Trace events in the Chrome/Perfetto JSON format; open states end now"""
+        with self.lock:
+            now = self._now_us()
+            spans = list(self.spans)
+            for tid, (name, start, args) in self.open_states.items():
+                spans.append((name, 'state', start, now - start, os.getpid(), tid, args))
+            thread_names = dict(self.thread_names)
+
+        events = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                   'args': {'name': name}} for tid, name in thread_names.items()]
+        for name, category, start, duration, pid, tid, args in sorted(spans, key=lambda s: s[2]):
+            events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': start, 'dur': duration,
+                           'pid': pid, 'tid': tid, 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        """Write the trace for chrome://tracing or ui.perfetto.dev"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
 
     def generate_dot(self):
         with self.lock:
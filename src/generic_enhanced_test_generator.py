@@ -19,11 +19,12 @@ import subprocess
 import sys
 from pathlib import Path
 from typing import List, Dict, Set, Tuple, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from config_reader import get_project_path
+from project_model_cache import ProjectModelCache
 
 @dataclass
 class MethodInfo:
@@ -58,22 +59,32 @@ class CppProjectAnalyzer:
         self.classes: Dict[str, ClassInfo] = {}
         self.header_files: List[Path] = []
         self.source_files: List[Path] = []
+        self.model_cache = ProjectModelCache(self.project_root)
+    
+    def __getstate__(self):
+        # Pool workers only need the parsing methods, not the model built so far
+        return {'project_root': self.project_root}
+        
+    def analyze_project(self, jobs: int = None):
+        """Analyze the entire project
         
-    def analyze_project(self):
-        """Analyze the entire project"""
+        Args:
+            jobs: Worker processes for header parsing (default: CPU count)
+        """
         print(f"📂 Analyzing project: {self.project_root}")
         
         # Find all source files
         self._find_source_files()
         
         # Analyze headers to extract class information
-        for header in self.header_files:
-            self._analyze_header(header)
+        self._analyze_headers(jobs)
         
         # Analyze source files for implementation details
         for source in self.source_files:
             self._analyze_source(source)
         
+        self.model_cache.save()
+        print(f"  🗃️  {self.model_cache.stats()}")
         print(f"✅ Found {len(self.classes)} classes with {sum(len(c.methods) for c in self.classes.values())} methods")
         return self.classes
     
@@ -96,61 +107,92 @@ class CppProjectAnalyzer:
             for pattern in patterns['sources']:
                 self.source_files.extend(search_dir.rglob(pattern))
         
-        # Remove duplicates
-        self.header_files = list(set(self.header_files))
-        self.source_files = list(set(self.source_files))
+        # Remove duplicates (sorted so classes merge in the same order every run)
+        self.header_files = sorted(set(self.header_files))
+        self.source_files = sorted(set(self.source_files))
         
         print(f"  📄 Found {len(self.header_files)} headers, {len(self.source_files)} sources")
     
-    def _analyze_header(self, header_path: Path):
-        """Analyze a header file to extract class information"""
-        try:
-            with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+    def _analyze_headers(self, jobs: int = None):
+        """Analyze all headers to extract class information; headers missing from
+        the project model are parsed across worker processes"""
+        for header_path, header_classes, error in self.model_cache.get_many(
+                self.header_files, 'generic.classes', self._parse_header_classes, workers=jobs):
+            if error is not None:
+                print(f"  ⚠️  Error analyzing {header_path.name}: {error}")
+                continue
             
-            # Remove comments
-            content = self._remove_comments(content)
+            for class_data in header_classes:
+                self._merge_class(class_data, header_path)
+    
+    def _parse_header_classes(self, header_path: Path) -> List[Dict]:
+        """Parse the classes declared in one header into plain dicts for the project model"""
+        header_path = Path(header_path)
+        with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        
+        # Remove comments
+        content = self._remove_comments(content)
+        
+        # Extract namespace
+        namespace = self._extract_namespace(content)
+        
+        # Find all classes
+        class_matches = re.finditer(
+            r'\b(?:class|struct)\s+(\w+)(?:\s*:\s*([^{]+))?\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}',
+            content,
+            re.DOTALL
+        )
+        
+        parsed = []
+        for match in class_matches:
+            class_name = match.group(1)
+            inheritance = match.group(2) or ""
+            class_body = match.group(3)
             
-            # Extract namespace
-            namespace = self._extract_namespace(content)
+            class_info = ClassInfo(name=class_name, namespace=namespace)
             
-            # Find all classes
-            class_matches = re.finditer(
-                r'\b(?:class|struct)\s+(\w+)(?:\s*:\s*([^{]+))?\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}',
-                content,
-                re.DOTALL
-            )
+            # Extract base classes
+            if inheritance:
+                base_classes = re.findall(r'\b(?:public|protected|private)?\s*(\w+)', inheritance)
+                class_info.base_classes.extend(base_classes)
             
-            for match in class_matches:
-                class_name = match.group(1)
-                inheritance = match.group(2) or ""
-                class_body = match.group(3)
-                
-                if class_name in self.classes:
-                    # Update existing class
-                    class_info = self.classes[class_name]
-                else:
-                    # Create new class
-                    class_info = ClassInfo(
-                        name=class_name,
-                        namespace=namespace,
-                        header_file=header_path
-                    )
-                    self.classes[class_name] = class_info
-                
-                # Extract base classes
-                if inheritance:
-                    base_classes = re.findall(r'\b(?:public|protected|private)?\s*(\w+)', inheritance)
-                    class_info.base_classes.extend(base_classes)
-                
-                # Extract methods
-                self._extract_methods(class_body, class_info)
-                
-                # Check if abstract
-                class_info.is_abstract = '= 0' in class_body
-                
-        except Exception as e:
-            print(f"  ⚠️  Error analyzing {header_path.name}: {e}")
+            # Extract methods
+            self._extract_methods(class_body, class_info)
+            
+            # Check if abstract
+            class_info.is_abstract = '= 0' in class_body
+            
+            class_data = asdict(class_info)
+            class_data['header_file'] = None
+            class_data['dependencies'] = sorted(class_info.dependencies)
+            parsed.append(class_data)
+        
+        return parsed
+    
+    def _merge_class(self, class_data: Dict, header_path: Path):
+        """Merge one parsed class from the project model into self.classes"""
+        class_name = class_data['name']
+        if class_name in self.classes:
+            # Update existing class
+            class_info = self.classes[class_name]
+        else:
+            # Create new class
+            class_info = ClassInfo(
+                name=class_name,
+                namespace=class_data['namespace'],
+                header_file=header_path
+            )
+            self.classes[class_name] = class_info
+        
+        class_info.base_classes.extend(class_data['base_classes'])
+        for method_data in class_data['methods']:
+            method_data['parameters'] = [tuple(p) for p in method_data['parameters']]
+            class_info.methods.append(MethodInfo(**method_data))
+        if any(m['is_constructor'] for m in class_data['methods']):
+            # The last constructor seen decides, as when parsing in place
+            class_info.has_default_constructor = class_data['has_default_constructor']
+        class_info.is_abstract = class_data['is_abstract']
     
     def _analyze_source(self, source_path: Path):
         """Analyze a source file for additional implementation details"""
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+On-disk prompt/response cache for LLM calls
+Every model call site looks its prompt up here first, keyed by a content hash
+of (model, options, prompt), so a rerun over unchanged code makes no model
+calls. Entries expire after a TTL and the cache is kept under a size bound
+by evicting the least recently used entries.
+
+One JSON file per entry under output/LLMResponseCache/; the file's mtime is
+its last use. Settings come from the [LLM_CACHE] section of CppMicroAgent.cfg.
+"""
+
+import configparser
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+try:
+    from .llm_telemetry import telemetry
+    from .metrics_registry import CACHE_REQUESTS, CACHE_EVICTIONS
+except ImportError:
+    from llm_telemetry import telemetry
+    from metrics_registry import CACHE_REQUESTS, CACHE_EVICTIONS
+
+DEFAULT_MAX_SIZE_MB = 256
+DEFAULT_TTL_HOURS = 168
+
+_ROOT_DIR = Path(__file__).parent.parent
+
+
+def make_key(model: str, prompt: str, options: dict = None) -> str:
+    """Content hash identifying one request"""
+    material = json.dumps({'model': model, 'options': options or {}, 'prompt': prompt},
+                          sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class LLMResponseCache:
+    """Size-bounded LRU cache of model responses with a TTL"""
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_SIZE_MB * 1024 * 1024,
+                 ttl_seconds=DEFAULT_TTL_HOURS * 3600, enabled=True):
+        self.cache_dir = Path(cache_dir) if cache_dir else _ROOT_DIR / "output" / "LLMResponseCache"
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first; loaded on first use
+        self._index = None
+        self._total_bytes = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self):
+        """Scan the cache directory once, ordering entries by last use"""
+        if self._index is not None:
+            return
+        entries = []
+        if self.cache_dir.exists():
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith('.json'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name[:-5], stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(self._index.values())
+
+    def _forget(self, key: str):
+        """Drop an entry from the index and the disk"""
+        self._total_bytes -= self._index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def get(self, model: str, prompt: str, options: dict = None):
+        """Cached response for this request, or None"""
+        if not self.enabled:
+            return None
+        key = make_key(model, prompt, options)
+        with self._lock:
+            self._load_index()
+            if key not in self._index:
+                self.misses += 1
+                CACHE_REQUESTS.labels(cache='llm_response', result='miss').inc()
+                return None
+            try:
+                with open(self._path(key), 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                self._forget(key)
+                self.misses += 1
+                CACHE_REQUESTS.labels(cache='llm_response', result='miss').inc()
+                return None
+
+            if time.time() - entry.get('created', 0) > self.ttl_seconds:
+                self._forget(key)
+                self.expired += 1
+                self.misses += 1
+                CACHE_REQUESTS.labels(cache='llm_response', result='miss').inc()
+                return None
+
+            # Mark as most recently used, on disk too for the next run
+            self._index.move_to_end(key)
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            self.hits += 1
+            CACHE_REQUESTS.labels(cache='llm_response', result='hit').inc()
+            return entry['response']
+
+    def discard(self, model: str, prompt: str, options: dict = None):
+        """Drop a stored response, e.g. one whose output failed validation"""
+        if not self.enabled:
+            return
+        key = make_key(model, prompt, options)
+        with self._lock:
+            self._load_index()
+            self._forget(key)
+
+    def put(self, model: str, prompt: str, response: str, options: dict = None):
+        """Store a response, evicting least recently used entries over the size bound"""
+        if not self.enabled or not response:
+            return
+        key = make_key(model, prompt, options)
+        data = json.dumps({'model': model, 'options': options or {},
+                           'created': time.time(), 'response': response}).encode('utf-8')
+        with self._lock:
+            self._load_index()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                return
+
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            while self._total_bytes > self.max_bytes and len(self._index) > 1:
+                oldest = next(iter(self._index))
+                self._forget(oldest)
+                self.evictions += 1
+                CACHE_EVICTIONS.labels(cache='llm_response').inc()
+
+    def get_or_call(self, model: str, prompt: str, call_fn, options: dict = None, site: str = None) -> str:
+        """Cached response, or call_fn() on a miss (empty responses are not stored).
+        A hit is recorded in the LLM telemetry under site when one is given."""
+        start = time.perf_counter()
+        response = self.get(model, prompt, options)
+        if response is not None:
+            if site:
+                telemetry.record(site, model, time.perf_counter() - start, 'cached')
+            return response
+        response = call_fn()
+        self.put(model, prompt, response, options)
+        return response
+
+    def stats(self) -> str:
+        """One-line hit/miss summary"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        line = f"LLM cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% reused)"
+        if self.expired or self.evictions:
+            line += f", {self.expired} expired, {self.evictions} evicted"
+        return line
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Process-wide cache configured from the [LLM_CACHE] section of CppMicroAgent.cfg"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            config = configparser.ConfigParser()
+            config.read(_ROOT_DIR / "CppMicroAgent.cfg")
+            section = config['LLM_CACHE'] if 'LLM_CACHE' in config else {}
+            _shared_cache = LLMResponseCache(
+                max_bytes=int(float(section.get('max_size_mb', DEFAULT_MAX_SIZE_MB)) * 1024 * 1024),
+                ttl_seconds=float(section.get('ttl_hours', DEFAULT_TTL_HOURS)) * 3600,
+                enabled=str(section.get('enabled', 'true')).lower() == 'true'
+            )
+        return _shared_cache
+
+
+def set_response_cache(cache: LLMResponseCache):
+    """Replace the process-wide cache, e.g. so benchmarks never read or fill
+    the real output/LLMResponseCache"""
+    global _shared_cache
+    with _shared_lock:
+        _shared_cache = cache
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Deterministic local stand-in for an Ollama / OpenAI-compatible model server
+Serves the endpoints the model call sites use, so client concurrency, caching
+and streaming can be measured reproducibly without a model:
+
+    GET  /api/version, /api/tags, /v1/models
+    POST /api/generate            NDJSON stream (default) or one JSON reply
+    POST /v1/completions          OpenAI text completion, SSE with "stream"
+    POST /v1/chat/completions     OpenAI chat completion, SSE with "stream"
+
+Responses are replayed from a recordings file (JSONL of {"prompt", "response"},
+matched on the prompt, or for chat on the last user message) or produced by a
+template; the default template echoes the code the prompt carries, fenced
+like a model reply. With --record-from, prompts missing from the recordings
+are sent once to a real Ollama server and its reply is recorded.
+
+Timing follows a latency profile: model load time on the first request of a
+model, time to first token, token rate, a jitter fraction and the number of
+requests served in parallel (others queue, like OLLAMA_NUM_PARALLEL). Jitter
+and injected errors are seeded from the prompt, so a run is repeatable.
+
+Usage:
+    python3 src/llm_standin_server.py --port 11434 --profile cpu
+    python3 src/llm_standin_server.py --recordings prompts.jsonl --record-from localhost:11434
+    OLLAMA_HOST=127.0.0.1:11434 python3 src/quick_test_generator/generate_and_build_tests.py --use-ollama
+    OPENAI_BASE_URL=http://127.0.0.1:11434/v1 OPENAI_API_KEY=x python3 src/quick_test_generator/ollama_test_improver.py
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+DEFAULT_PORT = 11434
+VERSION = '0.0.0-standin'
+
+_PYTHON_TEST_CODE = re.compile(r'Current Python-generated test code:\n(.*?)\n\nTask:', re.DOTALL)
+_FENCED_CODE = re.compile(r'```[^\n]*\n(.*?)\n```', re.DOTALL)
+# A word with its trailing whitespace, roughly one model token
+_TOKEN = re.compile(r'\S+\s*|\s+')
+
+PLACEHOLDER_TEST = '#include <gtest/gtest.h>\n\nTEST(StandIn, Placeholder) {\n    SUCCEED();\n}'
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Simulated model timing"""
+    load_seconds: float = 0.0       # once per model, on its first request
+    ttft: float = 0.0               # prompt evaluation before the first token
+    tokens_per_second: float = 0.0  # 0 = the whole response at once
+    jitter: float = 0.0             # +/- fraction applied to ttft and token rate
+    parallel: int = 0               # requests generated at once, 0 = unlimited
+    error_rate: float = 0.0         # fraction of requests answered with HTTP 500
+
+
+PROFILES = {
+    'instant': LatencyProfile(),
+    'gpu': LatencyProfile(load_seconds=2.0, ttft=0.15, tokens_per_second=60.0, jitter=0.1, parallel=4),
+    'cpu': LatencyProfile(load_seconds=5.0, ttft=1.5, tokens_per_second=8.0, jitter=0.2, parallel=1),
+}
+
+
+def prompt_key(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+
+def echo_code(prompt: str) -> str:
+    """The code a prompt carries: the Python-generated test, else its first fenced block"""
+    match = _PYTHON_TEST_CODE.search(prompt) or _FENCED_CODE.search(prompt)
+    code = match.group(1).strip() if match else ''
+    return code or PLACEHOLDER_TEST
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN.findall(text)
+
+
+class Responder:
+    """Response text for a prompt: recorded, else recorded from upstream, else templated.
+
+    template is a str.format string with {code} (see echo_code), {model} and
+    {prompt}; the default answers with the echoed code in a ```cpp fence."""
+
+    def __init__(self, recordings=None, template=None, upstream=None, upstream_timeout=600.0):
+        self.recordings_file = Path(recordings) if recordings else None
+        self.template = template or "```cpp\n{code}\n```"
+        self.upstream = upstream
+        self.upstream_timeout = upstream_timeout
+        self.recorded = {}
+        self.replayed = 0
+        self.templated = 0
+        self._lock = threading.Lock()
+        if self.recordings_file and self.recordings_file.exists():
+            with open(self.recordings_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        key = entry.get('prompt_sha256') or prompt_key(entry['prompt'])
+                        self.recorded[key] = entry['response']
+
+    def respond(self, model: str, prompt: str) -> str:
+        key = prompt_key(prompt)
+        with self._lock:
+            response = self.recorded.get(key)
+        if response is None and self.upstream:
+            response = self._record(model, prompt, key)
+        if response is not None:
+            self.replayed += 1
+            return response
+        self.templated += 1
+        return self.template.format(code=echo_code(prompt), model=model, prompt=prompt)
+
+    def _record(self, model: str, prompt: str, key: str):
+        """Ask the upstream server once and append its answer to the recordings"""
+        host, _, port = self.upstream.partition(':')
+        conn = http.client.HTTPConnection(host, int(port or DEFAULT_PORT), timeout=self.upstream_timeout)
+        try:
+            conn.request('POST', '/api/generate',
+                         json.dumps({'model': model, 'prompt': prompt, 'stream': False}),
+                         {'Content-Type': 'application/json'})
+            reply = conn.getresponse()
+            if reply.status != 200:
+                return None
+            response = json.loads(reply.read()).get('response')
+        except (OSError, ValueError, http.client.HTTPException):
+            return None
+        finally:
+            conn.close()
+        if not response:
+            return None
+        with self._lock:
+            self.recorded[key] = response
+            if self.recordings_file:
+                self.recordings_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.recordings_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'model': model, 'prompt': prompt, 'response': response}) + "\n")
+        return response
+
+
+class _Generation:
+    """Timing of one request, drawn deterministically from the prompt and attempt"""
+
+    def __init__(self, profile: LatencyProfile, prompt: str, attempt: int):
+        rng = random.Random(f"{prompt_key(prompt)}:{attempt}")
+        spread = lambda: 1.0 + profile.jitter * (2.0 * rng.random() - 1.0)
+        self.ttft = profile.ttft * spread()
+        self.token_interval = 1.0 / (profile.tokens_per_second * spread()) if profile.tokens_per_second else 0.0
+        self.fails = rng.random() < profile.error_rate
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- plumbing -----------------------------------------------------------
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return {}
+
+    def _reply(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.flush()
+
+    def _end_stream(self):
+        self.wfile.write(b'0\r\n\r\n')
+        self.wfile.flush()
+
+    # -- routing --------------------------------------------------------------
+
+    def do_GET(self):
+        server = self.server.standin
+        if self.path == '/api/version':
+            self._reply({'version': VERSION})
+        elif self.path == '/api/tags':
+            self._reply({'models': [{'name': m, 'model': m} for m in sorted(server.loaded_models)]})
+        elif self.path == '/v1/models':
+            self._reply({'object': 'list', 'data': [{'id': m, 'object': 'model', 'owned_by': 'standin'}
+                                                    for m in sorted(server.loaded_models)]})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        request = self._read_json()
+        try:
+            if self.path == '/api/generate':
+                self._ollama_generate(request)
+            elif self.path == '/v1/completions':
+                self._openai(request, chat=False)
+            elif self.path == '/v1/chat/completions':
+                self._openai(request, chat=True)
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading, e.g. a stream cut off once the code was complete
+            self.server.standin.count('disconnected')
+            self.close_connection = True
+
+    # -- endpoints ------------------------------------------------------------
+
+    def _ollama_generate(self, request: dict):
+        server = self.server.standin
+        model = request.get('model') or 'standin'
+        prompt = request.get('prompt')
+        if not prompt:
+            # Model load (warm-up) request
+            load = server.load(model)
+            self._reply({'model': model, 'response': '', 'done': True, 'done_reason': 'load',
+                         'load_duration': int(load * 1e9)})
+            return
+        limit = (request.get('options') or {}).get('num_predict')
+        result = server.generate('api/generate', model, prompt, limit)
+        if result is None:
+            self._reply({'error': 'stand-in: injected failure'}, 500)
+            return
+        tokens, timing = result
+        stream = request.get('stream', True)
+
+        start = time.perf_counter()
+        if not stream:
+            server.wait_tokens(timing, len(tokens))
+            self._reply(self._ollama_final(model, prompt, ''.join(tokens), tokens, timing, start))
+            return
+        self._start_stream('application/x-ndjson')
+        for token in server.paced(tokens, timing):
+            self._chunk(json.dumps({'model': model, 'created_at': _now(), 'response': token,
+                                    'done': False}).encode('utf-8') + b"\n")
+        self._chunk(json.dumps(self._ollama_final(model, prompt, '', tokens, timing, start)).encode('utf-8') + b"\n")
+        self._end_stream()
+
+    @staticmethod
+    def _ollama_final(model, prompt, response, tokens, timing, start) -> dict:
+        generating = time.perf_counter() - start
+        return {'model': model, 'created_at': _now(), 'response': response, 'done': True,
+                'done_reason': timing['done_reason'],
+                'total_duration': int((timing['waited'] + generating) * 1e9),
+                'load_duration': int(timing['load'] * 1e9),
+                'prompt_eval_count': len(prompt) // 4,
+                'prompt_eval_duration': int(timing['ttft'] * 1e9),
+                'eval_count': len(tokens),
+                'eval_duration': int(max(generating, 1e-6) * 1e9)}
+
+    def _openai(self, request: dict, chat: bool):
+        server = self.server.standin
+        model = request.get('model') or 'standin'
+        if chat:
+            users = [m.get('content', '') for m in request.get('messages') or [] if m.get('role') == 'user']
+            prompt = users[-1] if users else ''
+        else:
+            prompt = request.get('prompt') or ''
+            prompt = prompt[0] if isinstance(prompt, list) and prompt else prompt
+        result = server.generate('v1/chat/completions' if chat else 'v1/completions',
+                                 model, prompt, request.get('max_tokens'))
+        if result is None:
+            self._reply({'error': {'message': 'stand-in: injected failure', 'type': 'server_error'}}, 500)
+            return
+        tokens, timing = result
+        ident = f"standin-{prompt_key(prompt)[:12]}"
+        kind = 'chat.completion' if chat else 'text_completion'
+        usage = {'prompt_tokens': len(prompt) // 4, 'completion_tokens': len(tokens),
+                 'total_tokens': len(prompt) // 4 + len(tokens)}
+        finish = 'length' if timing['done_reason'] == 'length' else 'stop'
+
+        if not request.get('stream'):
+            server.wait_tokens(timing, len(tokens))
+            text = ''.join(tokens)
+            choice = ({'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': finish}
+                      if chat else {'index': 0, 'text': text, 'finish_reason': finish})
+            self._reply({'id': ident, 'object': kind, 'created': int(time.time()), 'model': model,
+                         'choices': [choice], 'usage': usage})
+            return
+
+        self._start_stream('text/event-stream')
+        for token in server.paced(tokens, timing):
+            choice = ({'index': 0, 'delta': {'content': token}, 'finish_reason': None}
+                      if chat else {'index': 0, 'text': token, 'finish_reason': None})
+            self._sse({'id': ident, 'object': kind + ('.chunk' if chat else ''), 'model': model,
+                       'choices': [choice]})
+        last = ({'index': 0, 'delta': {}, 'finish_reason': finish}
+                if chat else {'index': 0, 'text': '', 'finish_reason': finish})
+        self._sse({'id': ident, 'object': kind + ('.chunk' if chat else ''), 'model': model,
+                   'choices': [last], 'usage': usage})
+        self._chunk(b"data: [DONE]\n\n")
+        self._end_stream()
+
+    def _sse(self, payload: dict):
+        self._chunk(b"data: " + json.dumps(payload).encode('utf-8') + b"\n\n")
+
+
+def _now() -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+class LLMStandInServer:
+    """Threaded stand-in server on host:port (0 = any free port); use as a context manager"""
+
+    def __init__(self, profile: LatencyProfile = None, responder: Responder = None,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.profile = profile or PROFILES['instant']
+        self.responder = responder or Responder()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        self.loaded_models = set()
+        self.counts = {}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._slots = threading.BoundedSemaphore(self.profile.parallel) if self.profile.parallel else None
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name="llm-standin")
+
+    @property
+    def address(self) -> str:
+        """host:port, the form OLLAMA_HOST takes"""
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        """Generation requests answered (warm-ups excluded)"""
+        with self._lock:
+            return sum(n for name, n in self.counts.items() if '/' in name)
+
+    def count(self, name: str):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def load(self, model: str) -> float:
+        """Simulate loading a model; returns the load time (0 once loaded)"""
+        with self._lock:
+            if model in self.loaded_models:
+                return 0.0
+            self.loaded_models.add(model)
+        time.sleep(self.profile.load_seconds)
+        return self.profile.load_seconds
+
+    def generate(self, endpoint: str, model: str, prompt: str, limit=None):
+        """(tokens, timing) for one request once a parallel slot is free and the
+        prompt is evaluated, or None for an injected failure"""
+        with self._lock:
+            attempt = self._attempts.get(prompt_key(prompt), 0)
+            self._attempts[prompt_key(prompt)] = attempt + 1
+        generation = _Generation(self.profile, prompt, attempt)
+        self.count(endpoint)
+        if generation.fails:
+            self.count('failed')
+            return None
+
+        queued = time.perf_counter()
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            with self._lock:
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            load = self.load(model)
+            waited = time.perf_counter() - queued
+            time.sleep(generation.ttft)
+            tokens = tokenize(self.responder.respond(model, prompt))
+        except BaseException:
+            self._release()
+            raise
+        done_reason = 'stop'
+        if limit and len(tokens) > limit:
+            tokens, done_reason = tokens[:limit], 'length'
+        return tokens, {'load': load, 'waited': waited, 'ttft': generation.ttft,
+                        'interval': generation.token_interval, 'done_reason': done_reason,
+                        'release': self._release}
+
+    def _release(self):
+        with self._lock:
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def paced(self, tokens, timing):
+        """Yield tokens at the profile's rate; frees the request's slot at the end"""
+        try:
+            for token in tokens:
+                if timing['interval']:
+                    time.sleep(timing['interval'])
+                yield token
+        finally:
+            timing['release']()
+
+    def wait_tokens(self, timing, count: int):
+        """Non-streaming: wait for the whole generation, then free the slot"""
+        try:
+            time.sleep(timing['interval'] * count)
+        finally:
+            timing['release']()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'requests': dict(self.counts), 'peak_in_flight': self.peak_in_flight,
+                    'replayed': self.responder.replayed, 'templated': self.responder.templated}
+
+    def serve_forever(self):
+        self.httpd.serve_forever()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deterministic local stand-in for an Ollama/OpenAI model server')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='instant',
+                        help='Latency profile to start from (default: instant)')
+    parser.add_argument('--load-seconds', type=float, help='Model load time on first use')
+    parser.add_argument('--ttft', type=float, help='Seconds to the first token')
+    parser.add_argument('--tokens-per-second', type=float, help='Generation rate (0 = instant)')
+    parser.add_argument('--jitter', type=float, help='+/- fraction of variation, seeded from the prompt')
+    parser.add_argument('--parallel', type=int, help='Requests generated at once (0 = unlimited)')
+    parser.add_argument('--error-rate', type=float, help='Fraction of requests failing with HTTP 500')
+    parser.add_argument('--recordings', type=Path, help='JSONL of {"prompt", "response"} to replay')
+    parser.add_argument('--record-from', metavar='HOST:PORT',
+                        help='Ask this Ollama server for prompts not in --recordings and record its replies')
+    parser.add_argument('--template', type=Path,
+                        help='Response template file; {code}, {model} and {prompt} are substituted')
+    args = parser.parse_args()
+
+    overrides = {field: getattr(args, field) for field in
+                 ('load_seconds', 'ttft', 'tokens_per_second', 'jitter', 'parallel', 'error_rate')
+                 if getattr(args, field) is not None}
+    profile = replace(PROFILES[args.profile], **overrides)
+    template = args.template.read_text() if args.template else None
+    responder = Responder(args.recordings, template, args.record_from)
+    server = LLMStandInServer(profile, responder, args.host, args.port)
+    print(f"LLM stand-in on http://{server.address} ({len(responder.recorded)} recorded responses)")
+    print(f"  {profile}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"  {server.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Telemetry for LLM calls
+Every model call records its call site, latency, outcome (ok, cached,
+timeout, error) and - when Ollama reports them - prompt/completion token
+counts and generation time. Calls are aggregated per call site into latency
+histograms and token totals, printed as a per-run summary and written to
+output/llm_telemetry.json under the working directory when the process
+exits. The same calls feed the cppmicroagent_llm_* metrics (see
+metrics_registry).
+"""
+
+import atexit
+import json
+import threading
+import time
+from pathlib import Path
+
+try:
+    from .metrics_registry import metrics, TIMEOUTS
+except ImportError:
+    from metrics_registry import metrics, TIMEOUTS
+
+# Upper bounds (seconds) of the latency histogram buckets; the last is open
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+OUTCOMES = ('ok', 'cached', 'timeout', 'error')
+
+LLM_REQUESTS = metrics.counter('cppmicroagent_llm_requests_total',
+                               'LLM calls by call site and outcome (ok, cached, timeout, error)',
+                               ['site', 'outcome'])
+LLM_SECONDS = metrics.histogram('cppmicroagent_llm_request_duration_seconds',
+                                'Latency of LLM calls answered by the model', ['site'],
+                                buckets=LATENCY_BUCKETS)
+LLM_TOKENS = metrics.counter('cppmicroagent_llm_tokens_total',
+                             'Tokens of LLM calls by call site and kind (prompt, completion)',
+                             ['site', 'kind'])
+
+
+def _percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def reply_counts(reply: dict) -> dict:
+    """Token counts and generation time from an Ollama /api/generate reply"""
+    return {
+        'prompt_tokens': reply.get('prompt_eval_count') or 0,
+        'completion_tokens': reply.get('eval_count') or 0,
+        'eval_seconds': (reply.get('eval_duration') or 0) / 1e9,
+    }
+
+
+class SiteStats:
+    """Aggregated calls of one call site"""
+
+    def __init__(self):
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.models = set()
+        self.latencies = []  # seconds, of calls that reached the model
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.eval_seconds = 0.0
+
+    def add(self, model, latency, outcome, prompt_tokens, completion_tokens, eval_seconds):
+        self.outcomes[outcome] += 1
+        self.models.add(model)
+        if outcome == 'cached':
+            return
+        self.latencies.append(latency)
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+        self.buckets[bucket] += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.eval_seconds += eval_seconds
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            'calls': sum(self.outcomes.values()),
+            **self.outcomes,
+            'models': sorted(self.models),
+            'latency_seconds': {
+                'total': round(sum(latencies), 3),
+                'mean': round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+                'p50': round(_percentile(latencies, 0.50), 3),
+                'p95': round(_percentile(latencies, 0.95), 3),
+                'max': round(latencies[-1], 3) if latencies else 0.0,
+                'histogram': {**{f"le_{bound:g}": count for bound, count in zip(LATENCY_BUCKETS, self.buckets)},
+                              'inf': self.buckets[-1]},
+            },
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'tokens_per_second': round(self.completion_tokens / self.eval_seconds, 1) if self.eval_seconds else 0.0,
+        }
+
+
+class LLMTelemetry:
+    """Thread-safe per-call-site recorder"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.sites = {}
+        self._lock = threading.Lock()
+
+    def record(self, site: str, model: str, latency: float, outcome: str = 'ok',
+               prompt_tokens: int = 0, completion_tokens: int = 0, eval_seconds: float = 0.0):
+        """Record one call; outcome is one of ok, cached, timeout, error"""
+        with self._lock:
+            stats = self.sites.get(site)
+            if stats is None:
+                stats = self.sites[site] = SiteStats()
+            stats.add(model, latency, outcome, prompt_tokens, completion_tokens, eval_seconds)
+        LLM_REQUESTS.labels(site=site, outcome=outcome).inc()
+        if outcome == 'timeout':
+            TIMEOUTS.labels(stage='llm').inc()
+        if outcome != 'cached':
+            LLM_SECONDS.labels(site=site).observe(latency)
+        if prompt_tokens:
+            LLM_TOKENS.labels(site=site, kind='prompt').inc(prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.labels(site=site, kind='completion').inc(completion_tokens)
+
+    def reset(self):
+        """Forget every recorded call"""
+        with self._lock:
+            self.started = time.time()
+            self.sites = {}
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                'started': self.started,
+                'finished': time.time(),
+                'latency_buckets': list(LATENCY_BUCKETS),
+                'sites': {site: stats.to_dict() for site, stats in sorted(self.sites.items())},
+            }
+
+    def summary(self) -> str:
+        """Per-call-site table of calls, latency and throughput"""
+        sites = self.to_dict()['sites']
+        if not sites:
+            return "LLM telemetry: no model calls"
+        lines = ["LLM telemetry:",
+                 f"  {'call site':<34} {'calls':>5} {'cached':>6} {'t/o':>4} {'err':>4} "
+                 f"{'p50 s':>7} {'p95 s':>7} {'prompt tok':>10} {'compl tok':>9} {'tok/s':>6}"]
+        for site, s in sites.items():
+            latency = s['latency_seconds']
+            lines.append(f"  {site:<34} {s['calls']:>5} {s['cached']:>6} {s['timeout']:>4} {s['error']:>4} "
+                         f"{latency['p50']:>7.2f} {latency['p95']:>7.2f} {s['prompt_tokens']:>10} "
+                         f"{s['completion_tokens']:>9} {s['tokens_per_second']:>6.1f}")
+        return '\n'.join(lines)
+
+    def write_json(self, path=None) -> Path:
+        """Write the machine-readable summary (default output/llm_telemetry.json
+        under the working directory, so batch projects each keep their own)"""
+        path = Path(path) if path else Path("output") / "llm_telemetry.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+telemetry = LLMTelemetry()
+
+
+@atexit.register
+def _write_at_exit():
+    if telemetry.sites:
+        try:
+            telemetry.write_json()
+        except OSError:
+            pass
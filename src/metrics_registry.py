@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Operational metrics in the Prometheus text exposition format
+Counters, gauges and histograms are fed by the builder, test runner, caches,
+coverage analysis and LLM telemetry. Every sample carries the job (script)
+and project labels, so runs over many repositories stay apart.
+
+Each process writes its metrics to output/metrics/<job>_<project>.prom while
+it runs and when it exits, in the node_exporter textfile-collector layout.
+Point a textfile collector at that folder, or serve it over HTTP:
+
+    python3 src/metrics_registry.py --serve 9464     # GET /metrics
+
+Settings come from the [METRICS] section of CppMicroAgent.cfg.
+"""
+
+import argparse
+import atexit
+import configparser
+import math
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+try:
+    from .config_reader import get_project_path
+except ImportError:
+    from config_reader import get_project_path
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_SECONDS = 15.0
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_ROOT_DIR = Path(__file__).parent.parent
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(pairs) -> str:
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}' if pairs else ''
+
+
+class _Value:
+    """One labelled series of a counter or gauge"""
+
+    def __init__(self, lock):
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = float(value)
+
+
+class _HistogramValue:
+    """One labelled series of a histogram"""
+
+    def __init__(self, lock, buckets):
+        self._lock = lock
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+
+class _Metric:
+    """A metric family; labels(...) selects a series, or call inc/set/observe
+    directly on a family without labels"""
+
+    kind = None
+
+    def __init__(self, registry, name: str, help: str, labelnames=()):
+        self._registry = registry
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _new_series(self):
+        return _Value(self._lock)
+
+    def labels(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = self._new_series()
+        self._registry.touched()
+        return series
+
+    def samples(self):
+        """(suffix, label pairs, value) of every series"""
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in series:
+            yield '', list(zip(self.labelnames, key)), value.value
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_series(self):
+        return _HistogramValue(self._lock, self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(h.counts), h.sum, h.count) for key, h in self._series.items()]
+        for key, counts, total, count in series:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                yield '_bucket', labels + [('le', _format_value(bound))], cumulative
+            yield '_sum', labels, total
+            yield '_count', labels, count
+
+
+class MetricsRegistry:
+    """Process-wide metric families, rendered in the Prometheus text format"""
+
+    def __init__(self, textfile_dir=None, flush_seconds=DEFAULT_FLUSH_SECONDS, enabled=True):
+        self.textfile_dir = Path(textfile_dir) if textfile_dir else _ROOT_DIR / "output" / "metrics"
+        self.flush_seconds = flush_seconds
+        self.enabled = enabled
+        self.started = time.time()
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._const_labels = None
+
+    def _get(self, cls, name, help, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(self, name, help, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} already registered as a different {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        """Counter family; names end in _total by convention"""
+        return self._get(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames=()) -> Gauge:
+        return self._get(Gauge, name, help, labelnames)
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+
+    def const_labels(self) -> list:
+        """job (the running script) and project labels carried by every sample"""
+        if self._const_labels is None:
+            script = Path(sys.argv[0]) if sys.argv and sys.argv[0] else Path('python')
+            job = script.parent.name if script.stem == '__main__' else script.stem
+            try:
+                project = get_project_path().name
+            except Exception:
+                project = 'unknown'
+            self._const_labels = [('job', job or 'python'), ('project', project)]
+        return self._const_labels
+
+    def touched(self):
+        """A series was observed: keep the textfile fresh while the process runs"""
+        if self._flusher is None and self.enabled and self.flush_seconds > 0:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name="metrics-flush")
+                    self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            if not self.enabled:
+                continue
+            try:
+                self.write_textfile()
+            except OSError:
+                pass
+
+    def render(self) -> str:
+        """Every metric with at least one series, in the text exposition format"""
+        const = self.const_labels()
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            samples = list(metric.samples())
+            if not samples:
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in samples:
+                lines.append(f"{metric.name}{suffix}{_label_text(const + labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def has_samples(self) -> bool:
+        with self._lock:
+            return any(metric._series for metric in self._metrics.values())
+
+    def textfile_path(self) -> Path:
+        labels = dict(self.const_labels())
+        stem = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{labels['job']}_{labels['project']}")
+        return self.textfile_dir / f"{stem}.prom"
+
+    def write_textfile(self, path=None) -> Path:
+        """Write the exposition atomically (default output/metrics/<job>_<project>.prom)"""
+        path = Path(path) if path else self.textfile_path()
+        self.gauge('cppmicroagent_last_run_timestamp_seconds',
+                   'Unix time of the last metrics update of this job').set(time.time())
+        self.gauge('cppmicroagent_run_duration_seconds',
+                   'Seconds since the job started').set(time.time() - self.started)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(self.render(), encoding='utf-8')
+        os.replace(tmp_path, path)
+        return path
+
+
+def _load_registry() -> MetricsRegistry:
+    """Registry configured from the [METRICS] section of CppMicroAgent.cfg"""
+    config = configparser.ConfigParser()
+    config.read(_ROOT_DIR / "CppMicroAgent.cfg")
+    section = config['METRICS'] if 'METRICS' in config else {}
+    textfile_dir = section.get('textfile_dir', '').strip()
+    return MetricsRegistry(
+        textfile_dir=_ROOT_DIR / textfile_dir if textfile_dir else None,
+        flush_seconds=float(section.get('flush_seconds', DEFAULT_FLUSH_SECONDS)),
+        enabled=str(section.get('enabled', 'false')).lower() == 'true'
+    )
+
+
+metrics = _load_registry()
+
+# Families recorded by more than one module
+TIMEOUTS = metrics.counter('cppmicroagent_timeouts_total',
+                           'Operations abandoned after their time limit, by stage', ['stage'])
+TEST_RUN_SECONDS = metrics.histogram('cppmicroagent_test_run_duration_seconds',
+                                     'Run time of one test binary by result (passed, failed, timeout, error)',
+                                     ['result'], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+CACHE_REQUESTS = metrics.counter('cppmicroagent_cache_requests_total',
+                                 'Cache lookups by cache and result (hit, miss)', ['cache', 'result'])
+CACHE_EVICTIONS = metrics.counter('cppmicroagent_cache_evictions_total',
+                                  'Entries evicted to stay under the size bound', ['cache'])
+
+
+@atexit.register
+def _write_at_exit():
+    if metrics.enabled and metrics.has_samples():
+        try:
+            metrics.write_textfile()
+        except OSError:
+            pass
+
+
+def merge_textfiles(directory) -> str:
+    """One exposition from every *.prom file in directory; families of the
+    same name are merged so each has a single HELP and TYPE line"""
+    families = {}
+    for path in sorted(Path(directory).glob('*.prom')):
+        current = None
+        try:
+            text = path.read_text(encoding='utf-8')
+        except OSError:
+            continue
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            if line.startswith('# HELP ') or line.startswith('# TYPE '):
+                _, keyword, name, *rest = line.split(' ', 3)
+                family = families.setdefault(name, {'help': None, 'type': None, 'samples': []})
+                key = 'help' if keyword == 'HELP' else 'type'
+                if family[key] is None:
+                    family[key] = rest[0] if rest else ''
+                current = family
+            elif not line.startswith('#') and current is not None:
+                current['samples'].append(line)
+    lines = []
+    for name, family in families.items():
+        if family['help'] is not None:
+            lines.append(f"# HELP {name} {family['help']}")
+        if family['type'] is not None:
+            lines.append(f"# TYPE {name} {family['type']}")
+        lines.extend(family['samples'])
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+class _ExporterHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = merge_textfiles(self.server.textfile_dir).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve or print the metrics written by CppMicroAgent runs')
+    parser.add_argument('--dir', type=Path, default=metrics.textfile_dir,
+                        help=f'Folder of .prom files (default: {metrics.textfile_dir})')
+    parser.add_argument('--serve', type=int, metavar='PORT',
+                        help='Serve GET /metrics on this port instead of printing once')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    args = parser.parse_args()
+
+    if args.serve is None:
+        sys.stdout.write(merge_textfiles(args.dir))
+        return 0
+    httpd = ThreadingHTTPServer((args.host, args.serve), _ExporterHandler)
+    httpd.textfile_dir = args.dir
+    print(f"Serving {args.dir} at http://{args.host}:{args.serve}/metrics")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Project-level store of generated mock headers
+Every function of a source file needs the same mocks, so a mock is generated
+once per (include name, consuming header + source) and then hard-linked (or
+copied) into each function folder instead of being regenerated per function.
+
+A new mock is checked with a syntax-only compile; if it does not compile the
+generator is asked once more with the compiler errors. Entries live under
+output/MockStore/ and are reused by later runs over unchanged code (the
+consuming files and the real header being mocked); a mock that failed both
+checks is never reused but generated again, bypassing cached responses.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+try:
+    from .flow_manager import flow
+except ImportError:
+    from flow_manager import flow
+
+DEFAULT_STORE_DIR = os.path.join("output", "MockStore")
+
+
+def mock_key(include_name: str, header_content: str, source_content: str,
+             include_content: str = '') -> str:
+    """Store key: the include plus a hash of the files that consume it and of
+    the real header, whose declarations the mock prompt is built from"""
+    digest = hashlib.sha256()
+    for part in (include_name, header_content, source_content, include_content):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    stem = os.path.splitext(os.path.basename(include_name))[0]
+    return f"{stem}_{digest.hexdigest()[:16]}"
+
+
+class MockStore:
+    """Generate-once store of mock headers, safe to use from function workers"""
+
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, compiler='g++'):
+        self.store_dir = store_dir
+        self.compiler = compiler
+        self.generated = 0
+        self.reused = 0
+        self.invalid = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def check_syntax(self, mock_path: str, include_dirs=()) -> str:
+        """Compiler errors of a syntax-only compile, or "" if the mock compiles"""
+        cmd = [self.compiler, "-std=c++17", "-fsyntax-only", "-x", "c++",
+               f"-I{os.path.dirname(mock_path)}", *[f"-I{d}" for d in include_dirs], mock_path]
+        try:
+            with flow.span("mock syntax check", category="subprocess", mock=os.path.basename(mock_path)):
+                result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        except subprocess.TimeoutExpired:
+            return "syntax check timed out"
+        except OSError as e:
+            # No compiler to validate with: accept the mock as before
+            print(f"[MockStore] Cannot run {self.compiler} to validate mocks: {e}")
+            return ""
+        return "" if result.returncode == 0 else (result.stderr or result.stdout)
+
+    def get_or_create(self, include_name, header_content, source_content, generate, include_dirs=(),
+                      include_path=None, discard=None):
+        """Path of the stored mock for this include, generating it if needed.
+
+        generate(entry_dir, errors, fresh) must write the mock into entry_dir
+        and return its file name; errors is None on the first attempt and the
+        compiler output when the first mock did not compile. fresh is True
+        when a stored mock failed the check before, so a cached model
+        response must not be reused. include_path is the real header, if
+        known. discard(file_name) is called for every mock that fails the
+        check, e.g. to drop the response it was made from."""
+        include_content = ''
+        if include_path:
+            try:
+                with open(include_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    include_content = f.read()
+            except OSError:
+                pass
+        key = mock_key(include_name, header_content, source_content, include_content)
+        entry_dir = os.path.join(self.store_dir, key)
+        meta_path = os.path.join(entry_dir, "mock.json")
+
+        # Functions of the same file wait for the one generating their mock
+        with self._key_lock(key):
+            fresh = False
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                mock_path = os.path.join(entry_dir, meta['file'])
+                if meta.get('valid', True) and os.path.exists(mock_path):
+                    with self._lock:
+                        self.reused += 1
+                    print(f"[MockStore] Reusing mock {meta['file']} ({key})")
+                    return mock_path
+                fresh = True
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.makedirs(entry_dir)
+            errors = None
+            for attempt in range(2):
+                file_name = generate(entry_dir, errors, fresh)
+                mock_path = os.path.join(entry_dir, file_name)
+                errors = self.check_syntax(mock_path, include_dirs)
+                if not errors:
+                    break
+                if discard is not None:
+                    discard(file_name)
+                print(f"[MockStore] Mock {file_name} does not compile (attempt {attempt + 1}/2)")
+
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'include': include_name, 'file': file_name, 'valid': not errors}, f)
+            with self._lock:
+                self.generated += 1
+                if errors:
+                    self.invalid += 1
+            return mock_path
+
+    def install(self, mock_path: str, folder: str) -> str:
+        """Hard-link (or copy) a stored mock into a function folder"""
+        target = os.path.join(folder, os.path.basename(mock_path))
+        if os.path.exists(target):
+            os.remove(target)
+        try:
+            os.link(mock_path, target)
+        except OSError:
+            shutil.copy2(mock_path, target)
+        return target
+
+    def stats(self) -> str:
+        """One-line generated/reused summary"""
+        line = f"mock store: {self.generated} generated, {self.reused} reused"
+        if self.invalid:
+            line += f", {self.invalid} failed the syntax check"
+        return line
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_mock_store(compiler='g++') -> MockStore:
+    """Process-wide mock store"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = MockStore(compiler=compiler)
+        return _shared_store
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Bounded-concurrency batch client for the Ollama HTTP API
+Submits many independent prompts to /api/generate at once with asyncio,
+keeping at most `concurrency` requests in flight and giving each its own
+deadline. Results are handed to a callback as they complete, so the caller
+can write files while slower prompts are still generating. Prompts already
+in the LLM response cache are answered from it without a request.
+
+Uses only the standard library: a cancelled or timed-out request closes its
+socket, which makes Ollama abort that generation. The server address and
+keep_alive come from the shared transport (see ollama_transport).
+"""
+
+import asyncio
+import json
+import time
+
+try:
+    from .llm_response_cache import get_response_cache
+    from .ollama_transport import get_transport
+    from .llm_telemetry import telemetry, reply_counts
+except ImportError:
+    from llm_response_cache import get_response_cache
+    from ollama_transport import get_transport
+    from llm_telemetry import telemetry, reply_counts
+
+DEFAULT_CONCURRENCY = 4
+DEFAULT_DEADLINE = 30.0
+
+
+class OllamaBatchError(Exception):
+    """A batch request failed (connection, HTTP status or malformed reply)"""
+
+
+async def _read_body(reader, headers) -> bytes:
+    """HTTP/1.1 response body, plain or chunked"""
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = bytearray()
+        while True:
+            size = int((await reader.readline()).split(b';')[0].strip() or b'0', 16)
+            if size == 0:
+                return bytes(body)
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)  # CRLF after each chunk
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length']))
+    return await reader.read()
+
+
+async def post_json(host: str, port: int, path: str, payload: dict) -> dict:
+    """POST a JSON payload and return the decoded JSON reply"""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as e:
+        raise OllamaBatchError(f"cannot connect to Ollama at {host}:{port}: {e}") from e
+    try:
+        body = json.dumps(payload).encode('utf-8')
+        writer.write((f"POST {path} HTTP/1.1\r\n"
+                      f"Host: {host}:{port}\r\n"
+                      "Content-Type: application/json\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Connection: close\r\n\r\n").encode('ascii') + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        parts = status_line.split(None, 2)
+        if len(parts) < 2:
+            raise OllamaBatchError("empty reply from Ollama")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        data = await _read_body(reader, headers)
+        if status != 200:
+            raise OllamaBatchError(f"HTTP {status}: {data[:200].decode('utf-8', errors='ignore')}")
+        try:
+            return json.loads(data)
+        except ValueError as e:
+            raise OllamaBatchError(f"malformed reply: {e}") from e
+    except (OSError, asyncio.IncompleteReadError) as e:
+        raise OllamaBatchError(f"connection to Ollama failed: {e}") from e
+    finally:
+        writer.close()
+
+
+async def _generate_all(prompts: dict, model: str, on_result, concurrency: int,
+                        deadline: float, transport, site: str) -> dict:
+    """Run every prompt, at most `concurrency` at a time, and report each result"""
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {'completed': 0, 'failed': 0, 'timed_out': 0}
+
+    async def one(key, prompt):
+        async with semaphore:
+            payload = {'model': model, 'prompt': prompt, 'stream': False,
+                       'keep_alive': transport.keep_alive}
+            # The deadline starts when the request is sent, not while queued
+            start = time.perf_counter()
+            try:
+                reply = await asyncio.wait_for(post_json(transport.host, transport.port, '/api/generate', payload),
+                                               deadline)
+            except asyncio.TimeoutError:
+                telemetry.record(site, model, time.perf_counter() - start, 'timeout')
+                return key, None, f"no reply within {deadline:.0f}s"
+            except OllamaBatchError as e:
+                telemetry.record(site, model, time.perf_counter() - start, 'error')
+                return key, None, str(e)
+            telemetry.record(site, model, time.perf_counter() - start, 'ok', **reply_counts(reply))
+            return key, reply.get('response', ''), None
+
+    tasks = [asyncio.ensure_future(one(key, prompt)) for key, prompt in prompts.items()]
+    for finished in asyncio.as_completed(tasks):
+        key, text, error = await finished
+        if error is None:
+            stats['completed'] += 1
+        elif error.startswith('no reply within'):
+            stats['timed_out'] += 1
+        else:
+            stats['failed'] += 1
+        on_result(key, text, error)
+    return stats
+
+
+def run_batch(prompts: dict, model: str, on_result, concurrency: int = DEFAULT_CONCURRENCY,
+              deadline: float = DEFAULT_DEADLINE, site: str = 'ollama_batch') -> dict:
+    """Generate a completion for every {key: prompt}.
+
+    on_result(key, text, error) is called in completion order; text is None
+    when the request failed or missed its deadline. Returns counts of
+    cached / completed / failed / timed_out requests and the elapsed wall time.
+    Every request is recorded in the LLM telemetry under site."""
+    # Answer what the cache already knows before opening any connection
+    cache = get_response_cache()
+    uncached = {}
+    cached_count = 0
+    for key, prompt in prompts.items():
+        lookup_start = time.perf_counter()
+        response = cache.get(model, prompt)
+        if response is None:
+            uncached[key] = prompt
+        else:
+            telemetry.record(site, model, time.perf_counter() - lookup_start, 'cached')
+            cached_count += 1
+            on_result(key, response, None)
+
+    def store_and_report(key, text, error):
+        if error is None:
+            cache.put(model, prompts[key], text)
+        on_result(key, text, error)
+
+    transport = get_transport()
+    if uncached:
+        # Load the model once up front instead of in every concurrent request
+        transport.warm_up(model)
+
+    start = time.perf_counter()
+    stats = asyncio.run(_generate_all(uncached, model, store_and_report, max(1, concurrency),
+                                      deadline, transport, site))
+    stats['cached'] = cached_count
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
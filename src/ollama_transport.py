@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport to the Ollama server
+One process-wide pool of keep-alive HTTP connections to the Ollama API,
+used instead of starting an `ollama run` process per prompt. Models are
+asked to stay loaded (keep_alive) and can be warmed up before the first
+real prompt, and the "is Ollama running?" probe is cached for a short time.
+
+Standard library only (http.client), so the quick test generator scripts
+keep working without extra packages.
+"""
+
+import configparser
+import http.client
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    from .llm_telemetry import telemetry, reply_counts
+except ImportError:
+    from llm_telemetry import telemetry, reply_counts
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_KEEP_ALIVE = '10m'
+# How long a health probe result is trusted
+HEALTH_TTL_SECONDS = 30.0
+
+_ROOT_DIR = Path(__file__).parent.parent
+
+
+class OllamaTransportError(Exception):
+    """A request to the Ollama server failed"""
+
+
+class OllamaTimeoutError(OllamaTransportError):
+    """A request to the Ollama server did not finish in time"""
+
+
+def ollama_address():
+    """(host, port) of the Ollama server, honouring OLLAMA_HOST like the ollama CLI"""
+    value = os.environ.get('OLLAMA_HOST', '').strip()
+    if not value:
+        return 'localhost', 11434
+    if '://' not in value:
+        value = 'http://' + value
+    parts = urlsplit(value)
+    return parts.hostname or 'localhost', parts.port or 11434
+
+
+class OllamaTransport:
+    """Thread-safe pool of keep-alive connections to one Ollama server"""
+
+    def __init__(self, host=None, port=None, pool_size=DEFAULT_POOL_SIZE,
+                 keep_alive=DEFAULT_KEEP_ALIVE, timeout=60.0):
+        default_host, default_port = ollama_address()
+        self.host = host or default_host
+        self.port = port or default_port
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        # Idle connections; at most pool_size are kept, extra ones are closed
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._lock = threading.Lock()
+        self._warm_models = set()
+        self._health = None  # (checked_at, available)
+
+    def _acquire(self, timeout):
+        """An idle pooled connection, or a new one"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn
+
+    def _release(self, conn):
+        """Return a healthy connection to the pool"""
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _send(self, method: str, path: str, payload, timeout, on_sent=None):
+        """(connection, response) of one request, its body not yet read.
+        A reused connection the server has since closed is retried once.
+        on_sent(conn) is called once the request is on the wire."""
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+
+        for attempt in range(2):
+            conn = self._acquire(timeout)
+            reused = conn.sock is not None
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                if on_sent is not None:
+                    on_sent(conn)
+                return conn, conn.getresponse()
+            except socket.timeout as e:
+                conn.close()
+                raise OllamaTimeoutError(f"no reply from Ollama within {timeout:g}s") from e
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # stale keep-alive connection
+                raise OllamaTransportError(f"connection to Ollama failed: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                raise OllamaTransportError(f"cannot reach Ollama at {self.host}:{self.port}: {e}") from e
+
+    def _finish(self, conn, resp):
+        """Pool the connection if its response was read to the end, else close it"""
+        if resp.isclosed() and not resp.will_close:
+            self._release(conn)
+        else:
+            conn.close()
+
+    def request_raw(self, method: str, path: str, payload=None, timeout=None) -> bytes:
+        """Send one request over a pooled connection and return the reply body"""
+        timeout = timeout or self.timeout
+        conn, resp = self._send(method, path, payload, timeout)
+        try:
+            data = resp.read()
+        except socket.timeout as e:
+            conn.close()
+            raise OllamaTimeoutError(f"no reply from Ollama within {timeout:g}s") from e
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            raise OllamaTransportError(f"connection to Ollama failed: {e}") from e
+        self._finish(conn, resp)
+        if resp.status != 200:
+            raise OllamaTransportError(f"HTTP {resp.status}: {data[:200].decode('utf-8', errors='ignore')}")
+        return data
+
+    def request_json(self, method: str, path: str, payload=None, timeout=None) -> dict:
+        """Send one request over a pooled connection and return the JSON reply"""
+        data = self.request_raw(method, path, payload, timeout)
+        try:
+            return json.loads(data) if data else {}
+        except ValueError as e:
+            raise OllamaTransportError(f"malformed reply from Ollama: {e}") from e
+
+    @contextmanager
+    def open_stream(self, path: str, payload: dict, timeout=None, cancel=None):
+        """POST payload and yield the response while its body streams in.
+
+        The connection goes back to the pool only if the body was read to the
+        end; leaving the block early closes it, which makes Ollama abort the
+        generation. Setting cancel (a threading.Event) shuts the socket down,
+        so a request still evaluating its prompt or waiting for a slow token
+        fails at once. Read errors in the block are raised as
+        OllamaTransportError / OllamaTimeoutError."""
+        timeout = timeout or self.timeout
+        done = threading.Event()
+
+        def watch(conn):
+            threading.Thread(target=self._abort_on_cancel, args=(conn, cancel, done),
+                             daemon=True, name="ollama-cancel").start()
+
+        try:
+            conn, resp = self._send('POST', path, payload, timeout, watch if cancel is not None else None)
+            try:
+                if resp.status != 200:
+                    data = resp.read()
+                    raise OllamaTransportError(f"HTTP {resp.status}: "
+                                               f"{data[:200].decode('utf-8', errors='ignore')}")
+                yield resp
+            except socket.timeout as e:
+                raise OllamaTimeoutError(f"no reply from Ollama within {timeout:g}s") from e
+            except (OSError, http.client.HTTPException) as e:
+                raise OllamaTransportError(f"connection to Ollama failed: {e}") from e
+            finally:
+                done.set()
+                if cancel is not None and cancel.is_set():
+                    conn.close()
+                else:
+                    self._finish(conn, resp)
+        finally:
+            done.set()
+
+    @staticmethod
+    def _abort_on_cancel(conn, cancel, done):
+        """Shut conn's socket down once cancel is set, unless the request ended first"""
+        while not done.is_set():
+            if cancel.wait(0.1):
+                sock = conn.sock
+                if not done.is_set() and sock is not None:
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                return
+
+    def generate(self, model: str, prompt: str, timeout=None, options=None, site='ollama_transport') -> str:
+        """Complete a prompt (non-streaming) and return the response text.
+        The call is recorded in the LLM telemetry under site."""
+        payload = {'model': model, 'prompt': prompt, 'stream': False, 'keep_alive': self.keep_alive}
+        if options:
+            payload['options'] = options
+        start = time.perf_counter()
+        try:
+            reply = self.request_json('POST', '/api/generate', payload, timeout)
+        except OllamaTimeoutError:
+            telemetry.record(site, model, time.perf_counter() - start, 'timeout')
+            raise
+        except OllamaTransportError:
+            telemetry.record(site, model, time.perf_counter() - start, 'error')
+            raise
+        telemetry.record(site, model, time.perf_counter() - start, 'ok', **reply_counts(reply))
+        return reply.get('response', '').strip()
+
+    def warm_up(self, model: str, timeout=None) -> bool:
+        """Load a model into memory (once per process) so the first prompt does
+        not pay for it. Returns False if the model could not be loaded."""
+        with self._lock:
+            if model in self._warm_models:
+                return True
+        try:
+            # A generate request without a prompt only loads the model
+            self.request_json('POST', '/api/generate',
+                              {'model': model, 'keep_alive': self.keep_alive}, timeout)
+        except OllamaTransportError as e:
+            print(f"  ⚠️  Could not warm up {model}: {e}")
+            return False
+        with self._lock:
+            self._warm_models.add(model)
+        return True
+
+    def is_available(self, max_age=HEALTH_TTL_SECONDS) -> bool:
+        """Whether the Ollama server answers, re-probed at most every max_age seconds"""
+        with self._lock:
+            if self._health is not None and time.monotonic() - self._health[0] < max_age:
+                return self._health[1]
+        try:
+            self.request_json('GET', '/api/version', timeout=2.0)
+            available = True
+        except OllamaTransportError:
+            available = False
+        with self._lock:
+            self._health = (time.monotonic(), available)
+        return available
+
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_shared_transport = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> OllamaTransport:
+    """Process-wide transport; keep_alive comes from [OLLAMA_SETTINGS] in CppMicroAgent.cfg"""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            config = configparser.ConfigParser()
+            config.read(_ROOT_DIR / "CppMicroAgent.cfg")
+            section = config['OLLAMA_SETTINGS'] if 'OLLAMA_SETTINGS' in config else {}
+            _shared_transport = OllamaTransport(keep_alive=section.get('keep_alive', DEFAULT_KEEP_ALIVE))
+        return _shared_transport
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Persistent parsed-project model for CppMicroAgent
+Stores what the C++ analyzers extract from each file (classes, methods,
+constructors, namespaces, includes) on disk, keyed by the file's content hash,
+so an unchanged project is re-analyzed from the cache instead of re-parsed.
+
+Each file entry holds a shared 'includes' section plus one section per
+analyzer (e.g. 'header_analyzer.classes'). A section is reused only while
+the file's content hash matches the hash it was parsed from.
+
+Files missing from the model can be parsed in bulk with get_many(), which
+fans the work out over a process pool in chunks and merges the results back
+in input order, so the model is the same whichever worker finishes first.
+"""
+
+import copy
+import hashlib
+import json
+import math
+import os
+import pickle
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+try:
+    from .metrics_registry import CACHE_REQUESTS
+except ImportError:
+    from metrics_registry import CACHE_REQUESTS
+
+CACHE_VERSION = 2
+
+# Below this many files a process pool costs more than it saves
+MIN_PARALLEL_FILES = 8
+# Chunks per worker - enough to balance uneven file sizes, few enough to
+# keep per-task pickling overhead small
+CHUNKS_PER_WORKER = 4
+
+_INCLUDE_RE = re.compile(r'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"]+)[>"]', re.MULTILINE)
+
+
+def default_cache_file(project_root) -> Path:
+    """Cache file for a project under output/ProjectModelCache/"""
+    project_root = Path(project_root).resolve()
+    root_dir = Path(__file__).parent.parent
+    digest = hashlib.sha1(str(project_root).encode('utf-8')).hexdigest()[:10]
+    return root_dir / "output" / "ProjectModelCache" / f"{project_root.name}_{digest}.json"
+
+
+def parse_includes(file_path) -> list:
+    """Canonical include list of a file: [{'path': 'common.h', 'system': False}, ...]"""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        content = f.read()
+    return [{'path': m.group(2), 'system': m.group(1) == '<'} for m in _INCLUDE_RE.finditer(content)]
+
+
+def _parse_chunk(parse_fn, file_paths) -> list:
+    """Parse a chunk of files in a worker, capturing per-file errors"""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append((parse_fn(file_path), None))
+        except Exception as e:
+            results.append((None, e))
+    return results
+
+
+def parse_files(file_paths, parse_fn, workers=None) -> list:
+    """Apply parse_fn to every file across a process pool.
+
+    Returns [(value, error)] in the order of file_paths. parse_fn must be
+    picklable (a module-level function, or a method of a picklable object).
+    Falls back to parsing inline when a pool is not worth it or unavailable."""
+    file_paths = list(file_paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(file_paths) < MIN_PARALLEL_FILES:
+        return _parse_chunk(parse_fn, file_paths)
+
+    chunk_size = max(1, math.ceil(len(file_paths) / (workers * CHUNKS_PER_WORKER)))
+    chunks = [file_paths[i:i + chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            # map() yields in submission order regardless of completion order
+            chunk_results = list(executor.map(_parse_chunk, [parse_fn] * len(chunks), chunks))
+    except (OSError, BrokenProcessPool, pickle.PicklingError, AttributeError) as e:
+        # AttributeError is what pickling a local function or lambda raises
+        print(f"  ⚠️  Parallel parsing unavailable ({e}), parsing sequentially")
+        return _parse_chunk(parse_fn, file_paths)
+    return [result for chunk in chunk_results for result in chunk]
+
+
+class ProjectModelCache:
+    """On-disk model of a C++ project's parsed files, keyed by content hash"""
+
+    def __init__(self, project_root, cache_file=None):
+        self.project_root = Path(project_root).resolve()
+        self.cache_file = Path(cache_file) if cache_file else default_cache_file(self.project_root)
+        self.files = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Load the model from disk, discarding it on version mismatch or corruption"""
+        if not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != CACHE_VERSION:
+            return
+        self.files = data.get('files', {})
+
+    def save(self):
+        """Write the model to disk if anything changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION,
+                           'project_root': str(self.project_root),
+                           'files': self.files}, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+
+    def _entry_for(self, file_path) -> dict:
+        """Return the up-to-date entry for a file, rehashing only if its stat changed"""
+        file_path = Path(file_path).resolve()
+        key = str(file_path)
+        stat = file_path.stat()
+        entry = self.files.get(key)
+
+        if entry and entry.get('mtime_ns') == stat.st_mtime_ns and entry.get('size') == stat.st_size:
+            return entry
+
+        with open(file_path, 'rb') as f:
+            content_hash = hashlib.sha1(f.read()).hexdigest()
+
+        if entry and entry.get('hash') == content_hash:
+            # Touched but unchanged - keep the parsed sections
+            entry['mtime_ns'] = stat.st_mtime_ns
+            entry['size'] = stat.st_size
+        else:
+            entry = {'hash': content_hash, 'mtime_ns': stat.st_mtime_ns,
+                     'size': stat.st_size, 'sections': {}}
+            self.files[key] = entry
+        self._dirty = True
+        return entry
+
+    def get(self, file_path, section: str, parse_fn):
+        """Return parse_fn(file_path) for this file, served from the model when
+        the file is unchanged. parse_fn must return JSON-serializable data."""
+        with self._lock:
+            entry = self._entry_for(file_path)
+            if section in entry['sections']:
+                self.hits += 1
+                CACHE_REQUESTS.labels(cache='project_model', result='hit').inc()
+                return copy.deepcopy(entry['sections'][section])
+
+        value = parse_fn(file_path)
+
+        with self._lock:
+            # Round-trip through JSON so hits and misses return identical shapes
+            entry['sections'][section] = json.loads(json.dumps(value))
+            self.misses += 1
+            CACHE_REQUESTS.labels(cache='project_model', result='miss').inc()
+            self._dirty = True
+            return copy.deepcopy(entry['sections'][section])
+
+    def get_many(self, file_paths, section: str, parse_fn, workers=None) -> list:
+        """Batch form of get(): returns [(file_path, value, error)] in input order.
+
+        Model lookups happen here in the calling process; only files whose
+        section is missing or stale are sent to parse_files(). error is the
+        exception raised for that file (value is then None)."""
+        file_paths = list(file_paths)
+        results = [None] * len(file_paths)
+        pending = []
+
+        with self._lock:
+            for idx, file_path in enumerate(file_paths):
+                try:
+                    entry = self._entry_for(file_path)
+                except OSError as e:
+                    results[idx] = (file_path, None, e)
+                    continue
+                if section in entry['sections']:
+                    self.hits += 1
+                    CACHE_REQUESTS.labels(cache='project_model', result='hit').inc()
+                    results[idx] = (file_path, copy.deepcopy(entry['sections'][section]), None)
+                else:
+                    pending.append((idx, entry))
+
+        parsed = parse_files([file_paths[idx] for idx, _ in pending], parse_fn, workers)
+
+        with self._lock:
+            for (idx, entry), (value, error) in zip(pending, parsed):
+                if error is None:
+                    entry['sections'][section] = json.loads(json.dumps(value))
+                    value = copy.deepcopy(entry['sections'][section])
+                    self.misses += 1
+                    CACHE_REQUESTS.labels(cache='project_model', result='miss').inc()
+                    self._dirty = True
+                results[idx] = (file_paths[idx], value, error)
+
+        return results
+
+    def includes(self, file_path) -> list:
+        """Canonical include list of a file (see parse_includes)"""
+        return self.get(file_path, 'includes', parse_includes)
+
+    def stats(self) -> str:
+        """One-line hit/miss summary"""
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        return f"model cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% reused)"
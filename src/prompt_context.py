@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Context-sliced prompts for the per-function workflow
+Instead of pasting whole header and source files into every LLM prompt, the
+prompt builders here pick only what one function needs: the declarations of
+the types, members, functions and macros it references (found through a
+symbol index of the project headers, outlined by the declaration scanner),
+the relevant #include lines, and the file-scope declarations of its own
+source file. The result is kept under a token budget, and every call reports
+its prompt size against the full files.
+
+Token counts are estimates (about four characters per token).
+"""
+
+import functools
+import os
+import re
+import threading
+
+try:
+    from .cpp_declaration_scanner import outline
+    from .cpp_source_text import blank
+except ImportError:
+    from cpp_declaration_scanner import outline
+    from cpp_source_text import blank
+
+_INCLUDE_RE = re.compile(r'^[ \t]*#[ \t]*include\b[^\n]*', re.MULTILINE)
+_USING_NAMESPACE_RE = re.compile(r'^[ \t]*using[ \t]+namespace[^;\n]*;', re.MULTILINE)
+_IDENT_RE = re.compile(r'[A-Za-z_]\w*')
+_TYPE_KINDS = {'class', 'struct', 'union', 'enum', 'typedef', 'alias'}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a prompt fragment"""
+    return (len(text) + 3) // 4
+
+
+def identifiers(content: str) -> set:
+    """Identifiers used in a piece of code (comments and literals ignored)"""
+    return set(_IDENT_RE.findall(blank(content)))
+
+
+@functools.lru_cache(maxsize=16)
+def _source_outline(source_content: str) -> list:
+    """Outline of a source file, shared by all of its functions"""
+    return outline(source_content)
+
+
+def slice_class(declaration: dict, keep: set) -> str:
+    """Class declaration reduced to its constructors, destructor and the
+    members named in keep (plus every data member of a struct or union);
+    omitted members are marked with a comment. typedef'd and member-less
+    declarations are returned whole."""
+    if not declaration['members'] or declaration['head'].startswith('typedef'):
+        return declaration['text']
+    simple_name = declaration['name']
+    keep_fields = declaration['kind'] in ('struct', 'union')
+    lines = [declaration['head'] + ' {']
+    access = None
+    omitted = 0
+    for member in declaration['members']:
+        name = (member['name'] or '').lstrip('~')
+        if keep_fields and member['kind'] == 'variable':
+            pass
+        elif name != simple_name and name not in keep:
+            omitted += 1
+            continue
+        if member['access'] != access:
+            access = member['access']
+            lines.append(f"{access}:")
+        lines.append('    ' + member['text'])
+    if omitted:
+        lines.append(f"    // ... {omitted} other members omitted")
+    lines.append('};')
+    return '\n'.join(lines)
+
+
+class SymbolIndex:
+    """Declarations of a set of project headers (see cpp_declaration_scanner.outline),
+    looked up by name"""
+
+    def __init__(self, header_paths):
+        self.by_name = {}
+        self.by_file = {}
+        for path in header_paths:
+            try:
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+            except OSError:
+                continue
+            declarations = outline(content, path)
+            self.by_file[os.path.basename(path).lower()] = declarations
+            for declaration in declarations:
+                self.by_name.setdefault(declaration['name'], []).append(declaration)
+
+    def lookup(self, name: str, prefer_file: str = None):
+        """Declaration of a name, preferring one from prefer_file"""
+        candidates = self.by_name.get(name, [])
+        for declaration in candidates:
+            if prefer_file and declaration['file'] == prefer_file:
+                return declaration
+        return candidates[0] if candidates else None
+
+    def declarations_in(self, header_name: str) -> list:
+        """Declarations of the project header with this file name"""
+        return self.by_file.get(os.path.basename(header_name).lower(), [])
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(header_paths) -> SymbolIndex:
+    """Shared index of these headers, built once per process"""
+    key = tuple(sorted(header_paths))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SymbolIndex(key)
+        return index
+
+
+class PromptStats:
+    """Running totals of prompt sizes, full files versus sliced context"""
+
+    def __init__(self):
+        self.calls = 0
+        self.full_tokens = 0
+        self.sliced_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, label: str, full_tokens: int, sliced_tokens: int, omitted: int):
+        with self._lock:
+            self.calls += 1
+            self.full_tokens += full_tokens
+            self.sliced_tokens += sliced_tokens
+        share = sliced_tokens / full_tokens * 100 if full_tokens else 100.0
+        line = f"[PromptContext] {label}: {full_tokens} -> {sliced_tokens} tokens ({share:.0f}%)"
+        if omitted:
+            line += f", {omitted} declarations over budget"
+        print(line)
+
+    def summary(self) -> str:
+        if not self.calls:
+            return "prompt context: no sliced prompts"
+        saved = self.full_tokens - self.sliced_tokens
+        return (f"prompt context: {self.calls} prompts, {self.sliced_tokens} of "
+                f"{self.full_tokens} context tokens sent ({saved} saved)")
+
+
+prompt_stats = PromptStats()
+
+
+def _fit(sections: list, budget: int):
+    """Keep sections in priority order while they fit the token budget.
+    Returns (kept sections, number omitted)."""
+    kept = []
+    used = 0
+    omitted = 0
+    for section in sections:
+        text = section[1] if isinstance(section, tuple) else section
+        cost = estimate_tokens(text) + 1
+        if used + cost > budget:
+            omitted += 1
+            continue
+        kept.append(section)
+        used += cost
+    return kept, omitted
+
+
+def function_context(index: SymbolIndex, function_name: str, implementation: str, header_file: str,
+                     header_content: str, source_content: str, budget: int):
+    """Header and source context for testing one function.
+
+    function_name is the indexed name of the function (Class::method or a
+    free function). Returns (header_context, source_context). The function
+    itself is not repeated; it is given to the model separately. budget 0
+    disables slicing, and without an implementation to slice around the full
+    files are used."""
+    if not budget or not implementation:
+        return header_content, source_content
+
+    referenced = identifiers(implementation)
+    owner, _, target = (function_name or '').rpartition('::')
+    owner = owner.split('::')[-1] or None
+    target = target.lstrip('~') or None
+
+    # In priority order: includes, the owning class, what the function
+    # references, file-scope declarations of its source, then the types those
+    # declarations mention (one more level)
+    sections = [
+        ('header', '\n'.join(m.group(0).strip() for m in _INCLUDE_RE.finditer(header_content))),
+        ('source', '\n'.join(m.group(0).strip() for m in _INCLUDE_RE.finditer(source_content))),
+        ('source', '\n'.join(m.group(0).strip() for m in _USING_NAMESPACE_RE.finditer(source_content))),
+    ]
+    seen = set()
+
+    def add(declaration, keep):
+        key = (declaration['file'], declaration['name'], declaration['kind'])
+        if key not in seen:
+            seen.add(key)
+            sections.append(('header', slice_class(declaration, keep)))
+
+    if owner:
+        declaration = index.lookup(owner, header_file)
+        if declaration:
+            add(declaration, referenced | {target})
+    level_one = [index.lookup(name, header_file) for name in sorted(referenced) if name != owner]
+    level_one = [d for d in level_one if d]
+    for declaration in level_one:
+        add(declaration, referenced)
+    for declaration in _source_outline(source_content):
+        if declaration['name'] in referenced and declaration['name'] != target:
+            sections.append(('source', declaration['text']))
+    for text in [text for where, text in sections if where == 'header']:
+        for name in sorted(identifiers(text)):
+            nested = index.lookup(name, header_file)
+            if nested and nested['kind'] in _TYPE_KINDS:
+                add(nested, set())
+
+    kept, omitted = _fit([s for s in sections if s[1]], budget)
+    header_context = '\n\n'.join(text for where, text in kept if where == 'header')
+    source_context = '\n\n'.join(text for where, text in kept if where == 'source')
+    prompt_stats.record(f"{owner + '::' if owner else ''}{target or 'function'}",
+                        estimate_tokens(header_content) + estimate_tokens(source_content),
+                        estimate_tokens(header_context) + estimate_tokens(source_context),
+                        omitted)
+    return header_context, source_context
+
+
+def mock_context(index: SymbolIndex, include_name: str, header_content: str,
+                 source_content: str, budget: int):
+    """What a mock of include_name must provide: the declarations of the real
+    header that the source and header use, and the lines that use them.
+
+    Returns (declarations, usages), or None when the real header is not in
+    the index or there is nothing to slice (the caller then falls back to
+    the full files)."""
+    declarations = index.declarations_in(include_name)
+    if not budget or not declarations or not (header_content or source_content):
+        return None
+    header_content = header_content or ''
+    source_content = source_content or ''
+
+    used_names = identifiers(source_content) | identifiers(header_content)
+    used = [d for d in declarations if d['name'] in used_names]
+    sections = [slice_class(d, used_names) for d in used]
+    declaration_sections, omitted = _fit(sections, budget // 2)
+
+    names = {d['name'] for d in used}
+    usages = []
+    for content in (header_content, source_content):
+        for line in content.splitlines():
+            stripped = line.strip()
+            if stripped and stripped not in usages and names & set(_IDENT_RE.findall(stripped)):
+                usages.append(stripped)
+    usage_lines, usage_omitted = _fit(usages, budget - sum(estimate_tokens(s) + 1 for s in declaration_sections))
+
+    declarations_text = '\n\n'.join(declaration_sections)
+    usages_text = '\n'.join(usage_lines)
+    prompt_stats.record(f"mock {include_name}",
+                        estimate_tokens(header_content) + estimate_tokens(source_content),
+                        estimate_tokens(declarations_text) + estimate_tokens(usages_text),
+                        omitted + usage_omitted)
+    return declarations_text, usages_text
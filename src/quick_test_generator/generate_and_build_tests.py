@@ -13,52 +13,55 @@ This script:
 import os
 import re
 import json
+import queue
 import subprocess
 import argparse
+import threading
+import time
+import traceback
 from pathlib import Path
 from typing import List, Dict, Set, Tuple
+from concurrent.futures import ThreadPoolExecutor
 import glob
 import sys
 
 # Add parent directory to path to import config_reader
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config_reader import get_project_path, get_ollama_model
+from diff_coverage import get_changed_lines, collect_touched_functions, is_test_touched
+from project_model_cache import ProjectModelCache
+from cpp_declaration_scanner import scan_header
+from ollama_batch import run_batch, DEFAULT_CONCURRENCY, DEFAULT_DEADLINE
+from llm_response_cache import get_response_cache
+from llm_telemetry import telemetry
+from ollama_transport import get_transport, OllamaTransportError
+from run_profiler import profiler, add_profile_arguments, start_from_args
+from metrics_registry import metrics, TIMEOUTS, TEST_RUN_SECONDS
+
+
+COMPILE_SECONDS = metrics.histogram('cppmicroagent_compile_duration_seconds',
+                                    'g++ build time of one generated test by result (ok, failed, timeout)',
+                                    ['result'], buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120))
+QUEUE_DEPTH = metrics.gauge('cppmicroagent_queue_depth',
+                            'Tests waiting in the streaming build queues', ['queue'])
 
 
 def is_ollama_available() -> bool:
-    """Check if Ollama is available and running"""
-    try:
-        # Check if ollama command exists
-        result = subprocess.run(
-            ["which", "ollama"],
-            capture_output=True,
-            timeout=2
-        )
-        if result.returncode != 0:
-            return False
-        
-        # Check if ollama is actually running by trying a quick list
-        result = subprocess.run(
-            ["ollama", "list"],
-            capture_output=True,
-            timeout=5
-        )
-        return result.returncode == 0
-    except Exception:
-        return False
+    """Check if Ollama is available and running (probe result is cached briefly)"""
+    return get_transport().is_available()
 
 
 def call_ollama(prompt: str, model: str = "qwen2.5:0.5b") -> str:
-    """Call Ollama API to get AI assistance for test generation"""
+    """Call Ollama API to get AI assistance for test generation (cached by prompt)"""
+    return get_response_cache().get_or_call(model, prompt, lambda: _run_ollama(prompt, model),
+                                            site="generate_and_build_tests")
+
+
+def _run_ollama(prompt: str, model: str) -> str:
+    """Send one prompt over the shared Ollama HTTP transport"""
     try:
-        result = subprocess.run(
-            ["ollama", "run", model],
-            input=prompt.encode(),
-            capture_output=True,
-            timeout=30
-        )
-        return result.stdout.decode('utf-8', errors='ignore').strip()
-    except Exception as e:
+        return get_transport().generate(model, prompt, timeout=30, site="generate_and_build_tests")
+    except OllamaTransportError:
         # If Ollama fails, return empty string (fallback to default generation)
         return ""
 
@@ -70,6 +73,7 @@ class HeaderAnalyzer:
         self.source_dir = self.project_root / "src"
         self.include_dir = self.project_root / "inc"
         self.all_headers = {}
+        self.model_cache = ProjectModelCache(self.project_root)
         self.system_headers = {'iostream', 'vector', 'string', 'map', 'set', 'thread',
                                'mutex', 'memory', 'algorithm', 'functional', 'chrono',
                                'fstream', 'sstream', 'cstdint', 'cstring', 'cstdlib',
@@ -129,320 +133,38 @@ class HeaderAnalyzer:
         """Extract non-system includes from a file"""
         includes = set()
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                # Find all #include "..." statements
-                for match in re.finditer(r'#include\s*"([^"]+)"', content):
-                    header = match.group(1)
-                    # Extract just the filename
-                    header_name = os.path.basename(header)
-                    if header_name not in self.system_headers:
-                        includes.add(header_name)
+            # Only #include "..." statements
+            for include in self.model_cache.includes(file_path):
+                if include['system']:
+                    continue
+                # Extract just the filename
+                header_name = os.path.basename(include['path'])
+                if header_name not in self.system_headers:
+                    includes.add(header_name)
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
         return includes
     
     def parse_classes_from_header(self, header_path: Path) -> List[Dict]:
-        """Parse ALL class information from header file - enhanced for complex headers with multiple classes"""
+        """Parse ALL class information from header file, reusing the persisted
+        project model when the header is unchanged"""
         try:
-            with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            # Remove comments to avoid false matches
-            content_no_comments = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-            content_no_comments = re.sub(r'/\*.*?\*/', '', content_no_comments, flags=re.DOTALL)
-            
-            # Find all classes in the file (handle multiple classes)
-            # Pattern handles: class ClassName, class MACRO ClassName, class ClassName : public Base
-            class_pattern = r'class\s+(?:\w+\s+)?(\w+)(?:\s*:\s*(?:public|protected|private)\s+\w+(?:\s*,\s*(?:public|protected|private)\s+\w+)*)?\s*\{'
-            class_matches = list(re.finditer(class_pattern, content_no_comments))
-            
-            if not class_matches:
-                return []
-            
-            all_classes = []
-            
-            # Parse each substantial class
-            for match in class_matches:
-                class_name = match.group(1)
-                class_start = match.start()
-                start_pos = match.end()
-                
-                # Check if this is a real class definition (has some content after {)
-                next_100_chars = content_no_comments[start_pos:start_pos+100]
-                if not next_100_chars.strip() or next_100_chars.strip().startswith('};'):
-                    continue  # Skip forward declarations or empty classes
-                
-                class_info = self._parse_single_class(content, content_no_comments, class_name, class_start, header_path)
-                if class_info and class_info['methods']:
-                    all_classes.append(class_info)
-            
-            return all_classes
+            return self.model_cache.get(header_path, 'header_analyzer.classes', scan_header)
         except Exception as e:
             print(f"Error parsing {header_path}: {e}")
             return []
     
-    def _parse_single_class(self, original_content: str, content: str, class_name: str, class_start: int, header_path: Path) -> Dict:
-        """Parse a single class from the header"""
-        try:
-            # Find the end of this class by balancing braces from class_start
-            class_content_start = content.find('{', class_start)
-            if class_content_start == -1:
-                return None
-            
-            # Balance braces to find class end (with safety limit)
-            brace_count = 0
-            class_end = class_content_start
-            max_search = min(class_content_start + 50000, len(content))  # Safety limit
-            
-            for i in range(class_content_start, max_search):
-                char = content[i]
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        class_end = i
-                        break
-            
-            if brace_count != 0:
-                # Couldn't find matching brace, use next class or end
-                next_class = content.find('class ', class_content_start + 1)
-                if next_class > 0:
-                    class_end = next_class
-                else:
-                    class_end = max_search
-            
-            # Extract just this class's content
-            class_content = content[class_start:class_end+1]
-            
-            # Extract methods
-            methods = []
-            
-            # Find public methods - look for content between public: and next access specifier or class end
-            # Use positive lookahead to get all public sections (there might be multiple)
-            public_sections = []
-            for match in re.finditer(r'public:\s*(.*?)(?=private:|protected:|$|\};)', class_content, re.DOTALL):
-                public_sections.append(match.group(1))
-            
-            for public_text in public_sections:
-                # Simple approach: remove inline implementations using regex
-                # Match patterns like: method() { ... } or method() override { ... }
-                public_text_cleaned = re.sub(r'\{[^{}]*\}', '', public_text)
-                # Handle nested braces (run twice for safety)
-                public_text_cleaned = re.sub(r'\{[^{}]*\}', '', public_text_cleaned)
-                
-                # Now normalize whitespace
-                public_text_normalized = re.sub(r'\s+', ' ', public_text_cleaned)
-                
-                # Enhanced method patterns that handle more cases
-                # Pattern for constructors: ClassName ( params ) optional-specifiers ;
-                constructor_pattern = rf'{class_name}\s*\(([^)]*)\)\s*(?::|;)'
-                
-                # Pattern for destructors
-                destructor_pattern = rf'~{class_name}\s*\(\s*\)\s*(?:{{|;|override)'
-                
-                # Enhanced pattern for regular methods
-                # Captures: [virtual] [static] [explicit] [inline] return_type method_name ( params ) [const] [override] [= 0] ;
-                # Group 1: modifiers (virtual/static/etc), Group 2: return_type, Group 3: method_name, Group 4: params
-                method_pattern = r'((?:virtual\s+)?(?:static\s+)?(?:explicit\s+)?(?:inline\s+)?)(\w+(?:\s*\*|\s*&|\s*<[^>]+>)?)\s+(\w+)\s*\(([^)]*)\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?(?:;|{)'
-                
-                # Pattern for auto return type methods
-                auto_pattern = r'((?:static\s+)?)auto\s+(\w+)\s*\(([^)]*)\)\s*(?:const\s*)?->\s*(\w+(?:\s*\*|\s*&)?)\s*(?:;|{)'
-                
-                # Find constructors
-                for match in re.finditer(constructor_pattern, public_text_normalized):
-                    params = match.group(1).strip()
-                    
-                    # Parse parameters
-                    param_list = self._parse_parameters(params)
-                    
-                    methods.append({
-                        'name': class_name,
-                        'return_type': '',
-                        'parameters': param_list,
-                        'is_constructor': True,
-                        'is_destructor': False
-                    })
-                
-                # Find destructors
-                for match in re.finditer(destructor_pattern, public_text_normalized):
-                    methods.append({
-                        'name': f'~{class_name}',
-                        'return_type': '',
-                        'parameters': [],
-                        'is_constructor': False,
-                        'is_destructor': True
-                    })
-                
-                # Find all regular methods
-                for match in re.finditer(method_pattern, public_text_normalized):
-                    modifiers = match.group(1).strip()
-                    return_type = match.group(2).strip()
-                    method_name = match.group(3)
-                    params = match.group(4).strip()
-                    
-                    # Skip if this is actually a constructor (can happen with return type same as class name)
-                    if method_name == class_name:
-                        continue
-                    
-                    # Skip operators for now (they're complex)
-                    if method_name.startswith('operator'):
-                        continue
-                    
-                    # Check if static
-                    is_static = 'static' in modifiers
-                    
-                    # Parse parameters
-                    param_list = self._parse_parameters(params)
-                    
-                    methods.append({
-                        'name': method_name,
-                        'return_type': return_type,
-                        'parameters': param_list,
-                        'is_constructor': False,
-                        'is_destructor': False,
-                        'is_static': is_static
-                    })
-                
-                # Find auto return type methods
-                for match in re.finditer(auto_pattern, public_text_normalized):
-                    modifiers = match.group(1).strip()
-                    method_name = match.group(2)
-                    params = match.group(3).strip()
-                    return_type = match.group(4).strip()
-                    
-                    # Check if static
-                    is_static = 'static' in modifiers
-                    
-                    # Parse parameters
-                    param_list = self._parse_parameters(params)
-                    
-                    methods.append({
-                        'name': method_name,
-                        'return_type': return_type,
-                        'parameters': param_list,
-                        'is_constructor': False,
-                        'is_destructor': False,
-                        'is_static': is_static
-                    })
-            
-            # Remove duplicate methods (can happen with multiple public sections)
-            seen = set()
-            unique_methods = []
-            for method in methods:
-                method_sig = f"{method['name']}_{len(method['parameters'])}"
-                if method_sig not in seen:
-                    seen.add(method_sig)
-                    unique_methods.append(method)
-            
-            # Check if class is abstract (has pure virtual methods)
-            is_abstract = '= 0' in class_content
-            
-            # Check if class has protected/private destructor (cannot be instantiated directly)
-            # Look for protected: or private: followed by ~ClassName
-            has_protected_destructor = False
-            for match in re.finditer(r'(?:protected:|private:)\s*(.*?)(?=public:|private:|protected:|$|\};)', class_content, re.DOTALL):
-                section_text = match.group(1)
-                if f'~{class_name}' in section_text:
-                    has_protected_destructor = True
-                    break
-            
-            # Detect namespace by looking backward from class_start
-            namespace = self._detect_namespace(content, class_start)
-            
-            return {
-                'class_name': class_name,
-                'methods': unique_methods,
-                'header_file': header_path.name,
-                'header_full_path': str(header_path),
-                'is_abstract': is_abstract,
-                'has_protected_destructor': has_protected_destructor,
-                'namespace': namespace
-            }
-        except Exception as e:
-            print(f"Error parsing class {class_name} in {header_path}: {e}")
-            return None
-    
-    def _detect_namespace(self, content: str, class_start: int) -> str:
-        """Detect the namespace that contains the class by looking backward from class_start
-        Returns the namespace name or empty string if no namespace"""
-        # Look backward from class_start to find namespace declaration
-        before_class = content[:class_start]
-        
-        # Find all namespace declarations before this class
-        # Pattern: namespace name {
-        namespace_pattern = r'namespace\s+(\w+)\s*\{'
-        namespaces = []
-        
-        for match in re.finditer(namespace_pattern, before_class):
-            ns_name = match.group(1)
-            ns_start = match.start()
-            
-            # Check if this namespace is still open at class_start
-            # Count braces between namespace start and class start
-            between = content[match.end():class_start]
-            open_braces = between.count('{')
-            close_braces = between.count('}')
-            
-            # If we have more opens than closes, the namespace is still open
-            if open_braces >= close_braces:
-                namespaces.append(ns_name)
-        
-        # Return the innermost namespace (last one found)
-        return namespaces[-1] if namespaces else ""
-    
-    def _parse_parameters(self, params_str: str) -> list:
-        """Helper method to parse parameter list from a string"""
-        param_list = []
-        if not params_str or params_str.strip() == 'void':
-            return param_list
-        
-        # Handle parameters - split by comma but be careful of template parameters
-        params = []
-        current_param = []
-        angle_bracket_depth = 0
-        paren_depth = 0
-        
-        for char in params_str + ',':
-            if char == '<':
-                angle_bracket_depth += 1
-                current_param.append(char)
-            elif char == '>':
-                angle_bracket_depth -= 1
-                current_param.append(char)
-            elif char == '(':
-                paren_depth += 1
-                current_param.append(char)
-            elif char == ')':
-                paren_depth -= 1
-                current_param.append(char)
-            elif char == ',' and angle_bracket_depth == 0 and paren_depth == 0:
-                if current_param:
-                    params.append(''.join(current_param).strip())
-                    current_param = []
-            else:
-                current_param.append(char)
-        
-        for param in params:
-            param = param.strip()
-            if param:
-                # Remove default values
-                if '=' in param:
-                    param = param.split('=')[0].strip()
-                
-                # Extract type and name - name is last token
-                parts = param.split()
-                if len(parts) >= 2:
-                    # Last part is name, rest is type
-                    name = parts[-1]
-                    type_str = ' '.join(parts[:-1])
-                    param_list.append({'type': type_str, 'name': name})
-                elif len(parts) == 1:
-                    # Just type, no name
-                    param_list.append({'type': param, 'name': ''})
-        
-        return param_list
+    def parse_classes_from_headers(self, headers: List[Path], jobs: int = None) -> List[Tuple[Path, List[Dict]]]:
+        """Parse many headers at once - headers missing from the project model are
+        scanned across a process pool. Returns (header, classes) in input order."""
+        results = []
+        for header, classes, error in self.model_cache.get_many(headers, 'header_analyzer.classes',
+                                                                scan_header, workers=jobs):
+            if error is not None:
+                print(f"Error parsing {header}: {error}")
+                classes = []
+            results.append((header, classes))
+        return results
     
     def parse_class_from_header(self, header_path: Path) -> Dict:
         """Parse class information from header file - backward compatibility wrapper
@@ -589,6 +311,9 @@ class UnitTestGenerator:
         
         self.test_metadata = []
         self.enhancement_plan = []  # Track what will be enhanced
+        self.pending_enhancements = []  # Micro-tests queued for the batched Ollama stage
+        # Called with a test's metadata once its file is final (streaming build)
+        self.on_test_ready = None
         
         # Primitive types that don't need includes
         self.primitive_types = {
@@ -621,6 +346,7 @@ class UnitTestGenerator:
             self.ollama_available = is_ollama_available()
             if self.ollama_available:
                 print("  🤖 Ollama enabled - will use AI-enhanced test generation")
+                get_transport().warm_up(get_ollama_model())
                 print(f"  📁 Python-generated tests will be saved to: {self.python_test_dir}")
                 self.use_ollama = True
             else:
@@ -838,20 +564,17 @@ class UnitTestGenerator:
         
         return f"{class_name}::{method_name} - " + ", ".join(enhancements)
     
-    def _enhance_test_with_ollama_full(self, base_test_code: str, class_name: str, 
-                                       method_name: str, method: Dict, has_init: bool, 
-                                       has_close: bool) -> str:
-        """Use Ollama to enhance Python-generated test code (returns full test or None)"""
-        
-        print(f"    🤖 Enhancing {class_name}::{method_name} with Ollama...", end=' ', flush=True)
-        
+    def _build_enhancement_prompt(self, base_test_code: str, class_name: str,
+                                  method_name: str, method: Dict, has_init: bool,
+                                  has_close: bool):
+        """Split a Python-generated test for enhancement.
+        Returns (header_and_fixture, prompt), or None if it has no TEST to enhance"""
         # Check if this is a micro-test (uses TEST) or regular test (uses TEST_F)
         is_micro_test = 'TEST(' in base_test_code and 'TEST_F' not in base_test_code
         
         # Extract just the TEST/TEST_F functions for enhancement
         test_start = base_test_code.find('// Test:') if not is_micro_test else base_test_code.find('TEST(')
         if test_start < 0:
-            print("❌ (No TEST found)")
             return None
         
         header_and_fixture = base_test_code[:test_start]
@@ -878,6 +601,21 @@ Task: Enhance the {test_type} functions by:
 5. Using EXPECT instead of ASSERT for non-critical checks
 
 Return ONLY the improved {test_type} functions (maintain all existing test names). Do NOT include headers, fixture definitions, or any other code. No explanations or markdown."""
+        return header_and_fixture, prompt
+    
+    def _enhance_test_with_ollama_full(self, base_test_code: str, class_name: str, 
+                                       method_name: str, method: Dict, has_init: bool, 
+                                       has_close: bool) -> str:
+        """Use Ollama to enhance Python-generated test code (returns full test or None)"""
+        
+        print(f"    🤖 Enhancing {class_name}::{method_name} with Ollama...", end=' ', flush=True)
+        
+        split = self._build_enhancement_prompt(base_test_code, class_name, method_name,
+                                               method, has_init, has_close)
+        if split is None:
+            print("❌ (No TEST found)")
+            return None
+        header_and_fixture, prompt = split
         
         response = call_ollama(prompt)
         
@@ -1823,33 +1561,31 @@ TEST_F({class_name}_{method_name}_Test, StressTest) {{
             with open(python_backup_path, 'w') as f:
                 f.write(test_content)
         
-        # STEP 2: If Ollama is enabled, try to enhance the test
-        enhanced_content = None
+        # STEP 2: If Ollama is enabled, queue the test for the batched enhancement
+        # stage (enhance_pending_with_ollama) instead of waiting on the model here
+        enhancement = None
         if self.use_ollama:
             has_init = self._has_init_method(class_info) or method_name == 'init'
             has_close = self._has_close_method(class_info) or method_name == 'close'
-            
-            # Try to enhance with Ollama
-            enhanced_content = self._enhance_test_with_ollama_full(
+            enhancement = self._build_enhancement_prompt(
                 test_content, class_name, method_name, method, has_init, has_close
             )
         
-        # STEP 3: Write the final version (enhanced if available, otherwise Python)
+        # STEP 3: Write the Python version; the enhanced version replaces it when it arrives
         output_path = self.output_dir / test_filename
-        final_content = enhanced_content if enhanced_content else test_content
         with open(output_path, 'w') as f:
-            f.write(final_content)
+            f.write(test_content)
         
         # Print with appropriate indicator
-        if enhanced_content and self.use_ollama:
-            print(f"  Generated micro-test: {test_filename} (🤖 Ollama-enhanced)")
-        elif self.use_ollama and not enhanced_content:
+        if enhancement:
+            print(f"  Generated micro-test: {test_filename} (🤖 queued for Ollama)")
+        elif self.use_ollama:
             print(f"  Generated micro-test: {test_filename} (📝 Python fallback)")
         else:
             print(f"  Generated micro-test: {test_filename}")
         
         # Store metadata
-        self.test_metadata.append({
+        metadata = {
             'test_file': str(output_path),
             'python_backup': str(python_backup_path) if self.use_ollama else None,
             'source_file': str(source_file),
@@ -1858,8 +1594,68 @@ TEST_F({class_name}_{method_name}_Test, StressTest) {{
             'method_name': method_name,
             'header_file': class_info['header_file'],
             'scenario': scenario_name,
-            'ollama_enhanced': bool(enhanced_content and self.use_ollama)
-        })
+            'ollama_enhanced': False
+        }
+        self.test_metadata.append(metadata)
+        
+        if enhancement:
+            header_and_fixture, prompt = enhancement
+            self.pending_enhancements.append({
+                'label': f"{class_name}::{method_name} ({scenario_name})",
+                'header_and_fixture': header_and_fixture,
+                'prompt': prompt,
+                'metadata': metadata
+            })
+        elif self.on_test_ready:
+            self.on_test_ready(metadata)
+    
+    def enhance_pending_with_ollama(self, concurrency: int = DEFAULT_CONCURRENCY,
+                                    deadline: float = DEFAULT_DEADLINE):
+        """Enhance every queued micro-test through the Ollama HTTP API, up to
+        `concurrency` requests at a time, each with its own deadline. Each test
+        file is rewritten as soon as its enhancement arrives; failed or invalid
+        responses keep the Python version. With on_test_ready set, each test
+        is handed on as soon as its file is final."""
+        if not self.pending_enhancements:
+            return
+        
+        pending = {str(i): item for i, item in enumerate(self.pending_enhancements)}
+        self.pending_enhancements = []
+        print(f"  🤖 Enhancing {len(pending)} tests with Ollama "
+              f"({concurrency} concurrent, {deadline:.0f}s deadline each)...")
+        ready = queue.SimpleQueue()
+        
+        def on_result(key, response, error):
+            item = pending[key]
+            cleaned_response = self._validate_and_clean_ollama_response(response) if response else ""
+            if not cleaned_response:
+                reason = error or "invalid response"
+                print(f"  ❌ {item['label']} ({reason}, using Python fallback)")
+            else:
+                # Combine header/fixture with enhanced test functions
+                with open(item['metadata']['test_file'], 'w') as f:
+                    f.write(item['header_and_fixture'] + cleaned_response + '\n')
+                item['metadata']['ollama_enhanced'] = True
+                print(f"  ✅ {item['label']} (🤖 Ollama-enhanced)")
+            ready.put(item['metadata'])
+        
+        prompts = {key: item['prompt'] for key, item in pending.items()}
+        batch_args = (prompts, get_ollama_model(), on_result, concurrency, deadline)
+        if not self.on_test_ready:
+            stats = run_batch(*batch_args, site="generate_and_build_tests.enhance")
+        else:
+            # Hand tests on from this thread: a full build queue must not
+            # stall the batch's event loop (and with it every deadline)
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                batch = executor.submit(run_batch, *batch_args, site="generate_and_build_tests.enhance")
+                while not (batch.done() and ready.empty()):
+                    try:
+                        self.on_test_ready(ready.get(timeout=0.1))
+                    except queue.Empty:
+                        pass
+                stats = batch.result()
+        print(f"  Ollama batch: {stats['cached']} cached, {stats['completed']} completed, {stats['failed']} failed, "
+              f"{stats['timed_out']} timed out in {stats['elapsed']:.1f}s")
     
     def _generate_micro_test_content(self, source_file: Path, class_info: Dict, method: Dict,
                                       dependent_headers: Set[str], scenario_name: str, scenario_desc: str) -> str:
@@ -2079,6 +1875,40 @@ TEST_F({class_name}_{method_name}_Test, StressTest) {{
         print(f"\n  Saved metadata: {metadata_path}")
 
 
+def new_build_results() -> Dict[str, List[Dict]]:
+    """Empty per-outcome lists of test metadata for TestBuilder.print_summary"""
+    return {'compiled': [], 'failed_compile': [], 'fallback_used': [],
+            'passed': [], 'failed_run': [], 'skipped': []}
+
+
+def record_compile(results: Dict, metadata: Dict, success: bool):
+    if success:
+        results['compiled'].append(metadata)
+        if metadata.get('fallback_used', False):
+            results['fallback_used'].append(metadata)
+    else:
+        results['failed_compile'].append(metadata)
+
+
+def save_build_summary(path: Path, all_metadata: List[Dict], results: Dict):
+    """Write the build/run counts as JSON (read by run_project_batch.py)"""
+    summary = {'total': len(all_metadata),
+               'ollama_enhanced': sum(1 for m in all_metadata if m.get('ollama_enhanced', False))}
+    summary.update({outcome: len(tests) for outcome, tests in results.items()})
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def record_run(results: Dict, metadata: Dict, outcome: tuple):
+    success, skip = outcome
+    if skip:
+        results['skipped'].append(metadata)
+    elif success:
+        results['passed'].append(metadata)
+    else:
+        results['failed_run'].append(metadata)
+
+
 class TestBuilder:
     """Builds and runs tests using g++ directly"""
     
@@ -2089,6 +1919,8 @@ class TestBuilder:
         self.source_root = source_root.resolve() if isinstance(source_root, Path) else Path(source_root).resolve()
         self.build_dir = output_root / "bin"
         self.build_dir.mkdir(parents=True, exist_ok=True)
+        # Keeps each test's report lines together when tests build concurrently
+        self._print_lock = threading.Lock()
         
         # GoogleTest paths
         self.gtest_root = Path("/workspaces/CppMicroAgent/googletest-1.16.0")
@@ -2289,6 +2121,7 @@ class TestBuilder:
                 '-lgcov',  # Link with gcov library for coverage
             ])
             
+            start = time.perf_counter()
             try:
                 result = subprocess.run(
                     cmd,
@@ -2297,54 +2130,60 @@ class TestBuilder:
                     timeout=30
                 )
                 
+                COMPILE_SECONDS.labels(result='ok' if result.returncode == 0 else 'failed').observe(
+                    time.perf_counter() - start)
                 return result.returncode == 0, result.stderr
             except subprocess.TimeoutExpired:
+                COMPILE_SECONDS.labels(result='timeout').observe(time.perf_counter() - start)
+                TIMEOUTS.labels(stage='compile').inc()
                 return False, "Timeout"
             except Exception as e:
                 return False, str(e)
         
-        print(f"  Compiling {test_name}...", end=' ')
-        
         # Try compiling the current version (might be Ollama-enhanced or Python)
         success, error = try_compile(test_file)
         
         if success:
             if ollama_enhanced:
-                print("✅ SUCCESS (Ollama-enhanced)")
+                self._report(f"  Compiling {test_name}... ✅ SUCCESS (Ollama-enhanced)")
             else:
-                print("✅ SUCCESS")
+                self._report(f"  Compiling {test_name}... ✅ SUCCESS")
             return True
         
         # If compilation failed and we have an Ollama-enhanced version, try Python backup
         if ollama_enhanced and python_backup and Path(python_backup).exists():
-            print("❌ FAILED")
-            print(f"    🔄 Ollama-enhanced version failed compilation")
-            print(f"    📝 Trying Python-generated fallback...")
+            lines = [f"  Compiling {test_name}... ❌ FAILED",
+                     f"    🔄 Ollama-enhanced version failed compilation",
+                     f"    📝 Trying Python-generated fallback..."]
             
             # Copy Python backup to replace the failed version
             import shutil
             shutil.copy(python_backup, test_file)
             
             # Try compiling Python version
-            print(f"  Compiling {test_name} (Python fallback)...", end=' ')
             success, error = try_compile(test_file)
             
             if success:
-                print("✅ SUCCESS (Python fallback)")
+                lines.append(f"  Compiling {test_name} (Python fallback)... ✅ SUCCESS (Python fallback)")
+                self._report(*lines)
                 # Update metadata to reflect that we're using Python version
                 test_metadata['ollama_enhanced'] = False
                 test_metadata['fallback_used'] = True
                 return True
             else:
-                print("❌ FAILED (both versions)")
-                print(f"    Error: {error[:200]}")
+                lines.append(f"  Compiling {test_name} (Python fallback)... ❌ FAILED (both versions)")
+                self._report(*lines, f"    Error: {error[:200]}")
                 return False
         else:
             # No backup or not Ollama-enhanced, just report failure
-            print("❌ FAILED")
-            print(f"    Error: {error[:200]}")
+            self._report(f"  Compiling {test_name}... ❌ FAILED", f"    Error: {error[:200]}")
             return False
     
+    def _report(self, *lines):
+        """Print one test's report lines without interleaving other workers"""
+        with self._print_lock:
+            print('\n'.join(lines), flush=True)
+    
     def run_test(self, test_metadata: Dict) -> tuple:
         """Run a compiled test
         Returns: (passed: bool, skipped: bool)
@@ -2353,17 +2192,18 @@ class TestBuilder:
         binary = self.build_dir / test_name
         
         if not binary.exists():
-            print(f"  ⚠️  Binary not found: {test_name}")
+            self._report(f"  ⚠️  Binary not found: {test_name}")
             return (False, False)
         
         # Check if this test should be skipped due to known threading issues
         should_skip = any(pattern in test_name for pattern in self.skip_run_patterns)
         if should_skip:
-            print(f"  ⏭️  Skipped {test_name} (known threading issues)")
+            self._report(f"  ⏭️  Skipped {test_name} (known threading issues)")
             return (False, True)
         
-        print(f"  Running {test_name}...", end=' ')
+        label = f"  Running {test_name}..."
         
+        start = time.perf_counter()
         try:
             result = subprocess.run(
                 ['./' + test_name],  # Run with relative path since we're in the build directory
@@ -2373,25 +2213,27 @@ class TestBuilder:
                 cwd=str(self.build_dir)  # Run from bin directory so .gcda files are created in the right place
             )
             
+            TEST_RUN_SECONDS.labels(result='passed' if result.returncode == 0 else 'failed').observe(
+                time.perf_counter() - start)
             if result.returncode == 0:
                 # Count passed tests
                 passed = result.stdout.count('[  PASSED  ]')
-                print(f"✅ PASSED ({passed} tests)")
+                self._report(f"{label} ✅ PASSED ({passed} tests)")
                 return (True, False)
             else:
-                print("❌ FAILED")
                 # Show first failure
                 lines = result.stdout.split('\n')
-                for line in lines:
-                    if 'FAILED' in line or 'Failure' in line:
-                        print(f"    {line}")
-                        break
+                first_failure = [f"    {line}" for line in lines if 'FAILED' in line or 'Failure' in line][:1]
+                self._report(f"{label} ❌ FAILED", *first_failure)
                 return (False, False)
         except subprocess.TimeoutExpired:
-            print("❌ TIMEOUT")
+            TEST_RUN_SECONDS.labels(result='timeout').observe(time.perf_counter() - start)
+            TIMEOUTS.labels(stage='run').inc()
+            self._report(f"{label} ❌ TIMEOUT")
             return (False, False)
         except Exception as e:
-            print(f"❌ ERROR: {e}")
+            TEST_RUN_SECONDS.labels(result='error').observe(time.perf_counter() - start)
+            self._report(f"{label} ❌ ERROR: {e}")
             return (False, False)
     
     def build_and_run_all(self, metadata_file: Path):
@@ -2403,34 +2245,30 @@ class TestBuilder:
         print(f"BUILDING TESTS ({len(all_metadata)} tests)")
         print(f"{'='*70}\n")
         
-        compiled = []
-        failed_compile = []
-        fallback_used = []
+        results = new_build_results()
         
         for metadata in all_metadata:
-            if self.compile_test(metadata):
-                compiled.append(metadata)
-                if metadata.get('fallback_used', False):
-                    fallback_used.append(metadata)
-            else:
-                failed_compile.append(metadata)
+            record_compile(results, metadata, self.compile_test(metadata))
         
         print(f"\n{'='*70}")
-        print(f"RUNNING TESTS ({len(compiled)} compiled)")
+        print(f"RUNNING TESTS ({len(results['compiled'])} compiled)")
         print(f"{'='*70}\n")
         
-        passed = []
-        failed_run = []
-        skipped = []
+        for metadata in results['compiled']:
+            record_run(results, metadata, self.run_test(metadata))
         
-        for metadata in compiled:
-            success, skip = self.run_test(metadata)
-            if skip:
-                skipped.append(metadata)
-            elif success:
-                passed.append(metadata)
-            else:
-                failed_run.append(metadata)
+        self.print_summary(all_metadata, results)
+        return all_metadata, results
+    
+    def print_summary(self, all_metadata: List[Dict], results: Dict):
+        """Print the build/run summary of all_metadata from a results dict
+        (see new_build_results)"""
+        compiled = results['compiled']
+        failed_compile = results['failed_compile']
+        fallback_used = results['fallback_used']
+        passed = results['passed']
+        failed_run = results['failed_run']
+        skipped = results['skipped']
         
         # Count Ollama enhancements
         ollama_enhanced = sum(1 for m in all_metadata if m.get('ollama_enhanced', False))
@@ -2472,89 +2310,108 @@ class TestBuilder:
         print()
 
 
-def main():
-    """Main execution function"""
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(
-        description='Generate and build unit tests for C++ code',
-        formatter_class=argparse.RawDescriptionHelpFormatter
-    )
-    parser.add_argument('--use-ollama', action='store_true',
-                        help='Use Ollama AI for enhanced test generation')
-    args = parser.parse_args()
-    
-    print("="*70)
-    print("Consolidated Mock & Unit Test Generator (Python + g++ Direct)")
-    print("="*70)
-    print()
-    
-    # Setup paths - read from configuration
-    try:
-        project_root = get_project_path()
-        print(f"Using project from configuration: {project_root}")
-        
-        if not project_root.exists():
-            print(f"❌ Error: Project path does not exist: {project_root}")
-            print("   Please update CppMicroAgent.cfg with a valid project_path")
-            return 1
-    except Exception as e:
-        print(f"❌ Error reading configuration: {e}")
-        print("   Falling back to default: TestProjects/SampleApplication/SampleApp")
-        project_root = Path("/workspaces/CppMicroAgent/TestProjects/SampleApplication/SampleApp")
-    
-    output_root = Path("/workspaces/CppMicroAgent/output/ConsolidatedTests")
-    mock_dir = output_root / "mocks"
-    test_dir = output_root / "tests"
-    
-    # Create directories
-    mock_dir.mkdir(parents=True, exist_ok=True)
-    test_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Initialize components
-    analyzer = HeaderAnalyzer(project_root)
-    mock_gen = MockGenerator(mock_dir)
-    test_gen = UnitTestGenerator(test_dir, mock_dir, project_root, use_ollama=args.use_ollama)
-    
-    # Step 1: Find all headers
-    print("Step 1: Analyzing headers...")
-    headers = analyzer.find_all_headers()
+class StreamingTestPipeline:
+    """Compiles and runs tests while they are still being generated.
+    
+    submit() puts a generated test on a bounded compile queue; compile workers
+    put each binary on a bounded run queue as soon as it links, and run
+    workers execute it right away. A full queue blocks the producer, so
+    generation never runs far ahead of the compiler."""
+    
+    _DONE = object()
+    
+    def __init__(self, builder: TestBuilder, compile_jobs: int = 1, run_jobs: int = 1,
+                 queue_size: int = 32):
+        self.builder = builder
+        self.compile_queue = queue.Queue(maxsize=max(1, queue_size))
+        self.run_queue = queue.Queue(maxsize=max(1, queue_size))
+        self.results = new_build_results()
+        self.submitted = []
+        self._results_lock = threading.Lock()
+        self._started = time.perf_counter()
+        self.first_result_seconds = None
+        self.compile_workers = [threading.Thread(target=self._compile_worker, daemon=True,
+                                                 name=f"compile-{i}")
+                                for i in range(max(1, compile_jobs))]
+        self.run_workers = [threading.Thread(target=self._run_worker, daemon=True, name=f"run-{i}")
+                            for i in range(max(1, run_jobs))]
+        for worker in self.compile_workers + self.run_workers:
+            worker.start()
+    
+    def submit(self, metadata: Dict):
+        """Queue a generated test for compilation (blocks while the queue is full)"""
+        self.submitted.append(metadata)
+        self.compile_queue.put(metadata)
+        QUEUE_DEPTH.labels(queue='compile').set(self.compile_queue.qsize())
+    
+    def _record(self, recorder, metadata, outcome):
+        with self._results_lock:
+            recorder(self.results, metadata, outcome)
+            if self.first_result_seconds is None and recorder is record_run:
+                self.first_result_seconds = time.perf_counter() - self._started
+    
+    def _compile_worker(self):
+        while True:
+            metadata = self.compile_queue.get()
+            QUEUE_DEPTH.labels(queue='compile').set(self.compile_queue.qsize())
+            if metadata is self._DONE:
+                return
+            try:
+                success = self.builder.compile_test(metadata)
+            except Exception:
+                # A crashed worker would leave the producer blocked on a full queue
+                self.builder._report(f"  Compiling {metadata['test_name']}... ❌ ERROR",
+                                     traceback.format_exc())
+                success = False
+            self._record(record_compile, metadata, success)
+            if success:
+                self.run_queue.put(metadata)
+                QUEUE_DEPTH.labels(queue='run').set(self.run_queue.qsize())
+    
+    def _run_worker(self):
+        while True:
+            metadata = self.run_queue.get()
+            QUEUE_DEPTH.labels(queue='run').set(self.run_queue.qsize())
+            if metadata is self._DONE:
+                return
+            try:
+                outcome = self.builder.run_test(metadata)
+            except Exception:
+                self.builder._report(f"  Running {metadata['test_name']}... ❌ ERROR",
+                                     traceback.format_exc())
+                outcome = (False, False)
+            self._record(record_run, metadata, outcome)
+    
+    def finish(self) -> Dict[str, List[Dict]]:
+        """Wait until every submitted test was compiled and run; returns the results"""
+        for _ in self.compile_workers:
+            self.compile_queue.put(self._DONE)
+        for worker in self.compile_workers:
+            worker.join()
+        for _ in self.run_workers:
+            self.run_queue.put(self._DONE)
+        for worker in self.run_workers:
+            worker.join()
+        return self.results
+
+
+def collect_header_classes(analyzer: HeaderAnalyzer, headers: List[Path], jobs: int = None) -> Dict:
+    """Step 1: {(header name, class name): class_info} of every class in the headers"""
     header_classes = {}
-    
-    for header in headers:
-        classes = analyzer.parse_classes_from_header(header)
+    for header, classes in analyzer.parse_classes_from_headers(headers, jobs=jobs):
         if classes:
             # Store all classes from this header - use tuple of (header_name, class_name) as key
             for class_info in classes:
                 key = (header.name, class_info['class_name'])
                 header_classes[key] = class_info
                 print(f"  Found class: {class_info['class_name']} in {header.name}")
-    
-    # Step 2: Generate consolidated mocks
-    print("\nStep 2: Generating consolidated mock headers...")
-    for (header_name, class_name), class_info in header_classes.items():
-        mock_gen.write_mock_header(class_info)
-    
-    # Copy common.h if it exists
-    common_h = project_root / "inc" / "common.h"
-    if common_h.exists():
-        import shutil
-        shutil.copy(common_h, mock_dir / "common.h")
-        print(f"  Copied common.h")
-    
-    # Step 3: Process source files and generate tests
-    print("\nStep 3: Generating unit tests...")
-    
-    # Show Ollama status prominently
-    if args.use_ollama and test_gen.use_ollama:
-        print("\n" + "="*70)
-        print("🤖 OLLAMA AI-ENHANCED TEST GENERATION ENABLED")
-        print("="*70)
-        print("Each test will be:")
-        print("  1. Generated using Python templates")
-        print("  2. Enhanced by Ollama AI for better assertions and logic")
-        print("  3. Saved with Python fallback in case of compilation issues")
-        print("="*70 + "\n")
-    
+    return header_classes
+
+
+def generate_tests(analyzer: HeaderAnalyzer, test_gen: UnitTestGenerator, header_classes: Dict,
+                   headers: List[Path]):
+    """Steps 3 and 3b: micro-tests for the classes of each source file, then
+    for the classes of header-only files"""
     source_files = analyzer.find_all_source_files()
     
     # Track which (header, class) combinations have been processed via .cpp files
@@ -2627,19 +2484,187 @@ def main():
     
     if header_only_count > 0:
         print(f"\n  ✅ Generated tests for {header_only_count} methods in header-only files")
+
+
+def main():
+    """Main execution function"""
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(
+        description='Generate and build unit tests for C++ code',
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--use-ollama', action='store_true',
+                        help='Use Ollama AI for enhanced test generation')
+    parser.add_argument('--diff-base', metavar='REV',
+                        help='Only generate tests for functions changed since this git revision')
+    parser.add_argument('--jobs', type=int, default=None, metavar='N',
+                        help='Worker processes for header analysis (default: CPU count)')
+    parser.add_argument('--ollama-concurrency', type=int, default=DEFAULT_CONCURRENCY, metavar='N',
+                        help=f'Concurrent Ollama requests with --use-ollama (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--ollama-timeout', type=float, default=DEFAULT_DEADLINE, metavar='SEC',
+                        help=f'Deadline per Ollama request in seconds (default: {DEFAULT_DEADLINE:.0f})')
+    parser.add_argument('--no-stream', action='store_true',
+                        help='Build and run only after every test is generated, instead of '
+                             'compiling and running each test while generation continues')
+    parser.add_argument('--compile-jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='Concurrent test compilations when streaming (default: CPU count)')
+    parser.add_argument('--run-jobs', type=int, default=1, metavar='N',
+                        help='Concurrent test executions when streaming (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=32, metavar='N',
+                        help='Capacity of the compile and run queues when streaming (default: 32)')
+    parser.add_argument('--output-root', type=Path, metavar='DIR',
+                        default=Path("/workspaces/CppMicroAgent/output/ConsolidatedTests"),
+                        help='Folder for mocks, tests, binaries and metadata '
+                             '(default: output/ConsolidatedTests)')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args, "generate_and_build_tests")
+    
+    print("="*70)
+    print("Consolidated Mock & Unit Test Generator (Python + g++ Direct)")
+    print("="*70)
+    print()
+    
+    # Setup paths - read from configuration
+    try:
+        project_root = get_project_path()
+        print(f"Using project from configuration: {project_root}")
+        
+        if not project_root.exists():
+            print(f"❌ Error: Project path does not exist: {project_root}")
+            print("   Please update CppMicroAgent.cfg with a valid project_path")
+            return 1
+    except Exception as e:
+        print(f"❌ Error reading configuration: {e}")
+        print("   Falling back to default: TestProjects/SampleApplication/SampleApp")
+        project_root = Path("/workspaces/CppMicroAgent/TestProjects/SampleApplication/SampleApp")
+    
+    output_root = args.output_root
+    mock_dir = output_root / "mocks"
+    test_dir = output_root / "tests"
+    
+    # Create directories
+    mock_dir.mkdir(parents=True, exist_ok=True)
+    test_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Initialize components
+    analyzer = HeaderAnalyzer(project_root)
+    mock_gen = MockGenerator(mock_dir)
+    test_gen = UnitTestGenerator(test_dir, mock_dir, project_root, use_ollama=args.use_ollama)
+    
+    # Step 1: Find all headers
+    profiler.mark("1 analyze headers")
+    print("Step 1: Analyzing headers...")
+    headers = sorted(analyzer.find_all_headers())
+    header_classes = collect_header_classes(analyzer, headers, jobs=args.jobs)
+    
+    analyzer.model_cache.save()
+    print(f"  ({analyzer.model_cache.stats()})")
+    
+    # Step 1b: Restrict to classes/methods touched by the diff
+    if args.diff_base:
+        profiler.mark("1b diff selection")
+        try:
+            changed = get_changed_lines(project_root, args.diff_base)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        touched = collect_touched_functions(changed)
+        print(f"\nStep 1b: Diff mode against {args.diff_base} - "
+              f"{len(changed)} changed file(s), {len(touched)} touched function(s)")
+        
+        restricted = {}
+        for key, class_info in header_classes.items():
+            methods = [m for m in class_info['methods']
+                       if is_test_touched(class_info['class_name'], m['name'], touched)]
+            if methods:
+                restricted[key] = dict(class_info, methods=methods)
+                print(f"  Selected {len(methods)} method(s) of {class_info['class_name']}")
+        
+        # Keep the full class list for mock generation so dependencies still resolve
+        all_header_classes = header_classes
+        header_classes = restricted
+    else:
+        all_header_classes = header_classes
+    
+    # Step 2: Generate consolidated mocks
+    profiler.mark("2 generate mocks")
+    print("\nStep 2: Generating consolidated mock headers...")
+    for (header_name, class_name), class_info in all_header_classes.items():
+        mock_gen.write_mock_header(class_info)
+    
+    # Copy common.h if it exists
+    common_h = project_root / "inc" / "common.h"
+    if common_h.exists():
+        import shutil
+        shutil.copy(common_h, mock_dir / "common.h")
+        print(f"  Copied common.h")
+    
+    # Compile and run each test as soon as it is generated
+    pipeline = None
+    if not args.no_stream:
+        builder = TestBuilder(output_root, mock_dir, project_root)
+        pipeline = StreamingTestPipeline(builder, args.compile_jobs, args.run_jobs, args.queue_size)
+        test_gen.on_test_ready = pipeline.submit
+        print(f"\n  Streaming build: {len(pipeline.compile_workers)} compile / "
+              f"{len(pipeline.run_workers)} run worker(s), queues of {args.queue_size}")
+    
+    # Step 3: Process source files and generate tests
+    profiler.mark("3 generate tests")
+    print("\nStep 3: Generating unit tests...")
+    
+    # Show Ollama status prominently
+    if args.use_ollama and test_gen.use_ollama:
+        print("\n" + "="*70)
+        print("🤖 OLLAMA AI-ENHANCED TEST GENERATION ENABLED")
+        print("="*70)
+        print("Each test will be:")
+        print("  1. Generated using Python templates")
+        print("  2. Enhanced by Ollama AI for better assertions and logic")
+        print("  3. Saved with Python fallback in case of compilation issues")
+        print("="*70 + "\n")
+    
+    generate_tests(analyzer, test_gen, header_classes, headers)
+    
+    # Step 3c: Enhance the queued micro-tests concurrently
+    if test_gen.pending_enhancements:
+        profiler.mark("3c enhance with ollama")
+        print("\nStep 3c: Enhancing tests with Ollama...")
+        test_gen.enhance_pending_with_ollama(args.ollama_concurrency, args.ollama_timeout)
     
     # Show enhancement plan if Ollama is enabled
     if args.use_ollama and test_gen.enhancement_plan:
         test_gen.show_enhancement_plan()
     
-    # Save metadata
-    test_gen.save_metadata()
+    # Persist include lists gathered during generation
+    analyzer.model_cache.save()
+    if args.use_ollama:
+        print(f"  ({get_response_cache().stats()})")
+        print(telemetry.summary())
+        print(f"  LLM telemetry written to {telemetry.write_json()}")
     
-    # Step 4: Build and run tests
-    print("\nStep 4: Building and running tests with g++...")
-    builder = TestBuilder(output_root, mock_dir, project_root)
     metadata_file = output_root / "test_metadata.json"
-    builder.build_and_run_all(metadata_file)
+    profiler.mark("4 build and run tests")
+    if pipeline is not None:
+        # Step 4: Drain the tests still queued for building and running
+        print("\nStep 4: Finishing the streaming build...")
+        results = pipeline.finish()
+        all_metadata = pipeline.submitted
+        builder.print_summary(all_metadata, results)
+        if pipeline.first_result_seconds is not None:
+            print(f"  First test result after {pipeline.first_result_seconds:.1f}s")
+        # Saved after the build so compile fallbacks are recorded too
+        test_gen.save_metadata()
+    else:
+        # Save metadata
+        test_gen.save_metadata()
+        
+        # Step 4: Build and run tests
+        print("\nStep 4: Building and running tests with g++...")
+        builder = TestBuilder(output_root, mock_dir, project_root)
+        all_metadata, results = builder.build_and_run_all(metadata_file)
+    save_build_summary(output_root / "build_summary.json", all_metadata, results)
+    profiler.mark(None)
     
     print("\n" + "="*70)
     print("Generation and Testing Complete!")
@@ -2654,7 +2679,8 @@ def main():
     if args.use_ollama:
         print(f"\n💡 Coverage files (.gcda/.gcno) generated with --coverage flag")
         print(f"   These files are created when tests run and are used for coverage analysis")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
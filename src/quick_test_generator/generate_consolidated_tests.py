@@ -13,6 +13,11 @@ import json
 from pathlib import Path
 from typing import List, Dict, Set, Tuple
 import subprocess
+import sys
+
+# Add parent directory to path to import the shared project model
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from project_model_cache import ProjectModelCache
 
 
 class HeaderAnalyzer:
@@ -23,6 +28,7 @@ class HeaderAnalyzer:
         self.source_dir = self.project_root / "src"
         self.include_dir = self.project_root / "inc"
         self.all_headers = {}
+        self.model_cache = ProjectModelCache(self.project_root)
         self.system_headers = {'iostream', 'vector', 'string', 'map', 'set', 'thread',
                                'mutex', 'memory', 'algorithm', 'functional', 'chrono',
                                'fstream', 'sstream', 'cstdint', 'cstring', 'cstdlib',
@@ -47,21 +53,31 @@ class HeaderAnalyzer:
         """Extract non-system includes from a file"""
         includes = set()
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                # Find all #include "..." statements
-                for match in re.finditer(r'#include\s*"([^"]+)"', content):
-                    header = match.group(1)
-                    # Extract just the filename
-                    header_name = os.path.basename(header)
-                    if header_name not in self.system_headers:
-                        includes.add(header_name)
+            # Only #include "..." statements
+            for include in self.model_cache.includes(file_path):
+                if include['system']:
+                    continue
+                # Extract just the filename
+                header_name = os.path.basename(include['path'])
+                if header_name not in self.system_headers:
+                    includes.add(header_name)
         except Exception as e:
             print(f"Error reading {file_path}: {e}")
         return includes
     
     def parse_class_from_header(self, header_path: Path) -> Dict:
+        """Parse class information from header file, reusing the persisted
+        project model when the header is unchanged"""
+        try:
+            return self.model_cache.get(header_path, 'consolidated.class',
+                                        self._parse_class_uncached)
+        except OSError as e:
+            print(f"Error parsing {header_path}: {e}")
+            return None
+    
+    def _parse_class_uncached(self, header_path: Path) -> Dict:
         """Parse class information from header file"""
+        header_path = Path(header_path)
         try:
             with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
@@ -568,6 +584,8 @@ def main():
             header_classes[header.name] = class_info
             print(f"  Found class: {class_info['class_name']} in {header.name}")
     
+    analyzer.model_cache.save()
+    
     # Step 2: Generate consolidated mocks
     print("\nStep 2: Generating consolidated mock headers...")
     for header_name, class_info in header_classes.items():
@@ -593,6 +611,8 @@ def main():
                 print(f"  Generating test for method: {method['name']}")
                 test_gen.write_test_file(source_file, class_info, method, dependent_headers)
     
+    analyzer.model_cache.save()
+    
     print("\n=== Generation Complete ===")
     print(f"Mock headers: {mock_dir}")
     print(f"Unit tests: {test_dir}")
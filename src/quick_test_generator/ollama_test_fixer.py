@@ -5,22 +5,25 @@ Uses Ollama to analyze and fix test logic issues
 """
 
 import json
-import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from llm_response_cache import get_response_cache
+from ollama_transport import get_transport, OllamaTransportError
+
 
 def call_ollama(prompt: str, model: str = "qwen2.5:0.5b") -> str:
-    """Call Ollama API to get AI assistance"""
+    """Call Ollama API to get AI assistance (cached by prompt)"""
+    return get_response_cache().get_or_call(model, prompt, lambda: _run_ollama(prompt, model),
+                                            site="ollama_test_fixer")
+
+
+def _run_ollama(prompt: str, model: str) -> str:
+    """Send one prompt over the shared Ollama HTTP transport"""
     try:
-        result = subprocess.run(
-            ["ollama", "run", model],
-            input=prompt.encode(),
-            capture_output=True,
-            timeout=60
-        )
-        return result.stdout.decode('utf-8', errors='ignore').strip()
-    except Exception as e:
+        return get_transport().generate(model, prompt, timeout=60, site="ollama_test_fixer")
+    except OllamaTransportError as e:
         print(f"Error calling Ollama: {e}")
         return ""
 
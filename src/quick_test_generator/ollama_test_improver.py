@@ -14,13 +14,16 @@ import os
 import re
 import sys
 import json
-import subprocess
+import time
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config_reader import get_project_path, get_unittest_model
+from llm_response_cache import get_response_cache
+from ollama_transport import get_transport, OllamaTransportError, OllamaTimeoutError
+from llm_telemetry import telemetry
 
 
 def call_ollama_qwen(prompt: str, model: str = None) -> str:
@@ -37,28 +40,28 @@ def call_ollama_qwen(prompt: str, model: str = None) -> str:
     openai_base_url = os.environ.get('OPENAI_BASE_URL')
     openai_api_key = os.environ.get('OPENAI_API_KEY')
     
+    cache = get_response_cache()
     if openai_base_url and openai_api_key:
         print(f"  ☁️  Using cloud-based Ollama: {model}")
-        return call_ollama_via_openai_api(prompt, model, openai_base_url, openai_api_key)
+        # The chat endpoint and its sampling options shape the answer
+        options = {'backend': 'openai', 'base_url': openai_base_url,
+                   'temperature': 0.3, 'max_tokens': 4000}
+        return cache.get_or_call(model, prompt, options=options, site="ollama_test_improver", call_fn=lambda:
+                                 call_ollama_via_openai_api(prompt, model, openai_base_url, openai_api_key))
     else:
         print(f"  🖥️  Using local Ollama: {model}")
-        return call_ollama_via_cli(prompt, model)
+        return cache.get_or_call(model, prompt, lambda: call_ollama_via_cli(prompt, model),
+                                 site="ollama_test_improver")
 
 
 def call_ollama_via_cli(prompt: str, model: str) -> str:
-    """Call local Ollama via CLI"""
+    """Call local Ollama (over the shared HTTP transport rather than the CLI)"""
     try:
-        result = subprocess.run(
-            ["ollama", "run", model],
-            input=prompt.encode(),
-            capture_output=True,
-            timeout=120  # Longer timeout for complex analysis
-        )
-        return result.stdout.decode('utf-8', errors='ignore').strip()
-    except subprocess.TimeoutExpired:
+        return get_transport().generate(model, prompt, timeout=120, site="ollama_test_improver")  # Longer timeout for complex analysis
+    except OllamaTimeoutError:
         print("  ⚠️  Ollama request timed out")
         return ""
-    except Exception as e:
+    except OllamaTransportError as e:
         print(f"  ❌ Error calling Ollama: {e}")
         return ""
 
@@ -85,13 +88,23 @@ def call_ollama_via_openai_api(prompt: str, model: str, base_url: str, api_key:
             "max_tokens": 4000
         }
         
-        response = requests.post(url, json=data, headers=headers, timeout=120)
+        start = time.perf_counter()
+        try:
+            response = requests.post(url, json=data, headers=headers, timeout=120)
+        except requests.exceptions.Timeout:
+            telemetry.record("ollama_test_improver", model, time.perf_counter() - start, "timeout")
+            raise
         
         if response.status_code == 200:
             result = response.json()
             if 'choices' in result and len(result['choices']) > 0:
+                usage = result.get('usage') or {}
+                telemetry.record("ollama_test_improver", model, time.perf_counter() - start, "ok",
+                                 prompt_tokens=usage.get('prompt_tokens', 0),
+                                 completion_tokens=usage.get('completion_tokens', 0))
                 return result['choices'][0]['message']['content'].strip()
         
+        telemetry.record("ollama_test_improver", model, time.perf_counter() - start, "error")
         print(f"  ⚠️  API returned status code: {response.status_code}")
         return ""
     except Exception as e:
@@ -347,19 +360,12 @@ def main():
     
     print(f"\n📍 Working with project: {project_path}")
     
-    # Check if Ollama is available
-    try:
-        result = subprocess.run(
-            ["which", "ollama"],
-            capture_output=True,
-            timeout=2
-        )
-        if result.returncode != 0:
-            print("\n❌ Ollama not found. Please install it first.")
+    # Check if Ollama is available (a cloud endpoint needs no local server)
+    if not (os.environ.get('OPENAI_BASE_URL') and os.environ.get('OPENAI_API_KEY')):
+        transport = get_transport()
+        if not transport.is_available():
+            print(f"\n❌ Ollama is not running at {transport.host}:{transport.port}. Start it with 'ollama serve'.")
             return False
-    except:
-        print("\n❌ Ollama not available")
-        return False
     
     print("\n" + "="*70)
     print("ANALYSIS PLAN:")
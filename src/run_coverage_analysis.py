@@ -6,6 +6,9 @@ This script:
 2. Compiles source code with coverage flags
 3. Runs the generated tests
 4. Generates coverage reports using gcov/lcov
+
+With --diff-base <rev>, only tests touching functions changed since <rev>
+are run, and changed-line coverage is reported alongside the full report.
 """
 
 import os
@@ -13,11 +16,24 @@ import sys
 import subprocess
 import json
 import glob
+import re
+import time
+import argparse
 from pathlib import Path
 
 # Add src directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from config_reader import get_project_path
+from diff_coverage import (get_changed_lines, collect_touched_functions, is_test_touched,
+                           compute_changed_line_coverage, format_diff_coverage_report)
+from run_profiler import profiler, add_profile_arguments, start_from_args
+from metrics_registry import metrics, TIMEOUTS, TEST_RUN_SECONDS
+
+COVERAGE_PERCENT = metrics.gauge('cppmicroagent_coverage_percent',
+                                 'Coverage of the project by the generated tests (lines, functions, branches)',
+                                 ['kind'])
+DIFF_COVERAGE_PERCENT = metrics.gauge('cppmicroagent_diff_coverage_percent',
+                                      'Coverage of the lines changed since the --diff-base revision')
 
 def check_prerequisites():
     """Check if required tools are installed"""
@@ -104,8 +120,82 @@ def cleanup_old_coverage_data(bin_dir):
     print(f"  📍 State: Cleanup complete, ready for test execution")
     return (gcda_removed, len(gcno_files))
 
-def run_tests_with_coverage():
-    """Run the generated tests and collect coverage data"""
+def load_test_metadata():
+    """Load test metadata written by option 1 (list or {"tests": [...]} format)"""
+    metadata_file = os.path.join("output/ConsolidatedTests", "test_metadata.json")
+    with open(metadata_file, 'r') as f:
+        metadata = json.load(f)
+    if isinstance(metadata, dict):
+        metadata = metadata.get('tests', [])
+    return metadata
+
+def select_tests_for_diff(base_rev):
+    """Select the test executables that exercise functions changed since base_rev
+    
+    Returns:
+        tuple: (selected test names, {file: changed lines})
+    """
+    project_path = get_project_path()
+    changed = get_changed_lines(project_path, base_rev)
+    
+    print(f"\n🔀 Diff coverage against {base_rev}")
+    print(f"  📄 {len(changed)} changed C++ file(s)")
+    for file_path, lines in sorted(changed.items()):
+        print(f"     {os.path.relpath(file_path)} ({len(lines)} lines)")
+    
+    touched = collect_touched_functions(changed)
+    print(f"  🎯 {len(touched)} touched function(s)")
+    
+    selected = set()
+    for entry in load_test_metadata():
+        if is_test_touched(entry.get('class_name', ''), entry.get('method_name', ''), touched):
+            selected.add(entry['test_name'])
+    print(f"  🧪 {len(selected)} test(s) selected")
+    
+    return selected, changed
+
+def report_diff_coverage(base_rev, changed, fail_under=None, tests_ran=True):
+    """Write the changed-line coverage report; return False if below fail_under
+    
+    Without tests_ran no coverage data is read (any .info file is left over
+    from an earlier run), so every changed executable line is uncovered.
+    """
+    coverage_dir = "output/UnitTestCoverage"
+    info_file = os.path.join(coverage_dir, 'coverage_filtered.info')
+    if not os.path.exists(info_file):
+        info_file = os.path.join(coverage_dir, 'coverage.info')
+    if not tests_ran:
+        info_file = None
+    
+    if changed and info_file is not None and not os.path.exists(info_file):
+        print("❌ No coverage data available for diff coverage")
+        return False
+    
+    result = compute_changed_line_coverage(info_file, changed)
+    report = format_diff_coverage_report(base_rev, result)
+    
+    os.makedirs(coverage_dir, exist_ok=True)
+    report_file = os.path.join(coverage_dir, 'diff_coverage_report.txt')
+    with open(report_file, 'w') as f:
+        f.write(report)
+    with open(os.path.join(coverage_dir, 'diff_coverage.json'), 'w') as f:
+        json.dump({'base': base_rev, **result}, f, indent=2)
+    
+    DIFF_COVERAGE_PERCENT.set(result['coverage_percentage'])
+    print("\n" + report)
+    print(f"   Text: {report_file}")
+    
+    if fail_under is not None and result['coverage_percentage'] < fail_under:
+        print(f"❌ Changed-line coverage {result['coverage_percentage']:.1f}% is below {fail_under:.1f}%")
+        return False
+    return True
+
+def run_tests_with_coverage(only_tests=None):
+    """Run the generated tests and collect coverage data
+    
+    Args:
+        only_tests: Optional set of test names to restrict execution to
+    """
     print("\n🧪 Running tests with coverage...")
     print("  📍 State: Test execution phase")
     
@@ -121,6 +211,8 @@ def run_tests_with_coverage():
         # Skip coverage files
         if file.endswith('.gcno') or file.endswith('.gcda'):
             continue
+        if only_tests is not None and file not in only_tests:
+            continue
         if os.path.isfile(file_path) and os.access(file_path, os.X_OK):
             test_executables.append(file)  # Just store the filename, not full path
     
@@ -137,6 +229,7 @@ def run_tests_with_coverage():
     passed = 0
     failed = 0
     for test_name in test_executables:
+        start = time.perf_counter()
         try:
             # Run the test from within the bin directory
             result = subprocess.run(
@@ -145,6 +238,8 @@ def run_tests_with_coverage():
                 timeout=10,
                 cwd=bin_dir  # Critical: run from bin directory
             )
+            TEST_RUN_SECONDS.labels(result='passed' if result.returncode == 0 else 'failed').observe(
+                time.perf_counter() - start)
             if result.returncode == 0:
                 passed += 1
                 print(f"  ✅ {test_name}")
@@ -152,9 +247,12 @@ def run_tests_with_coverage():
                 failed += 1
                 print(f"  ❌ {test_name}")
         except subprocess.TimeoutExpired:
+            TEST_RUN_SECONDS.labels(result='timeout').observe(time.perf_counter() - start)
+            TIMEOUTS.labels(stage='run').inc()
             failed += 1
             print(f"  ⏱️  {test_name} (timeout)")
         except Exception as e:
+            TEST_RUN_SECONDS.labels(result='error').observe(time.perf_counter() - start)
             failed += 1
             print(f"  ❌ {test_name} ({e})")
     
@@ -188,6 +286,15 @@ def generate_coverage_report():
     # Point to the bin directory where .gcda files are located
     bin_dir = "output/ConsolidatedTests/bin"
     
+    profiler.mark("coverage capture")
+    coverage_file = capture_coverage(bin_dir, coverage_dir)
+    if coverage_file is None:
+        return False
+    profiler.mark("coverage report")
+    return write_coverage_report(coverage_file, coverage_dir)
+
+def capture_coverage(bin_dir, coverage_dir):
+    """Capture the .gcda data in bin_dir into coverage_dir/coverage.info; its path, or None"""
     # Verify .gcda files exist before proceeding
     import glob
     gcda_files = glob.glob(os.path.join(bin_dir, '*.gcda'))
@@ -195,7 +302,7 @@ def generate_coverage_report():
         print("❌ No .gcda coverage files found!")
         print("   Tests must be run first to generate coverage data.")
         print("   Make sure tests are compiled with --coverage flag and executed successfully.")
-        return False
+        return None
     
     print(f"  📁 Found {len(gcda_files)} .gcda coverage files to process")
     
@@ -273,7 +380,7 @@ def generate_coverage_report():
             print(f"❌ coverage.info file was not created at {coverage_file}")
             print("   Make sure tests were compiled with --coverage flag and executed.")
             print(f"   Debug: Check if .gcda files exist in {bin_dir}")
-            return False
+            return None
         
         file_size = os.path.getsize(coverage_file)
         print(f"  📦 coverage.info size: {file_size} bytes")
@@ -282,8 +389,16 @@ def generate_coverage_report():
             print(f"❌ No coverage data was collected (coverage.info is empty).")
             print("   Make sure tests were compiled with --coverage flag and executed.")
             print(f"   Debug: Check if .gcda files exist in {bin_dir}")
-            return False
+            return None
         
+        return coverage_file
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        return None
+
+def write_coverage_report(coverage_file, coverage_dir):
+    """Filter coverage.info to the project and write the HTML and text reports"""
+    try:
         # Get the current project path to filter coverage correctly
         project_path = get_project_path()
         project_full_path = str(os.path.abspath(project_path))
@@ -395,6 +510,9 @@ def generate_coverage_report():
                 for line in summary_result.stdout.split('\n'):
                     if 'lines' in line or 'functions' in line:
                         print(f"   {line.strip()}")
+                for kind, percent in re.findall(r'^\s*(lines|functions|branches)\.*:\s*([\d.]+)%',
+                                                summary_result.stdout, re.MULTILINE):
+                    COVERAGE_PERCENT.labels(kind=kind).set(float(percent))
         except:
             pass
         
@@ -410,12 +528,23 @@ def generate_coverage_report():
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description='Run coverage analysis on pre-generated tests')
+    parser.add_argument('--diff-base', metavar='REV',
+                        help='Only run tests touching code changed since this git revision '
+                             'and report changed-line coverage')
+    parser.add_argument('--fail-under', type=float, metavar='PCT',
+                        help='With --diff-base, exit non-zero if changed-line coverage is below PCT')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args, "run_coverage_analysis")
+    
     print("╔══════════════════════════════════════════════════════════════════╗")
     print("║         Coverage Analysis (Using Pre-Generated Tests)           ║")
     print("╚══════════════════════════════════════════════════════════════════╝")
     print()
     
     # Check prerequisites
+    profiler.mark("prerequisites")
     if not check_prerequisites():
         return 1
     
@@ -425,13 +554,31 @@ def main():
     
     print("✅ Pre-generated tests found\n")
     
+    selected_tests = None
+    changed = None
+    if args.diff_base:
+        profiler.mark("diff selection")
+        try:
+            selected_tests, changed = select_tests_for_diff(args.diff_base)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        if not selected_tests:
+            print("\nℹ️  No generated tests exercise the changed code")
+            return 0 if report_diff_coverage(args.diff_base, changed, args.fail_under, tests_ran=False) else 1
+    
     # Run tests with coverage
-    if not run_tests_with_coverage():
+    profiler.mark("run tests")
+    if not run_tests_with_coverage(selected_tests):
         return 1
     
     # Generate coverage report
     generate_coverage_report()
     
+    profiler.mark("diff coverage report" if args.diff_base else None)
+    if args.diff_base and not report_diff_coverage(args.diff_base, changed, args.fail_under):
+        return 1
+    
     print("\n✅ Coverage analysis complete!")
     return 0
 
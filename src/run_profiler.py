@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Opt-in per-phase profiling for the command line entry points (--profile)
+Phases are timed either with mark() - each mark ends the previous phase of
+the same thread, for scripts that run step after step - or with the phase()
+context manager. While profiling, every subprocess.run call is timed and
+counted per tool (g++, gcov, lcov, genhtml, test binaries, ...); model calls
+are taken from the LLM telemetry and reported as the "ollama" tool.
+
+--profile-cpu adds cProfile (main thread) and --profile-memory adds
+tracemalloc. When the process exits, a phase and tool breakdown is printed
+and written with the raw profiles to output/Profiles/<script>-<time>/.
+Without --profile every hook returns immediately.
+"""
+
+import atexit
+import cProfile
+import io
+import json
+import os
+import pstats
+import subprocess
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    from .llm_telemetry import telemetry
+except ImportError:
+    from llm_telemetry import telemetry
+
+_ROOT_DIR = Path(__file__).parent.parent
+
+COMPILERS = ('g++', 'gcc', 'c++', 'clang++', 'clang', 'cc')
+KNOWN_TOOLS = ('gcov', 'lcov', 'genhtml', 'cmake', 'make', 'ninja', 'ar', 'git')
+
+
+def tool_name(cmd) -> str:
+    """Tool class of a command line: g++, gcov, lcov, genhtml, test binary, ..."""
+    if isinstance(cmd, (str, bytes, os.PathLike)):
+        program = os.fsdecode(cmd).split()[0] if os.fsdecode(cmd).strip() else ''
+    else:
+        program = os.fsdecode(cmd[0]) if cmd else ''
+    base = os.path.basename(program)
+    if base.startswith(COMPILERS):
+        return 'g++'
+    if base in KNOWN_TOOLS:
+        return base
+    if program.startswith('./') or os.path.isabs(program) and not base.startswith('python'):
+        return 'test binary'
+    return base or 'unknown'
+
+
+class _Totals:
+    """Count, total, max and failures of one phase or tool"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.failed = 0
+
+    def add(self, seconds: float, ok: bool = True):
+        self.count += 1
+        self.seconds += seconds
+        self.max = max(self.max, seconds)
+        if not ok:
+            self.failed += 1
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'seconds': round(self.seconds, 4), 'max': round(self.max, 4),
+                'failed': self.failed}
+
+
+class RunProfiler:
+    """Process-wide phase/tool accumulators; inactive until start()"""
+
+    def __init__(self):
+        self.enabled = False
+        self.phases = {}
+        self.tools = {}
+        self._lock = threading.Lock()
+        self._marks = {}  # thread id -> (phase, start)
+        self._started = None
+        self._cpu = None
+        self._memory = False
+        self._original_run = None
+        self.output_dir = None
+
+    def start(self, label: str, cpu: bool = False, memory: bool = False, output_dir=None):
+        """Begin profiling; the report is written when the process exits"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._started = time.perf_counter()
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        self.output_dir = Path(output_dir) if output_dir else _ROOT_DIR / "output" / "Profiles" / f"{label}-{stamp}"
+        self._original_run = subprocess.run
+        subprocess.run = self._profiled_run
+        if memory:
+            self._memory = True
+            tracemalloc.start(25)
+        if cpu:
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+        atexit.register(self.finish)
+
+    def _profiled_run(self, *popenargs, **kwargs):
+        cmd = popenargs[0] if popenargs else kwargs.get('args')
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = self._original_run(*popenargs, **kwargs)
+            ok = result.returncode == 0
+            return result
+        finally:
+            self.record_tool(tool_name(cmd), time.perf_counter() - start, ok)
+
+    def record_tool(self, tool: str, seconds: float, ok: bool = True):
+        """Account one external command (for calls that bypass subprocess.run)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.tools.setdefault(tool, _Totals()).add(seconds, ok)
+
+    def _record_phase(self, name: str, seconds: float):
+        with self._lock:
+            self.phases.setdefault(name, _Totals()).add(seconds)
+
+    def mark(self, name: str = None):
+        """Start phase `name` on this thread, ending the phase marked before it"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        previous = self._marks.pop(threading.get_ident(), None)
+        if previous is not None:
+            self._record_phase(previous[0], now - previous[1])
+        if name is not None:
+            self._marks[threading.get_ident()] = (name, now)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block as phase `name` (safe to use from several threads)"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record_phase(name, time.perf_counter() - start)
+
+    def _ollama_totals(self):
+        """Model calls from the LLM telemetry, as one tool (cached answers excluded)"""
+        totals = _Totals()
+        for site in telemetry.to_dict()['sites'].values():
+            calls = site['ok'] + site['timeout'] + site['error']
+            if calls:
+                totals.count += calls
+                totals.seconds += site['latency_seconds']['total']
+                totals.max = max(totals.max, site['latency_seconds']['max'])
+                totals.failed += site['timeout'] + site['error']
+        return totals if totals.count else None
+
+    def to_dict(self) -> dict:
+        wall = time.perf_counter() - self._started
+        with self._lock:
+            tools = dict(self.tools)
+            phases = dict(self.phases)
+        ollama = self._ollama_totals()
+        if ollama:
+            tools['ollama'] = ollama
+        return {'wall_seconds': round(wall, 4),
+                'phases': {name: totals.to_dict() for name, totals in phases.items()},
+                'tools': {name: totals.to_dict() for name, totals in sorted(tools.items())}}
+
+    def summary(self, data: dict = None) -> str:
+        """Phase and tool breakdown table"""
+        data = data or self.to_dict()
+        wall = data['wall_seconds'] or 1e-9
+        lines = [f"Profile ({data['wall_seconds']:.2f}s wall):",
+                 f"  {'phase':<40} {'count':>6} {'total s':>9} {'mean s':>8} {'% wall':>7}"]
+        for name, t in data['phases'].items():
+            lines.append(f"  {name[:40]:<40} {t['count']:>6} {t['seconds']:>9.2f} "
+                         f"{t['seconds'] / t['count']:>8.3f} {100 * t['seconds'] / wall:>6.1f}%")
+        lines.append(f"  {'tool':<40} {'calls':>6} {'total s':>9} {'mean s':>8} {'max s':>7} {'failed':>6}")
+        for name, t in data['tools'].items():
+            lines.append(f"  {name[:40]:<40} {t['count']:>6} {t['seconds']:>9.2f} "
+                         f"{t['seconds'] / t['count']:>8.3f} {t['max']:>7.2f} {t['failed']:>6}")
+        if not data['tools']:
+            lines.append("  (no external commands)")
+        return '\n'.join(lines)
+
+    def finish(self):
+        """Stop profiling, print the breakdown and write the profile files"""
+        if not self.enabled:
+            return
+        self.mark(None)
+        for name, start in list(self._marks.values()):
+            self._record_phase(name, time.perf_counter() - start)
+        self._marks.clear()
+        subprocess.run = self._original_run
+        self.enabled = False
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        data = self.to_dict()
+        table = self.summary(data)
+        (self.output_dir / "phases.txt").write_text(table + "\n")
+        with open(self.output_dir / "phases.json", 'w') as f:
+            json.dump(data, f, indent=2)
+
+        if self._cpu is not None:
+            self._cpu.disable()
+            self._cpu.dump_stats(str(self.output_dir / "cpu.pstats"))
+            text = io.StringIO()
+            pstats.Stats(self._cpu, stream=text).sort_stats('cumulative').print_stats(40)
+            (self.output_dir / "cpu_top.txt").write_text(text.getvalue())
+        if self._memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            lines = [f"current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB", ""]
+            lines += [str(stat) for stat in snapshot.statistics('lineno')[:40]]
+            (self.output_dir / "memory_top.txt").write_text('\n'.join(lines) + "\n")
+
+        print("\n" + table)
+        print(f"  Profile written to {self.output_dir}")
+
+
+profiler = RunProfiler()
+
+
+def add_profile_arguments(parser):
+    """--profile, --profile-cpu and --profile-memory for an argparse parser"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Time each phase and external tool; write a breakdown to output/Profiles/')
+    parser.add_argument('--profile-cpu', action='store_true',
+                        help='With profiling, also record a cProfile of the main thread')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='With profiling, also trace Python allocations (tracemalloc)')
+
+
+def start_from_args(args, label: str):
+    """Start the profiler if any profiling option was given"""
+    if args.profile or args.profile_cpu or args.profile_memory:
+        profiler.start(label, cpu=args.profile_cpu, memory=args.profile_memory)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Run test generation and coverage analysis for several projects in one go
+Each project runs generate_and_build_tests.py and then run_coverage_analysis.py
+in its own working folder output/Batch/<project>/, so the ConsolidatedTests and
+UnitTestCoverage trees of different projects never mix. The project is passed
+through CPPMICROAGENT_PROJECT_PATH, so CppMicroAgent.cfg is left untouched.
+
+Up to --max-projects projects run at the same time and share --jobs compile
+slots equally. One consolidated report (batch_report.txt and
+batch_report.json) is written to the batch folder.
+
+Usage:
+    python3 src/run_project_batch.py TestProjects/* --jobs 8
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+from config_reader import PROJECT_PATH_ENV
+
+SRC_DIR = Path(__file__).parent
+ROOT_DIR = SRC_DIR.parent
+GENERATOR = SRC_DIR / "quick_test_generator" / "generate_and_build_tests.py"
+COVERAGE = SRC_DIR / "run_coverage_analysis.py"
+
+_print_lock = threading.Lock()
+
+
+def log(message: str):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def project_names(roots):
+    """Unique output folder name per project root (its folder name, suffixed on clashes)"""
+    names = {}
+    used = set()
+    for root in roots:
+        name = root.name
+        suffix = 2
+        while name in used:
+            name = f"{root.name}_{suffix}"
+            suffix += 1
+        used.add(name)
+        names[root] = name
+    return names
+
+
+def run_step(cmd, cwd: Path, env: dict, log_file: Path, timeout: float = None):
+    """Run one step with its output appended to the project log; (returncode, seconds)"""
+    start = time.perf_counter()
+    with open(log_file, 'a') as f:
+        f.write(f"$ {' '.join(str(c) for c in cmd)}\n")
+        f.flush()
+        try:
+            returncode = subprocess.run(cmd, cwd=str(cwd), env=env, stdout=f,
+                                        stderr=subprocess.STDOUT, timeout=timeout).returncode
+        except subprocess.TimeoutExpired:
+            f.write(f"\n[batch] step timed out after {timeout:.0f}s\n")
+            returncode = None
+    return returncode, time.perf_counter() - start
+
+
+def read_build_summary(path: Path) -> dict:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def read_coverage_summary(path: Path) -> dict:
+    """Line/function coverage percentages from the lcov summary in coverage_report.txt"""
+    coverage = {}
+    try:
+        text = path.read_text()
+    except OSError:
+        return coverage
+    for kind, percent in re.findall(r'^\s*(lines|functions)\.*:\s*([\d.]+)%', text, re.MULTILINE):
+        coverage.setdefault(kind, float(percent))
+    return coverage
+
+
+def process_project(root: Path, work_dir: Path, compile_jobs: int, args) -> dict:
+    """Generate, build and measure one project in its own working folder"""
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    log_file = work_dir / "batch.log"
+    output_root = work_dir / "output" / "ConsolidatedTests"
+    env = dict(os.environ, **{PROJECT_PATH_ENV: str(root), 'PYTHONUNBUFFERED': '1'})
+
+    result = {'project': str(root), 'work_dir': str(work_dir), 'status': 'ok', 'steps': {}}
+    generate = [sys.executable, str(GENERATOR), '--output-root', str(output_root),
+                '--compile-jobs', str(compile_jobs)]
+    if args.use_ollama:
+        generate.append('--use-ollama')
+    steps = [('generate', generate)]
+    if not args.skip_coverage:
+        steps.append(('coverage', [sys.executable, str(COVERAGE)]))
+
+    for step, cmd in steps:
+        returncode, seconds = run_step(cmd, work_dir, env, log_file, args.step_timeout)
+        result['steps'][step] = {'returncode': returncode, 'seconds': round(seconds, 1)}
+        if returncode != 0:
+            result['status'] = f"{step} timed out" if returncode is None else f"{step} failed"
+            break
+
+    result['seconds'] = round(sum(s['seconds'] for s in result['steps'].values()), 1)
+    result['tests'] = read_build_summary(output_root / "build_summary.json")
+    result['coverage'] = read_coverage_summary(work_dir / "output" / "UnitTestCoverage" / "coverage_report.txt")
+    return result
+
+
+def format_report(results: list, wall_seconds: float, jobs: int, max_projects: int) -> str:
+    """Consolidated text report: one row per project"""
+    lines = ["=" * 100,
+             f"Batch report: {len(results)} project(s) in {wall_seconds:.1f}s "
+             f"({max_projects} at a time, {jobs} compile slots)",
+             "=" * 100,
+             f"{'project':<24} {'status':<18} {'time s':>7} {'tests':>6} {'built':>6} {'passed':>6} "
+             f"{'failed':>6} {'skipped':>7} {'lines %':>8} {'funcs %':>8}",
+             "-" * 100]
+    for result in results:
+        tests = result['tests']
+        coverage = result['coverage']
+        failed = tests.get('failed_compile', 0) + tests.get('failed_run', 0) if tests else '-'
+        lines.append(
+            f"{Path(result['project']).name:<24} {result['status']:<18} {result['seconds']:>7.1f} "
+            f"{tests.get('total', '-'):>6} {tests.get('compiled', '-'):>6} {tests.get('passed', '-'):>6} "
+            f"{failed:>6} {tests.get('skipped', '-'):>7} "
+            f"{coverage.get('lines', '-'):>8} {coverage.get('functions', '-'):>8}")
+    lines.append("=" * 100)
+    for result in results:
+        if result['status'] != 'ok':
+            lines.append(f"  {Path(result['project']).name}: see {Path(result['work_dir']) / 'batch.log'}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate tests and measure coverage for several projects')
+    parser.add_argument('projects', nargs='+', type=Path, help='Project root folders (e.g. TestProjects/*)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='Compile slots shared by all running projects (default: CPU count)')
+    parser.add_argument('--max-projects', type=int, default=None, metavar='N',
+                        help='Projects processed at the same time (default: min(projects, jobs))')
+    parser.add_argument('--output-dir', type=Path, default=ROOT_DIR / "output" / "Batch", metavar='DIR',
+                        help='Folder for the per-project working folders and the report (default: output/Batch)')
+    parser.add_argument('--use-ollama', action='store_true',
+                        help='Pass --use-ollama to the test generator')
+    parser.add_argument('--skip-coverage', action='store_true',
+                        help='Only generate, build and run tests')
+    parser.add_argument('--step-timeout', type=float, default=None, metavar='SEC',
+                        help='Give up on a project step after SEC seconds (default: no limit)')
+    args = parser.parse_args()
+
+    roots = []
+    for project in args.projects:
+        root = project.resolve()
+        if root.is_dir():
+            roots.append(root)
+        else:
+            print(f"⚠️  Skipping {project}: not a directory")
+    if not roots:
+        print("❌ No project folders to process")
+        return 1
+
+    jobs = max(1, args.jobs)
+    max_projects = max(1, min(args.max_projects or jobs, len(roots)))
+    compile_jobs = max(1, jobs // max_projects)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    names = project_names(roots)
+
+    print(f"Processing {len(roots)} project(s), {max_projects} at a time, "
+          f"{compile_jobs} compile job(s) each")
+    start = time.perf_counter()
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_projects, thread_name_prefix="project") as executor:
+        futures = {executor.submit(process_project, root, args.output_dir / names[root], compile_jobs, args): root
+                   for root in roots}
+        for future in as_completed(futures):
+            root = futures[future]
+            result = results[root] = future.result()
+            icon = "✅" if result['status'] == 'ok' else "❌"
+            log(f"  {icon} {names[root]}: {result['status']} ({result['seconds']:.1f}s)")
+    wall_seconds = time.perf_counter() - start
+
+    ordered = [results[root] for root in roots]
+    report = format_report(ordered, wall_seconds, jobs, max_projects)
+    print("\n" + report)
+    (args.output_dir / "batch_report.txt").write_text(report + "\n")
+    with open(args.output_dir / "batch_report.json", 'w') as f:
+        json.dump({'wall_seconds': round(wall_seconds, 1), 'jobs': jobs, 'max_projects': max_projects,
+                   'projects': ordered}, f, indent=2)
+    print(f"\nReports: {args.output_dir / 'batch_report.txt'}, {args.output_dir / 'batch_report.json'}")
+    return 0 if all(r['status'] == 'ok' for r in ordered) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+One-pass function index for C/C++ source files
+Reads a source file once, blanks out comments, literals and preprocessor
+lines (keeping every offset intact) and walks it a single time, recording each
+function definition's name, signature, character offsets and line span.
+Per-function lookups then slice the in-memory text instead of re-reading and
+re-searching the file.
+"""
+
+import bisect
+import re
+
+try:
+    from .cpp_source_text import blank
+except ImportError:
+    from cpp_source_text import blank
+
+_BRACE_RE = re.compile(r'[{};]')
+_INIT_LIST_RE = re.compile(r'\)\s*:(?!:)')
+_ACCESS_LABEL_RE = re.compile(r'^\s*(?:(?:public|protected|private)\s*:(?!:)\s*)+')
+_NAME_CALL_RE = re.compile(r'(~?[A-Za-z_]\w*(?:\s*::\s*~?[A-Za-z_]\w*)*)\s*\(')
+_SCOPE_RE = re.compile(r'^(?:template\s*<.*>\s*)?(?:inline\s+)?(namespace|class|struct|union|enum|extern)\b', re.DOTALL)
+_KEYWORDS = {'if', 'for', 'while', 'switch', 'return', 'sizeof', 'catch', 'decltype',
+             'alignas', 'alignof', 'static_assert', 'noexcept', 'throw', '__attribute__',
+             '__declspec', 'operator'}
+
+
+class SourceFunctionIndex:
+    """Index of the function definitions in one C/C++ source file"""
+
+    def __init__(self, source_file):
+        """
+        Args:
+            source_file (str): Path of the .cpp/.c file to index
+        """
+        self.source_file = source_file
+        with open(source_file, 'r', encoding='utf-8', errors='ignore') as f:
+            self.content = f.read()
+        self.functions = []
+        self._by_name = {}
+        self._build()
+
+    def _build(self):
+        """Record every function definition in a single walk over the file"""
+        code = blank(self.content, preprocessor=True)
+
+        line_starts = [0]
+        line_starts.extend(m.end() for m in re.finditer('\n', code))
+
+        # Braces that open a scope holding declarations (file, namespace,
+        # class) are entered; any other brace (function body, initializer) is
+        # skipped whole, closing the pending definition when it ends
+        depth = 0
+        stmt_start = 0
+        skip_until_depth = None
+        keep_stmt = False
+        pending = None
+
+        for match in _BRACE_RE.finditer(code):
+            pos = match.start()
+            ch = match.group(0)
+
+            if skip_until_depth is not None:
+                if ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                    if depth == skip_until_depth:
+                        skip_until_depth = None
+                        if pending is not None:
+                            pending['end'] = pos + 1
+                            pending['start_line'] = bisect.bisect_right(line_starts, pending['start'])
+                            pending['end_line'] = bisect.bisect_right(line_starts, pos)
+                            self.functions.append(pending)
+                            self._register(pending)
+                            pending = None
+                        if not keep_stmt:
+                            stmt_start = pos + 1
+                continue
+
+            if ch == ';' or ch == '}':
+                if ch == '}' and depth > 0:
+                    depth -= 1
+                stmt_start = pos + 1
+                continue
+
+            # Opening brace at declaration scope
+            stmt = code[stmt_start:pos]
+            head = stmt.strip()
+            depth += 1
+            if _SCOPE_RE.match(head) and '(' not in head:
+                stmt_start = pos + 1
+                continue
+
+            skip_until_depth = depth - 1
+            # Foo::Foo() : a_{1}, b_{2} { ... } - member brace-initializers
+            # belong to the statement; only the brace after them is the body
+            keep_stmt = bool(_INIT_LIST_RE.search(stmt)) and re.search(r'[\w>]\s*$', stmt) is not None
+            if not keep_stmt:
+                pending = self._definition(stmt, stmt_start, pos)
+
+    def _definition(self, stmt: str, stmt_start: int, brace: int):
+        """Return the entry for a function definition whose body opens at brace"""
+        paren_pos = stmt.find('(')
+        if paren_pos == -1 or '=' in stmt[:paren_pos]:
+            return None
+
+        for call in _NAME_CALL_RE.finditer(stmt):
+            name = re.sub(r'\s+', '', call.group(1))
+            if name.split('::')[-1].lstrip('~') in _KEYWORDS:
+                continue
+            label = _ACCESS_LABEL_RE.match(stmt)
+            offset = label.end() if label else len(stmt) - len(stmt.lstrip())
+            start = stmt_start + offset
+            return {
+                'name': name,
+                'signature': re.sub(r'\s+', ' ', self.content[start:brace]).strip(),
+                'start': start,
+                'body_start': brace,
+            }
+        return None
+
+    def _register(self, entry: dict):
+        """Make an entry reachable by its full name and its Class::method / bare
+        suffixes. The first definition of a name wins."""
+        parts = entry['name'].split('::')
+        for i in range(len(parts)):
+            self._by_name.setdefault('::'.join(parts[i:]), entry)
+
+    def get(self, function_name: str):
+        """Index entry for a function (e.g. 'Foo::bar' or 'main'), or None"""
+        return self._by_name.get(re.sub(r'\s+', '', function_name))
+
+    def get_implementation(self, function_name: str):
+        """Full definition text (signature and body) of a function, or None"""
+        entry = self.get(function_name)
+        if entry is None:
+            return None
+        return self.content[entry['start']:entry['end']]
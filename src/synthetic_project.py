@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Synthetic C++ projects for benchmarking
+Emits a compilable project of N classes with M methods each, so header
+analysis, test building and coverage processing can be measured at 10x, 100x
+or 1000x the size of TestProjects/SampleApp. The output depends only on the
+spec and the seed.
+
+Two layouts are supported:
+    sampleapp - inc/common.h, src/<Module>/<Class>.h/.cpp, main.cpp at the root
+    library   - src/<project>/<module>/<class>.hpp/.cpp (catch2-like)
+
+Classes depend on the previous classes of their include chain (up to
+--include-depth levels of nested includes); a share of them can be class
+templates, and every module can live in its own namespace. With
+--header-only all definitions are inline in the headers.
+
+Usage:
+    python3 src/synthetic_project.py output/Synthetic/x100 --scale 100 --seed 1
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+from dataclasses import dataclass, asdict
+from pathlib import Path
+
+# Size of TestProjects/SampleApp, the unit of --scale
+BASE_CLASSES = 8
+BASE_METHODS = 5
+
+LAYOUTS = ('sampleapp', 'library')
+PARAM_TYPES = ('int', 'double', 'bool', 'const std::string&')
+RETURN_TYPES = ('bool', 'int', 'double', 'std::string', 'void')
+VERBS = ('add', 'apply', 'check', 'compute', 'find', 'load', 'merge', 'parse', 'process',
+         'reset', 'scan', 'send', 'store', 'update', 'validate')
+NOUNS = ('Buffer', 'Config', 'Entry', 'Frame', 'Index', 'Item', 'Message', 'Node', 'Packet',
+         'Queue', 'Record', 'Request', 'Session', 'State', 'Value')
+
+
+@dataclass(frozen=True)
+class ProjectSpec:
+    """What to generate; equal specs give byte-identical projects"""
+    name: str = 'SyntheticApp'
+    classes: int = BASE_CLASSES
+    methods: int = BASE_METHODS
+    include_depth: int = 2
+    modules: int = 4
+    layout: str = 'sampleapp'
+    header_only: bool = False
+    namespaces: bool = False
+    template_ratio: float = 0.0
+    static_ratio: float = 0.1
+    seed: int = 0
+
+
+class _Class:
+    """Generated model of one class"""
+
+    def __init__(self, index, name, module, is_template, deps, methods):
+        self.index = index
+        self.name = name
+        self.module = module
+        self.is_template = is_template
+        self.deps = deps
+        self.methods = methods
+
+
+def _module_name(spec: ProjectSpec, module: int) -> str:
+    return f"Module{module:02d}" if spec.layout == 'sampleapp' else f"module{module:02d}"
+
+
+def _namespace(spec: ProjectSpec, module: int):
+    return ('bench', f"module{module:02d}") if spec.namespaces else ()
+
+
+def _qualified(spec: ProjectSpec, cls: _Class) -> str:
+    namespace = _namespace(spec, cls.module)
+    name = '::' + '::'.join(namespace + (cls.name,)) if namespace else cls.name
+    return name + '<int>' if cls.is_template else name
+
+
+def _header_name(spec: ProjectSpec, cls: _Class) -> str:
+    return f"{cls.name}.h" if spec.layout == 'sampleapp' else f"{cls.name.lower()}.hpp"
+
+
+def build_model(spec: ProjectSpec) -> list:
+    """Classes with their methods and dependencies, drawn from spec.seed"""
+    rng = random.Random(spec.seed)
+    modules = max(1, min(spec.modules, spec.classes))
+    classes = []
+    for index in range(spec.classes):
+        # Chains of include_depth + 1 classes: each includes its predecessor
+        deps = [index - 1] if spec.include_depth > 0 and index % (spec.include_depth + 1) else []
+        methods = []
+        used = set()
+        for m in range(spec.methods):
+            name = f"{rng.choice(VERBS)}{rng.choice(NOUNS)}"
+            if name in used:
+                name = f"{name}{m}"
+            used.add(name)
+            param_types = list(PARAM_TYPES)
+            if spec.layout == 'sampleapp':
+                param_types.append('const Record&')
+            methods.append({
+                'name': name,
+                'return_type': rng.choice(RETURN_TYPES),
+                'params': [(rng.choice(param_types), f"arg{p}") for p in range(rng.randint(0, 3))],
+                'is_static': rng.random() < spec.static_ratio,
+            })
+        classes.append(_Class(index, f"{rng.choice(NOUNS)}{index:04d}", index % modules,
+                              rng.random() < spec.template_ratio, deps, methods))
+    return classes
+
+
+def _method_body(method: dict, indent: str) -> list:
+    """Deterministic body with a branch per parameter kind (something to cover)"""
+    lines = [f"int acc = {'0' if method['is_static'] else 'counter_'};"]
+    for ptype, pname in method['params']:
+        if ptype == 'int':
+            lines.append(f"acc += {pname};")
+        elif ptype == 'double':
+            lines.append(f"acc += static_cast<int>({pname});")
+        elif ptype == 'bool':
+            lines.append(f"if ({pname}) {{ ++acc; }} else {{ --acc; }}")
+        elif ptype == 'const Record&':
+            lines.append(f"acc += {pname}.id;")
+        else:
+            lines.append(f"acc += static_cast<int>({pname}.size());")
+    lines.append("if (acc % 2 == 0) { acc /= 2; } else { acc = acc * 3 + 1; }")
+    if not method['is_static']:
+        lines.append("counter_ = acc;")
+    returns = {'bool': "return acc > 0;", 'int': "return acc;", 'double': "return acc * 0.5;",
+               'std::string': "return std::to_string(acc);", 'void': None}
+    if returns[method['return_type']]:
+        lines.append(returns[method['return_type']])
+    return [indent + line for line in lines]
+
+
+def _signature(method: dict, owner: str = None) -> str:
+    params = ', '.join(f"{ptype} {pname}" for ptype, pname in method['params'])
+    name = f"{owner}::{method['name']}" if owner else method['name']
+    return f"{method['return_type']} {name}({params})"
+
+
+def _open_namespace(namespace) -> list:
+    return [f"namespace {part} {{" for part in namespace]
+
+
+def _close_namespace(namespace) -> list:
+    return [f"}}  // namespace {part}" for part in reversed(namespace)]
+
+
+def render_header(spec: ProjectSpec, cls: _Class, classes: list) -> str:
+    inline = spec.header_only or cls.is_template
+    guard = f"SYNTH_{cls.name.upper()}_{'HPP' if spec.layout == 'library' else 'H'}"
+    lines = [f"#ifndef {guard}", f"#define {guard}", "", "#include <string>"]
+    if spec.layout == 'sampleapp':
+        lines.append('#include "common.h"')
+    for dep in cls.deps:
+        lines.append(f'#include "{_header_name(spec, classes[dep])}"')
+    lines.append("")
+    namespace = _namespace(spec, cls.module)
+    lines += _open_namespace(namespace)
+    if namespace:
+        lines.append("")
+    if cls.is_template:
+        lines.append("template <typename T>")
+    lines += [f"class {cls.name} {{", "public:"]
+    if inline:
+        lines.append(f"    {cls.name}() : counter_(0), value_() {{}}" if cls.is_template
+                     else f"    {cls.name}() : counter_(0) {{}}")
+    else:
+        lines.append(f"    {cls.name}();")
+    lines.append("")
+    for method in cls.methods:
+        prefix = "static " if method['is_static'] else ""
+        if inline:
+            lines.append(f"    {prefix}{_signature(method)} {{")
+            lines += _method_body(method, " " * 8)
+            lines.append("    }")
+        else:
+            lines.append(f"    {prefix}{_signature(method)};")
+    if inline:
+        lines += ["    int count() const { return counter_; }"]
+    else:
+        lines += ["    int count() const;"]
+    if cls.deps:
+        if inline:
+            lines += ["    int dependencyCount() const {",
+                      "        return " + " + ".join(f"dep{d}_.count()" for d in cls.deps) + ";", "    }"]
+        else:
+            lines.append("    int dependencyCount() const;")
+    if cls.is_template:
+        lines.append("    T value() const { return value_; }")
+    lines += ["", "private:", "    int counter_;"]
+    if cls.is_template:
+        lines.append("    T value_;")
+    for dep in cls.deps:
+        lines.append(f"    {_qualified(spec, classes[dep])} dep{dep}_;")
+    lines.append("};")
+    if namespace:
+        lines.append("")
+    lines += _close_namespace(namespace)
+    lines += ["", f"#endif  // {guard}", ""]
+    return '\n'.join(lines)
+
+
+def render_source(spec: ProjectSpec, cls: _Class) -> str:
+    namespace = _namespace(spec, cls.module)
+    lines = [f'#include "{_header_name(spec, cls)}"', ""]
+    lines += _open_namespace(namespace)
+    if namespace:
+        lines.append("")
+    lines += [f"{cls.name}::{cls.name}() : counter_(0) {{", "}", ""]
+    for method in cls.methods:
+        lines.append(f"{_signature(method, cls.name)} {{")
+        lines += _method_body(method, " " * 4)
+        lines += ["}", ""]
+    lines += [f"int {cls.name}::count() const {{", "    return counter_;", "}", ""]
+    if cls.deps:
+        lines += [f"int {cls.name}::dependencyCount() const {{",
+                  "    return " + " + ".join(f"dep{d}_.count()" for d in cls.deps) + ";", "}", ""]
+    if namespace:
+        lines += _close_namespace(namespace) + [""]
+    return '\n'.join(lines)
+
+
+COMMON_H = """#ifndef SYNTH_COMMON_H
+#define SYNTH_COMMON_H
+
+#include <string>
+
+typedef struct Record {
+    int id;
+    double weight;
+} Record;
+
+#endif  // SYNTH_COMMON_H
+"""
+
+
+def _cmake(spec: ProjectSpec) -> str:
+    if spec.header_only:
+        return (f"cmake_minimum_required(VERSION 3.10)\nproject({spec.name} CXX)\n\n"
+                f"add_library({spec.name} INTERFACE)\n"
+                f"target_include_directories({spec.name} INTERFACE src inc)\n")
+    return (f"cmake_minimum_required(VERSION 3.10)\nproject({spec.name} CXX)\n"
+            f"set(CMAKE_CXX_STANDARD 14)\n\n"
+            f"file(GLOB_RECURSE SOURCES src/*.cpp)\n"
+            f"file(GLOB_RECURSE HEADER_DIRS LIST_DIRECTORIES true src/*)\n"
+            f"add_library({spec.name} STATIC ${{SOURCES}})\n"
+            f"target_include_directories({spec.name} PUBLIC inc ${{HEADER_DIRS}})\n")
+
+
+def generate_project(spec: ProjectSpec, out_dir) -> dict:
+    """Write the project into out_dir (replacing it) and return its statistics"""
+    if spec.layout not in LAYOUTS:
+        raise ValueError(f"unknown layout {spec.layout!r} (expected one of {', '.join(LAYOUTS)})")
+    out_dir = Path(out_dir)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    classes = build_model(spec)
+    files = {}
+
+    for cls in classes:
+        if spec.layout == 'sampleapp':
+            folder = Path('src') / _module_name(spec, cls.module)
+        else:
+            folder = Path('src') / spec.name.lower() / _module_name(spec, cls.module)
+        files[folder / _header_name(spec, cls)] = render_header(spec, cls, classes)
+        if not (spec.header_only or cls.is_template):
+            source_name = f"{cls.name}.cpp" if spec.layout == 'sampleapp' else f"{cls.name.lower()}.cpp"
+            files[folder / source_name] = render_source(spec, cls)
+
+    if spec.layout == 'sampleapp':
+        files[Path('inc') / 'common.h'] = COMMON_H
+        includes = ''.join(f'#include "{_header_name(spec, cls)}"\n'
+                           for cls in classes[:: max(1, spec.include_depth + 1)][:BASE_CLASSES])
+        files[Path('main.cpp')] = f"{includes}\nint main() {{\n    return 0;\n}}\n"
+    files[Path('CMakeLists.txt')] = _cmake(spec)
+
+    for relative, content in sorted(files.items()):
+        path = out_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(content)
+
+    stats = {
+        'spec': asdict(spec),
+        'classes': len(classes),
+        'template_classes': sum(1 for c in classes if c.is_template),
+        'methods': sum(len(c.methods) for c in classes),
+        'headers': sum(1 for p in files if p.suffix in ('.h', '.hpp')),
+        'sources': sum(1 for p in files if p.suffix == '.cpp'),
+        'lines': sum(content.count('\n') for content in files.values()),
+        'bytes': sum(len(content.encode('utf-8')) for content in files.values()),
+    }
+    with open(out_dir / 'synthetic_project.json', 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic C++ project for benchmarking')
+    parser.add_argument('output', type=Path, help='Project folder to create (replaced if it exists)')
+    parser.add_argument('--scale', type=int, metavar='K',
+                        help=f'K times the size of SampleApp ({BASE_CLASSES} classes); overrides --classes')
+    parser.add_argument('--classes', type=int, default=BASE_CLASSES, help='Number of classes')
+    parser.add_argument('--methods', type=int, default=BASE_METHODS, help='Methods per class')
+    parser.add_argument('--include-depth', type=int, default=2, help='Longest chain of nested project includes')
+    parser.add_argument('--modules', type=int, default=4, help='Module folders the classes are spread over')
+    parser.add_argument('--layout', choices=LAYOUTS, default='sampleapp', help='Folder layout')
+    parser.add_argument('--header-only', action='store_true', help='Define everything inline in headers')
+    parser.add_argument('--namespaces', action='store_true', help='Put each module in its own namespace')
+    parser.add_argument('--template-ratio', type=float, default=0.0, metavar='R',
+                        help='Share of classes that are class templates (0-1)')
+    parser.add_argument('--name', default='SyntheticApp', help='Project name')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+
+    classes = BASE_CLASSES * args.scale if args.scale else args.classes
+    spec = ProjectSpec(name=args.name, classes=classes, methods=args.methods,
+                       include_depth=args.include_depth, modules=args.modules, layout=args.layout,
+                       header_only=args.header_only, namespaces=args.namespaces,
+                       template_ratio=args.template_ratio, seed=args.seed)
+    stats = generate_project(spec, args.output)
+    print(f"Generated {args.output}: {stats['classes']} classes ({stats['template_classes']} templates), "
+          f"{stats['methods']} methods, {stats['headers']} headers, {stats['sources']} sources, "
+          f"{stats['lines']:,} lines")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
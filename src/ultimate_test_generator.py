@@ -14,6 +14,7 @@ Combines all strategies:
 
 import sys
 import re
+import argparse
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional, Set
 from dataclasses import dataclass
@@ -24,6 +25,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from advanced_test_generator import AdvancedTestGenerator
 from universal_enhanced_test_generator import ClassInfo, MethodInfo
+from run_profiler import profiler, add_profile_arguments, start_from_args
 import subprocess
 import json
 
@@ -44,6 +46,7 @@ class UltimateTestGenerator(AdvancedTestGenerator):
         print()
         
         # Analyze project
+        profiler.mark("analyze project")
         self.classes = self.analyzer.analyze_project()
         
         if not self.classes:
@@ -51,35 +54,44 @@ class UltimateTestGenerator(AdvancedTestGenerator):
             return []
         
         # Phase 1: Generate enhanced stubs with method bodies
+        profiler.mark("phase 1: enhanced stubs")
         print("📋 Phase 1: Generating enhanced stubs with method implementations...")
         self._generate_enhanced_stubs()
         
         # Phase 2: Generate tests for static methods
+        profiler.mark("phase 2: static method tests")
         print("\n📋 Phase 2: Generating static method tests...")
         self._generate_static_method_tests()
         
         # Phase 3: Aggressive free function detection
+        profiler.mark("phase 3: free function tests")
         print("\n📋 Phase 3: Aggressive free function detection...")
         self._generate_all_free_function_tests()
         
         # Phase 4: Generate fixture-based tests for complex classes
+        profiler.mark("phase 4: fixture tests")
         print("\n📋 Phase 4: Generating fixture-based tests...")
         self._generate_fixture_tests()
         
         # Phase 5: Generate multiple scenarios per method
+        profiler.mark("phase 5: multi-scenario tests")
         print("\n📋 Phase 5: Generating multi-scenario tests...")
         self._generate_multi_scenario_tests()
         
         # Phase 6: Generate instance method tests
+        profiler.mark("phase 6: instance method tests")
         print("\n📋 Phase 6: Generating instance method tests...")
         self._generate_instance_method_tests()
         
         # Compile all tests
+        profiler.mark("compile tests")
         print(f"\n📦 Compiling {len(self.test_metadata)} tests...")
         self._batch_compile()
         
         # Save metadata
+        profiler.mark("save metadata")
         self._save_metadata()
+        profiler.mark(None)
         
         print(f"\n✅ Generated {self.tests_generated} tests")
         print(f"   - Instance methods: {self.tests_generated - self.static_tests - self.free_func_tests - self.fixture_tests}")
@@ -535,6 +547,11 @@ TEST({class_info.name}, {method.name}_EdgeCase) {{
 def main():
     from config_reader import get_project_path
     
+    parser = argparse.ArgumentParser(description='Generate tests aiming for 65%+ coverage')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    start_from_args(args, "ultimate_test_generator")
+    
     project_path = get_project_path()
     project_root = Path(project_path)
     output_dir = Path("/workspaces/CppMicroAgent/output/ConsolidatedTests")
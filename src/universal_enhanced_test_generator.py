@@ -30,11 +30,12 @@ import subprocess
 import sys
 from pathlib import Path
 from typing import List, Dict, Set, Tuple, Optional
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 from config_reader import get_project_path
+from project_model_cache import ProjectModelCache
 
 @dataclass
 class MethodInfo:
@@ -72,22 +73,32 @@ class CppProjectAnalyzer:
         self.header_files: List[Path] = []
         self.source_files: List[Path] = []
         self.all_includes: Set[str] = set()
+        self.model_cache = ProjectModelCache(self.project_root)
+    
+    def __getstate__(self):
+        # Pool workers only need the parsing methods, not the model built so far
+        return {'project_root': self.project_root}
+        
+    def analyze_project(self, jobs: int = None):
+        """Analyze the entire project
         
-    def analyze_project(self):
-        """Analyze the entire project"""
+        Args:
+            jobs: Worker processes for header parsing (default: CPU count)
+        """
         print(f"📂 Analyzing project: {self.project_root}")
         
         # Find all source files
         self._find_source_files()
         
         # Analyze headers to extract class information
-        for header in self.header_files:
-            self._analyze_header(header)
+        self._analyze_headers(jobs)
         
         # Analyze source files for implementation details
         for source in self.source_files:
             self._analyze_source(source)
         
+        self.model_cache.save()
+        print(f"  🗃️  {self.model_cache.stats()}")
         print(f"✅ Found {len(self.classes)} classes with {sum(len(c.methods) for c in self.classes.values())} methods")
         return self.classes
     
@@ -110,64 +121,100 @@ class CppProjectAnalyzer:
             for pattern in patterns['sources']:
                 self.source_files.extend(search_dir.rglob(pattern))
         
-        # Remove duplicates
-        self.header_files = list(set(self.header_files))
-        self.source_files = list(set(self.source_files))
+        # Remove duplicates (sorted so classes merge in the same order every run)
+        self.header_files = sorted(set(self.header_files))
+        self.source_files = sorted(set(self.source_files))
         
         print(f"  📄 Found {len(self.header_files)} headers, {len(self.source_files)} sources")
     
-    def _analyze_header(self, header_path: Path):
-        """Analyze a header file to extract class information"""
-        try:
-            with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+    def _analyze_headers(self, jobs: int = None):
+        """Analyze all headers to extract class information; headers missing from
+        the project model are parsed across worker processes"""
+        parsed = self.model_cache.get_many(self.header_files, 'universal.classes',
+                                           self._parse_header_classes, workers=jobs)
+        for header_path, header_classes, error in parsed:
+            if error is not None:
+                print(f"  ⚠️  Error analyzing {header_path.name}: {error}")
+                continue
             
             # Collect all includes
-            includes = re.findall(r'#include\s*[<"]([^>"]+)[>"]', content)
-            self.all_includes.update(includes)
+            includes = self.model_cache.includes(header_path)
+            self.all_includes.update(inc['path'] for inc in includes)
             
-            # Remove comments
-            content = self._remove_comments(content)
+            for class_data in header_classes:
+                self._merge_class(class_data, header_path)
+    
+    def _parse_header_classes(self, header_path: Path) -> List[Dict]:
+        """Parse the classes declared in one header into plain dicts for the project model"""
+        header_path = Path(header_path)
+        with open(header_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        
+        # Remove comments
+        content = self._remove_comments(content)
+        
+        # Extract namespace
+        namespace = self._extract_namespace(content)
+        
+        # Find all classes and structs (capture which one)
+        class_pattern = r'\b(class|struct)\s+(\w+)(?:\s*:\s*([^{]+))?\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}'
+        
+        parsed = []
+        for match in re.finditer(class_pattern, content, re.DOTALL):
+            keyword = match.group(1)  # 'class' or 'struct'
+            class_name = match.group(2)
+            inheritance = match.group(3) or ""
+            class_body = match.group(4)
             
-            # Extract namespace
-            namespace = self._extract_namespace(content)
+            class_info = ClassInfo(
+                name=class_name,
+                namespace=namespace,
+                is_struct=(keyword == 'struct')  # Track if it's a struct
+            )
             
-            # Find all classes and structs (capture which one)
-            class_pattern = r'\b(class|struct)\s+(\w+)(?:\s*:\s*([^{]+))?\s*\{([^}]*(?:\{[^}]*\}[^}]*)*)\}'
+            # Extract base classes
+            if inheritance:
+                base_classes = re.findall(r'\b(?:public|protected|private)?\s*(\w+)', inheritance)
+                class_info.base_classes.extend(base_classes)
             
-            for match in re.finditer(class_pattern, content, re.DOTALL):
-                keyword = match.group(1)  # 'class' or 'struct'
-                class_name = match.group(2)
-                inheritance = match.group(3) or ""
-                class_body = match.group(4)
-                
-                if class_name in self.classes:
-                    class_info = self.classes[class_name]
-                else:
-                    class_info = ClassInfo(
-                        name=class_name,
-                        namespace=namespace,
-                        header_file=header_path,
-                        is_struct=(keyword == 'struct')  # Track if it's a struct
-                    )
-                    self.classes[class_name] = class_info
-                
-                # Extract base classes
-                if inheritance:
-                    base_classes = re.findall(r'\b(?:public|protected|private)?\s*(\w+)', inheritance)
-                    class_info.base_classes.extend(base_classes)
-                
-                # Extract methods
-                self._extract_methods(class_body, class_info)
-                
-                # Extract member variables
-                self._extract_member_variables(class_body, class_info)
-                
-                # Check if abstract
-                class_info.is_abstract = '= 0' in class_body
-                
-        except Exception as e:
-            print(f"  ⚠️  Error analyzing {header_path.name}: {e}")
+            # Extract methods
+            self._extract_methods(class_body, class_info)
+            
+            # Extract member variables
+            self._extract_member_variables(class_body, class_info)
+            
+            # Check if abstract
+            class_info.is_abstract = '= 0' in class_body
+            
+            class_data = asdict(class_info)
+            class_data['header_file'] = None
+            class_data['dependencies'] = sorted(class_info.dependencies)
+            parsed.append(class_data)
+        
+        return parsed
+    
+    def _merge_class(self, class_data: Dict, header_path: Path):
+        """Merge one parsed class from the project model into self.classes"""
+        class_name = class_data['name']
+        if class_name in self.classes:
+            class_info = self.classes[class_name]
+        else:
+            class_info = ClassInfo(
+                name=class_name,
+                namespace=class_data['namespace'],
+                header_file=header_path,
+                is_struct=class_data['is_struct']
+            )
+            self.classes[class_name] = class_info
+        
+        class_info.base_classes.extend(class_data['base_classes'])
+        for method_data in class_data['methods']:
+            method_data['parameters'] = [tuple(p) for p in method_data['parameters']]
+            class_info.methods.append(MethodInfo(**method_data))
+        class_info.member_variables.extend(tuple(v) for v in class_data['member_variables'])
+        if class_data['has_default_constructor']:
+            class_info.has_default_constructor = True
+        class_info.is_abstract = class_data['is_abstract']
     
     def _analyze_source(self, source_path: Path):
         """Analyze a source file for additional implementation details"""
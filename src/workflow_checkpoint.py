@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Durable per-task checkpoints for the advanced coverage workflow
+Every function task appends a line to output/UnitTestCoverage/checkpoints.jsonl
+when one of its stages finishes, plus a final line with the task outcome,
+hashes of its inputs (source, header, implementation) and hashes of the
+artifacts it left in its folder. Lines are flushed and fsync'ed, so a crash
+or Ctrl-C loses at most the task that was running.
+
+A resumed run skips a task only when its last record says it completed, its
+inputs hash the same and its artifacts are still on disk unchanged; failed,
+stopped and interrupted tasks are retried.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+CHECKPOINT_FILENAME = "checkpoints.jsonl"
+COMPLETED = "completed"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def folder_artifacts(folder: str) -> dict:
+    """Hashes of the files directly in a function folder (build folders excluded)"""
+    artifacts = {}
+    if os.path.isdir(folder):
+        for entry in sorted(os.scandir(folder), key=lambda e: e.name):
+            if entry.is_file():
+                artifacts[entry.name] = file_hash(entry.path)
+    return artifacts
+
+
+class CheckpointStore:
+    """Append-only checkpoint log of one output folder, shared by function workers"""
+
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, CHECKPOINT_FILENAME)
+        self._lock = threading.Lock()
+        # task id -> last outcome record
+        self.outcomes = {}
+        # Set when a crash left the log without a final newline
+        self._torn = False
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                self._torn = not line.endswith('\n')
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                if 'outcome' in record:
+                    self.outcomes[record['task']] = record
+
+    def _append(self, record: dict):
+        line = json.dumps(record, sort_keys=True) + "\n"
+        with self._lock:
+            os.makedirs(self.output_dir, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                if self._torn:
+                    f.write("\n")
+                    self._torn = False
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            if 'outcome' in record:
+                self.outcomes[record['task']] = record
+
+    def task_id(self, folder: str) -> str:
+        """Stable id of a function task: its folder relative to the output folder"""
+        return os.path.relpath(folder, self.output_dir).replace(os.sep, '/')
+
+    def record_stage(self, task: str, stage: str, status: str):
+        self._append({'task': task, 'stage': stage, 'status': status, 'time': time.time()})
+
+    def record_outcome(self, task: str, outcome: str, inputs: dict, stages: dict, folder: str):
+        self._append({'task': task, 'outcome': outcome, 'inputs': inputs, 'stages': stages,
+                      'artifacts': folder_artifacts(folder), 'time': time.time()})
+
+    def is_complete(self, task: str, inputs: dict, folder: str) -> bool:
+        """Whether a task finished with these inputs and its artifacts are intact"""
+        record = self.outcomes.get(task)
+        if record is None or record['outcome'] != COMPLETED or record['inputs'] != inputs:
+            return False
+        for name, digest in record['artifacts'].items():
+            path = os.path.join(folder, name)
+            if not os.path.isfile(path) or file_hash(path) != digest:
+                return False
+        return True